@@ -1,11 +1,24 @@
-from flask import Flask, render_template, redirect, url_for, session, request, jsonify, flash
+import threading
+import time
+from urllib.parse import quote
+
+from flask import Flask, render_template, redirect, url_for, session, request, jsonify, flash, g, make_response, \
+    abort
+from markupsafe import Markup
 from star import StarostaModule
-from rasp import ScheduleModule
+from rasp import DAYS, ScheduleModule
 from prepod import TeachersModule
 from repe import TutoringModule
 from mero import EventsModule
 from praktika import PracticeModule
-from vxod import AuthModule
+from eksport import FORMATS, iter_attendance
+from kalendar import CalendarFeeds
+from konsultacii import ConsultationIndex
+from nagruzka import TeacherResolver
+from sobytiya import EventBroker
+from vxod import AuthModule, PasswordHasherBusy, UserExistsError
+from zagruzka import ScheduleImporter
+from zanyatost import OccupancyIndex, PAIRS
 from macro import get_month_name, format_date, get_status_color, truncate_text, get_initials
 
 app = Flask(__name__)
@@ -26,7 +39,36 @@ teachers_module = TeachersModule()
 tutoring_module = TutoringModule()
 events_module = EventsModule()
 practice_module = PracticeModule()
-auth_module = AuthModule()
+auth_module = AuthModule(db_path='portal.db')
+auth_module.sessions.start_sweeper()
+schedule_importer = ScheduleImporter(schedule_module)
+calendar_feeds = CalendarFeeds(schedule_module)
+occupancy = OccupancyIndex()
+schedule_module.add_index(occupancy)
+teacher_resolver = TeacherResolver(teachers_module)
+schedule_module.add_index(teacher_resolver)
+consultations = ConsultationIndex(teachers_module, schedule_module, teacher_resolver)
+
+# Push-события (SSE). Брокер живет в памяти процесса: запускать один процесс
+# с gevent-воркером, например gunicorn -k gevent -w 1 --worker-connections 5000 app:app
+event_broker = EventBroker()
+schedule_module.add_listener(lambda change: event_broker.publish('schedule', 'schedule', change))
+starosta_module.messages.add_listener(
+    lambda message: event_broker.publish(f'messages:{message["to"]}', 'message', message))
+
+USERS_PAGE_SIZE = 50
+TEACHERS_PAGE_SIZE = 24
+SCHEDULE_COURSES = [1, 2, 3, 4]
+# (version, {course: отрисованный HTML расписания}) - только последняя версия, курсы
+# только из SCHEDULE_COURSES. Кортеж заменяется целиком под schedule_fragment_lock
+schedule_fragment_cache = (0, {})
+schedule_fragment_lock = threading.Lock()
+
+
+def public(view):
+    """Отметить маршрут как доступный без авторизации"""
+    view.is_public = True
+    return view
 
 
 # Добавляем функцию get_month_name в глобальный контекст шаблонов
@@ -35,14 +77,50 @@ def utility_processor():
     return dict(get_month_name=get_month_name)
 
 
+# Middleware для проверки авторизации
+@app.before_request
+def check_auth():
+    started = time.perf_counter()
+    g.user = None
+    try:
+        # Разрешаем доступ к публичным страницам
+        view = app.view_functions.get(request.endpoint)
+        if request.endpoint == 'static' or getattr(view, 'is_public', False):
+            return None
+
+        if 'user_id' not in session or 'session_id' not in session:
+            return redirect(url_for('index'))
+
+        # Проверяем валидность сессии и один раз загружаем пользователя на весь запрос
+        user_id = auth_module.validate_session(session['session_id'])
+        if user_id and user_id == session['user_id']:
+            g.user = auth_module.get_user_by_id(user_id)
+        if not g.user:
+            session.clear()
+            return redirect(url_for('index'))
+        return None
+    finally:
+        g.auth_duration = time.perf_counter() - started
+
+
+@app.after_request
+def add_auth_timing(response):
+    # Время проверки авторизации видно в DevTools (вкладка Timing)
+    if 'auth_duration' in g:
+        response.headers.add('Server-Timing', f'auth;dur={g.auth_duration * 1000:.3f}')
+    return response
+
+
 # Главная страница - выбор типа входа
 @app.route('/')
+@public
 def index():
     return render_template('index.html')
 
 
 # Вход для студентов
 @app.route('/login/student', methods=['GET', 'POST'])
+@public
 def student_login():
     if 'user_id' in session and session.get('user_type') == 'student':
         return redirect(url_for('student_dashboard'))
@@ -55,23 +133,24 @@ def student_login():
         if auth_result['success']:
             user = auth_result['user']
             # Создаем сессию
-        session_id = auth_module.create_session(user['id'])
-        session['user_id'] = user['id']
-        session['session_id'] = session_id
-        session['username'] = user['username']
-        session['user_type'] = user['user_type']
-        session['name'] = user['name']
-
-        flash(f'Добро пожаловать, {user["name"]}!', 'success')
-        return redirect(url_for('student_dashboard'))
-    else:
+            session_id = auth_module.create_session(user['id'])
+            session['user_id'] = user['id']
+            session['session_id'] = session_id
+            session['username'] = user['username']
+            session['user_type'] = user['user_type']
+            session['name'] = user['name']
+
+            flash(f'Добро пожаловать, {user["name"]}!', 'success')
+            return redirect(url_for('student_dashboard'))
+        else:
             return render_template('login_student.html', error=auth_result['message'])
 
-            return render_template('login_student.html')
+    return render_template('login_student.html')
 
 
 # Вход для преподавателей
 @app.route('/login/teacher', methods=['GET', 'POST'])
+@public
 def teacher_login():
     if 'user_id' in session and session.get('user_type') == 'teacher':
         return redirect(url_for('teacher_dashboard'))
@@ -81,7 +160,7 @@ def teacher_login():
         password = request.form.get('password')
 
         auth_result = auth_module.authenticate(identifier, password, 'teacher')
-    if auth_result['success']:
+        if auth_result['success']:
             user = auth_result['user']
             # Создаем сессию
             session_id = auth_module.create_session(user['id'])
@@ -93,111 +172,121 @@ def teacher_login():
 
             flash(f'Добро пожаловать, {user["name"]}!', 'success')
             return redirect(url_for('teacher_dashboard'))
-
-    else:
+        else:
             return render_template('login_teacher.html', error=auth_result['message'])
 
-            return render_template('login_teacher.html')
+    return render_template('login_teacher.html')
+
+
 @app.route('/login/admin', methods=['GET', 'POST'])
+@public
 def admin_login():
-            if 'user_id' in session and session.get('user_type') == 'admin':
-                return redirect(url_for('admin_dashboard'))
-
-            if request.method == 'POST':
-                identifier = request.form.get('identifier')
-                password = request.form.get('password')
-
-                auth_result = auth_module.authenticate(identifier, password, 'admin')
-                if auth_result['success']:
-                    user = auth_result['user']
-                    # Создаем сессию
-                    session_id = auth_module.create_session(user['id'])
-                    session['user_id'] = user['id']
-                    session['session_id'] = session_id
-                    session['username'] = user['username']
-                    session['user_type'] = user['user_type']
-                    session['name'] = user['name']
-
-                    flash(f'Добро пожаловать, {user["name"]}!', 'success')
-                    return redirect(url_for('admin_dashboard'))
-                else:
-                    return render_template('login_admin.html', error=auth_result['message'])
+    if 'user_id' in session and session.get('user_type') == 'admin':
+        return redirect(url_for('admin_dashboard'))
+
+    if request.method == 'POST':
+        identifier = request.form.get('identifier')
+        password = request.form.get('password')
+
+        auth_result = auth_module.authenticate(identifier, password, 'admin')
+        if auth_result['success']:
+            user = auth_result['user']
+            # Создаем сессию
+            session_id = auth_module.create_session(user['id'])
+            session['user_id'] = user['id']
+            session['session_id'] = session_id
+            session['username'] = user['username']
+            session['user_type'] = user['user_type']
+            session['name'] = user['name']
+
+            flash(f'Добро пожаловать, {user["name"]}!', 'success')
+            return redirect(url_for('admin_dashboard'))
+        else:
+            return render_template('login_admin.html', error=auth_result['message'])
+
+    return render_template('login_admin.html')
 
-            return render_template('login_admin.html')
 
-        # Регистрация студентов
+# Регистрация студентов
 @app.route('/register/student', methods=['GET', 'POST'])
+@public
 def student_register():
-            if request.method == 'POST':
-                username = request.form.get('username')
-                password = request.form.get('password')
-                confirm_password = request.form.get('confirm_password')
-                full_name = request.form.get('full_name')
-                email = request.form.get('email')
-                phone = request.form.get('phone')
-                group = request.form.get('group')
-                course = request.form.get('course')
-                verification_method = request.form.get('verification_method', 'email')
-
-                # Валидация
-                if password != confirm_password:
-                    return render_template('register_student.html', error='Пароли не совпадают')
-
-                if len(password) < 6:
-                    return render_template('register_student.html', error='Пароль должен быть не менее 6 символов')
-
-                if auth_module.check_username_exists(username, 'student'):
-                    return render_template('register_student.html', error='Студент с таким логином уже существует')
-
-                if auth_module.check_email_exists(email, 'student'):
-                    return render_template('register_student.html', error='Студент с таким email уже существует')
-
-                if phone and auth_module.check_phone_exists(phone, 'student'):
-                    return render_template('register_student.html', error='Студент с таким телефоном уже существует')
-
-                # Создаем пользователя (но не подтверждаем)
-                new_user = auth_module.create_user(
-                    username=username,
-                    password=password,
-                    name=full_name,
-                    user_type='student',
-                    email=email,
-                    phone=phone,
-                    group=group,
-                    course=course
-                )
-
-                # Сохраняем данные в сессии для подтверждения
-                session['pending_user'] = {
-                    'username': username,
-                    'email': email,
-                    'phone': phone,
-                    'verification_method': verification_method,
-                    'user_type': 'student'
-                }
-
-                # Отправляем код подтверждения
-                if verification_method == 'email':
-                    identifier = email
-                else:
-                    identifier = phone
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        confirm_password = request.form.get('confirm_password')
+        full_name = request.form.get('full_name')
+        email = request.form.get('email')
+        phone = request.form.get('phone')
+        group = request.form.get('group')
+        course = request.form.get('course')
+        verification_method = request.form.get('verification_method', 'email')
 
-                success, code = auth_module.create_verification_code(identifier, verification_method, 'student')
+        # Валидация
+        if password != confirm_password:
+            return render_template('register_student.html', error='Пароли не совпадают')
+
+        if len(password) < 6:
+            return render_template('register_student.html', error='Пароль должен быть не менее 6 символов')
+
+        if auth_module.check_username_exists(username, 'student'):
+            return render_template('register_student.html', error='Студент с таким логином уже существует')
+
+        if auth_module.check_email_exists(email, 'student'):
+            return render_template('register_student.html', error='Студент с таким email уже существует')
+
+        if phone and auth_module.check_phone_exists(phone, 'student'):
+            return render_template('register_student.html', error='Студент с таким телефоном уже существует')
+
+        # Создаем пользователя (но не подтверждаем)
+        try:
+            new_user = auth_module.create_user(
+                username=username,
+                password=password,
+                name=full_name,
+                user_type='student',
+                email=email,
+                phone=phone,
+                group=group,
+                course=course
+            )
+        except UserExistsError as error:
+            # Логин или email заняли между проверкой и сохранением
+            return render_template('register_student.html', error=str(error))
+        except PasswordHasherBusy:
+            # 503 - клиент может повторить запрос
+            return render_template('register_student.html', error='Сервер перегружен, попробуйте позже'), 503
+
+        # Сохраняем данные в сессии для подтверждения
+        session['pending_user'] = {
+            'username': username,
+            'email': email,
+            'phone': phone,
+            'verification_method': verification_method,
+            'user_type': 'student'
+        }
+
+        # Отправляем код подтверждения
+        if verification_method == 'email':
+            identifier = email
+        else:
+            identifier = phone
 
-                if success:
-                    session['verification_identifier'] = identifier
-                    return redirect(url_for('verify', user_type='student'))
-                else:
-                    return render_template('register_student.html', error='Ошибка отправки кода подтверждения')
+        success, code = auth_module.create_verification_code(identifier, verification_method, 'student')
 
-            return render_template('register_student.html')
+        if success:
+            session['verification_identifier'] = identifier
+            return redirect(url_for('verify', user_type='student'))
+        else:
+            return render_template('register_student.html', error='Ошибка отправки кода подтверждения')
 
+    return render_template('register_student.html')
 
-@app.route('/register/teacher', methods=['GET', 'POST'])
 
+@app.route('/register/teacher', methods=['GET', 'POST'])
 def teacher_register():
     # Только администраторы могут создавать учетные записи преподавателей
-    if 'user_id' not in session or session.get('user_type') != 'admin':
+    if g.user['user_type'] != 'admin':
         flash('Доступ запрещен. Только администраторы могут регистрировать преподавателей.', 'error')
         return redirect(url_for('admin_login'))
 
@@ -223,16 +312,21 @@ def teacher_register():
             return render_template('register_teacher.html', error='Преподаватель с таким email уже существует')
 
         # Создаем пользователя
-        new_user = auth_module.create_user(
-            username=username,
-            password=password,
-            name=full_name,
-            user_type='teacher',
-            email=email,
-            phone=phone,
-            department=department,
-            position=position
-        )
+        try:
+            new_user = auth_module.create_user(
+                username=username,
+                password=password,
+                name=full_name,
+                user_type='teacher',
+                email=email,
+                phone=phone,
+                department=department,
+                position=position
+            )
+        except UserExistsError as error:
+            return render_template('register_teacher.html', error=str(error))
+        except PasswordHasherBusy:
+            return render_template('register_teacher.html', error='Сервер перегружен, попробуйте позже'), 503
 
         # Отправляем приглашение
         if verification_method == 'email':
@@ -250,8 +344,10 @@ def teacher_register():
 
     return render_template('register_teacher.html')
 
+
 # Страница подтверждения
 @app.route('/verify/<user_type>', methods=['GET', 'POST'])
+@public
 def verify(user_type):
     if 'verification_identifier' not in session:
         return redirect(url_for(f'{user_type}_register'))
@@ -273,26 +369,27 @@ def verify(user_type):
             success, new_code = auth_module.create_verification_code(
                 identifier,
                 pending_user['verification_method'],
-                user_type
+                pending_user.get('user_type', user_type)
             )
 
             if success:
                 return render_template('verify.html',
-                                     success='Новый код отправлен',
-                                     method=pending_user['verification_method'],
-                                     user_type=user_type)
+                                       success='Новый код отправлен',
+                                       method=pending_user['verification_method'],
+                                       user_type=user_type)
             else:
                 return render_template('verify.html',
-                                     error='Ошибка отправки кода',
-                                     method=pending_user['verification_method'],
-                                     user_type=user_type)
+                                       error='Ошибка отправки кода',
+                                       method=pending_user['verification_method'],
+                                       user_type=user_type)
 
         # Проверка кода
         result = auth_module.verify_code(identifier, code)
 
         if result['success']:
             # Подтверждаем пользователя
-            verify_result = auth_module.verify_user(identifier)
+            # Тип берем из кода, а не из адреса страницы
+            verify_result = auth_module.verify_user(identifier, result['user_type'])
 
             if verify_result['success']:
                 user = verify_result['user']
@@ -325,66 +422,70 @@ def verify(user_type):
                                        user_type=user_type)
         else:
             return render_template('verify.html',
-            error=result['message'],
-            method=pending_user['verification_method'],
-            user_type=user_type)
+                                   error=result['message'],
+                                   method=pending_user['verification_method'],
+                                   user_type=user_type)
 
     return render_template('verify.html',
-method=pending_user.get('verification_method', 'email'),
-user_type=user_type)
+                           method=pending_user.get('verification_method', 'email'),
+                           user_type=user_type)
 
-        # Восстановление пароля
+
+# Восстановление пароля
 @app.route('/forgot_password/<user_type>', methods=['GET', 'POST'])
+@public
 def forgot_password(user_type):
-            if request.method == 'POST':
-                identifier = request.form.get('identifier')
-                verification_method = request.form.get('verification_method', 'email')
-
-                # Проверяем существование пользователя
-                user = None
-                if '@' in identifier:  # Это email
-                    user = auth_module.get_user_by_email(identifier)
-                else:  # Это телефон
-                    user = auth_module.get_user_by_phone(identifier)
-
-                if not user or user.get('user_type') != user_type:
-                    return render_template('forgot_password.html',
-                                           error='Пользователь не найден',
-                                           user_type=user_type)
-
-                # Отправляем код подтверждения
-                success, code = auth_module.create_verification_code(identifier, verification_method, user_type)
-
-                if success:
-                    session['reset_password_identifier'] = identifier
-                    session['reset_password_method'] = verification_method
-                    session['reset_password_user_type'] = user_type
-                    return redirect(url_for('reset_password', user_type=user_type))
-                else:
-                    return render_template('forgot_password.html',
-                                           error='Ошибка отправки кода подтверждения',
-                                           user_type=user_type)
+    if request.method == 'POST':
+        identifier = request.form.get('identifier')
+        verification_method = request.form.get('verification_method', 'email')
+
+        # Проверяем существование пользователя
+        user = None
+        if '@' in identifier:  # Это email
+            user = auth_module.get_user_by_email(identifier, user_type)
+        else:  # Это телефон
+            user = auth_module.get_user_by_phone(identifier, user_type)
+
+        if not user:
+            return render_template('forgot_password.html',
+                                   error='Пользователь не найден',
+                                   user_type=user_type)
+
+        # Отправляем код подтверждения
+        success, code = auth_module.create_verification_code(identifier, verification_method, user_type)
+
+        if success:
+            session['reset_password_identifier'] = identifier
+            session['reset_password_method'] = verification_method
+            session['reset_password_user_type'] = user_type
+            return redirect(url_for('reset_password', user_type=user_type))
+        else:
+            return render_template('forgot_password.html',
+                                   error='Ошибка отправки кода подтверждения',
+                                   user_type=user_type)
+
+    return render_template('forgot_password.html', user_type=user_type)
 
-            return render_template('forgot_password.html', user_type=user_type)
 
-        # Сброс пароля
+# Сброс пароля
 @app.route('/reset_password/<user_type>', methods=['GET', 'POST'])
+@public
 def reset_password(user_type):
-            if 'reset_password_identifier' not in session:
-                return redirect(url_for('forgot_password', user_type=user_type))
+    if 'reset_password_identifier' not in session:
+        return redirect(url_for('forgot_password', user_type=user_type))
 
-            identifier = session['reset_password_identifier']
-            method = session.get('reset_password_method', 'email')
+    identifier = session['reset_password_identifier']
+    method = session.get('reset_password_method', 'email')
 
-            if request.method == 'POST':
-                code = request.form.get('code')
-                new_password = request.form.get('new_password')
-                confirm_password = request.form.get('confirm_password')
-                resend = request.form.get('resend')
+    if request.method == 'POST':
+        code = request.form.get('code')
+        new_password = request.form.get('new_password')
+        confirm_password = request.form.get('confirm_password')
+        resend = request.form.get('resend')
 
-            if resend:
+        if resend:
             # Повторная отправка кода
-                 success, new_code = auth_module.create_verification_code(identifier, method, user_type)
+            success, new_code = auth_module.create_verification_code(identifier, method, user_type)
 
             if success:
                 return render_template('reset_password.html',
@@ -397,217 +498,639 @@ def reset_password(user_type):
                                        method=method,
                                        user_type=user_type)
 
-                # Проверяем, что пароли совпадают
-            if new_password != confirm_password:
+        # Проверяем, что пароли совпадают
+        if new_password != confirm_password:
+            return render_template('reset_password.html',
+                                   error='Пароли не совпадают',
+                                   method=method,
+                                   user_type=user_type)
+
+        if len(new_password) < 6:
+            return render_template('reset_password.html',
+                                   error='Пароль должен быть не менее 6 символов',
+                                   method=method,
+                                   user_type=user_type)
+
+        # Хешируем до проверки кода: при перегрузке код не сгорает и запрос можно повторить
+        try:
+            password_hash = auth_module.hash_password(new_password)
+        except PasswordHasherBusy:
+            return render_template('reset_password.html',
+                                   error='Сервер перегружен, попробуйте позже',
+                                   method=method,
+                                   user_type=user_type), 503
+
+        # Проверяем код
+        result = auth_module.verify_code(identifier, code)
+
+        if not result['success']:
+            return render_template('reset_password.html',
+                                   error=result['message'],
+                                   method=method,
+                                   user_type=user_type)
+        else:
+            # Меняем пароль
+            update_result = auth_module.update_password(identifier, new_password, result['user_type'],
+                                                        password_hash=password_hash)
+
+            if update_result['success']:
+                # Очищаем сессию
+                session.pop('reset_password_identifier', None)
+                session.pop('reset_password_method', None)
+                session.pop('reset_password_user_type', None)
+
+                flash('Пароль успешно изменен! Теперь вы можете войти в систему.', 'success')
+                return redirect(url_for(f'{user_type}_login'))
+            else:
                 return render_template('reset_password.html',
-                                           error='Пароли не совпадают',
-                                           method=method,
-                                           user_type=user_type)
-
-            if len(new_password) < 6:
-                    return render_template('reset_password.html',
-                                           error='Пароль должен быть не менее 6 символов',
-                                           method=method,
-                                           user_type=user_type)
-
-                    # Проверяем код
-            result = auth_module.verify_code(identifier, code)
-
-            if not result['success']:
-                    return render_template('reset_password.html',
-                                       error=result['message'],
+                                       error=update_result['message'],
                                        method=method,
                                        user_type=user_type)
-            else:
-                        # Меняем пароль
-                        update_result = auth_module.update_password(identifier, new_password)
-
-                        if update_result['success']:
-                            # Очищаем сессию
-                            session.pop('reset_password_identifier', None)
-                            session.pop('reset_password_method', None)
-                            session.pop('reset_password_user_type', None)
-
-                            flash('Пароль успешно изменен! Теперь вы можете войти в систему.', 'success')
-                            return redirect(url_for(f'{user_type}_login'))
-                        else:
-                            return render_template('reset_password.html',
-                                                   error=update_result['message'],
-                                                   method=method,
-                                                   user_type=user_type)
-
-            return render_template('reset_password.html', method=method, user_type=user_type)
-
-            # Выход из системы
-            @app.route('/logout')
-            def logout():
-                if 'session_id' in session:
-                    auth_module.delete_session(session['session_id'])
-
-                session.clear()
-                flash('Вы успешно вышли из системы', 'info')
-                return redirect(url_for('index'))
-
-            # Дашборды для разных типов пользователей
-            @app.route('/dashboard/student')
-            def student_dashboard():
-                if 'user_id' not in session or session.get('user_type') != 'student':
-                    return redirect(url_for('student_login'))
-
-                user_data = auth_module.get_user_by_id(session['user_id'])
-                return render_template('dashboard_student.html', user=user_data)
-
-            @app.route('/dashboard/teacher')
-            def teacher_dashboard():
-                if 'user_id' not in session or session.get('user_type') != 'teacher':
-                    return redirect(url_for('teacher_login'))
-
-                user_data = auth_module.get_user_by_id(session['user_id'])
-                return render_template('dashboard_teacher.html', user=user_data)
-
-            @app.route('/dashboard/admin')
-            def admin_dashboard():
-                if 'user_id' not in session or session.get('user_type') != 'admin':
-                    return redirect(url_for('admin_login'))
-
-                user_data = auth_module.get_user_by_id(session['user_id'])
-                students = auth_module.get_users_by_type('student')
-                teachers = auth_module.get_users_by_type('teacher')
-                admins = auth_module.get_users_by_type('admin')
-
-                return render_template('dashboard_admin.html',
-                                       user=user_data,
-                                       students=students,
-                                       teachers=teachers,
-                                       admins=admins)
-
-            # API для проверки доступности
-            @app.route('/api/check_availability/<user_type>', methods=['POST'])
-            def check_availability(user_type):
-                data = request.json
-                field = data.get('field')
-                value = data.get('value')
-
-                if field == 'username':
-                    exists = auth_module.check_username_exists(value, user_type)
-                    return jsonify({'available': not exists})
-                elif field == 'email':
-                    exists = auth_module.check_email_exists(value, user_type)
-                    return jsonify({'available': not exists})
-                elif field == 'phone':
-                    exists = auth_module.check_phone_exists(value, user_type)
-                    return jsonify({'available': not exists})
-
-                return jsonify({'error': 'Invalid field'})
-
-            # Middleware для проверки авторизации
-            @app.before_request
-            def check_auth():
-                # Разрешаем доступ к публичным страницам
-                public_paths = [
-                    '/', '/login/student', '/login/teacher', '/login/admin',
-                    '/register/student', '/register/teacher', '/verify/student',
-                    '/verify/teacher', '/forgot_password/student', '/forgot_password/teacher',
-                    '/forgot_password/admin', '/reset_password/student', '/reset_password/teacher',
-                    '/reset_password/admin', '/api/check_availability/student',
-                    '/api/check_availability/teacher', '/api/check_availability/admin',
-                    '/static'
-                ]
-
-                if request.path not in public_paths and not request.path.startswith('/static'):
-                    if 'user_id' not in session:
-                        return redirect(url_for('index'))
-
-                    # Проверяем валидность сессии
-                    if 'session_id' in session:
-                        user_id = auth_module.validate_session(session['session_id'])
-                        if not user_id or user_id != session['user_id']:
-                            session.clear()
-                            return redirect(url_for('index'))
-
-            # Маршруты для студента (из предыдущей версии, с проверкой прав)
-            @app.route('/student/starosta')
-            def student_starosta():
-                if 'user_id' not in session or session.get('user_type') != 'student':
-                    return redirect(url_for('student_login'))
-
-                user_data = auth_module.get_user_by_id(session['user_id'])
-                # Проверяем, является ли студент старостой
-                if user_data['username'] != 'starosta':
-                    flash('Доступ только для старосты группы', 'error')
-                    return redirect(url_for('student_dashboard'))
 
-                students = starosta_module.get_students_data('ПИ-21')
-                reports = starosta_module.get_reports_data()
-                info = starosta_module.get_info_for_headman()
-                messages = starosta_module.get_messages()
-
-                return render_template('starosta.html',
-                                       user=user_data['name'],
-                                       role='student',
-                                       students=students,
-                                       reports=reports,
-                                       info=info,
-                                       messages=messages)
-
-            @app.route('/student/raspisanie')
-            def student_raspisanie():
-                if 'user_id' not in session or session.get('user_type') != 'student':
-                    return redirect(url_for('student_login'))
-
-                user_data = auth_module.get_user_by_id(session['user_id'])
-                course = request.args.get('course', default=1, type=int)
-                schedule = schedule_module.get_schedule(course)
-                days = schedule_module.get_course_days(course)
-                exams = schedule_module.get_exams_schedule(course)
-
-                return render_template('raspisanie.html',
-                                       user=user_data['name'],
-                                       role='student',
-                                       schedule=schedule,
-                                       days=days,
-                                       exams=exams,
-                                       current_course=course,
-                                       courses=[1, 2, 3, 4])
-
-            # Добавьте остальные маршруты для студента...
-
-            # Маршруты для преподавателя
-            @app.route('/teacher/prepodavateli')
-            def teacher_prepodavateli():
-                if 'user_id' not in session or session.get('user_type') != 'teacher':
-                    return redirect(url_for('teacher_login'))
-
-                user_data = auth_module.get_user_by_id(session['user_id'])
-                teachers = teachers_module.get_all_teachers()
-                departments = teachers_module.get_departments()
-
-                return render_template('prepodavateli.html',
-                                       user=user_data['name'],
-                                       role='teacher',
-                                       teachers=teachers,
-                                       departments=departments)
-
-            # Добавьте остальные маршруты для преподавателя...
-
-            # Маршруты для администратора
-            @app.route('/admin/manage_users')
-            def admin_manage_users():
-                if 'user_id' not in session or session.get('user_type') != 'admin':
-                    return redirect(url_for('admin_login'))
-
-                user_data = auth_module.get_user_by_id(session['user_id'])
-                students = auth_module.get_users_by_type('student')
-                teachers = auth_module.get_users_by_type('teacher')
-                admins = auth_module.get_users_by_type('admin')
-
-                return render_template('manage_users.html',
-                                       user=user_data,
-                                       students=students,
-                                       teachers=teachers,
-                                       admins=admins)
-
-            # Добавьте остальные маршруты для администратора...
-
-            if __name__ == '__main__':
-                app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    return render_template('reset_password.html', method=method, user_type=user_type)
+
+
+# Выход из системы
+@app.route('/logout')
+def logout():
+    auth_module.delete_session(session['session_id'])
+
+    session.clear()
+    flash('Вы успешно вышли из системы', 'info')
+    return redirect(url_for('index'))
+
+
+# Дашборды для разных типов пользователей
+@app.route('/dashboard/student')
+def student_dashboard():
+    if g.user['user_type'] != 'student':
+        return redirect(url_for('student_login'))
+
+    return render_template('dashboard_student.html', user=g.user)
+
+
+@app.route('/dashboard/teacher')
+def teacher_dashboard():
+    if g.user['user_type'] != 'teacher':
+        return redirect(url_for('teacher_login'))
+
+    return render_template('dashboard_teacher.html', user=g.user)
+
+
+@app.route('/dashboard/admin')
+def admin_dashboard():
+    if g.user['user_type'] != 'admin':
+        return redirect(url_for('admin_login'))
+
+    # Только первые страницы - остальное подгружается через /api/admin/users
+    students = auth_module.list_users('student', limit=USERS_PAGE_SIZE)
+    teachers = auth_module.list_users('teacher', limit=USERS_PAGE_SIZE)
+    admins = auth_module.list_users('admin', limit=USERS_PAGE_SIZE)
+
+    return render_template('dashboard_admin.html',
+                           user=g.user,
+                           students=students['users'],
+                           teachers=teachers['users'],
+                           admins=admins['users'],
+                           students_cursor=students['next_cursor'],
+                           teachers_cursor=teachers['next_cursor'],
+                           admins_cursor=admins['next_cursor'])
+
+
+# API для проверки доступности
+@app.route('/api/check_availability/<user_type>', methods=['POST'])
+@public
+def check_availability(user_type):
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Ожидается объект JSON'}), 400
+    # Запросы одного клиента объединяются в пределах окна debounce
+    client_key = session.get('session_id') or request.remote_addr
+
+    # Пакетная проверка: {'fields': {'username': ..., 'email': ..., 'phone': ...}}
+    if 'fields' in data:
+        try:
+            results = auth_module.availability.check(data['fields'], user_type, client_key)
+        except ValueError as error:
+            return jsonify({'error': str(error)}), 400
+        return jsonify({'results': results})
+
+    field = data.get('field')
+    if not isinstance(field, str):
+        return jsonify({'error': 'Укажите field и value'}), 400
+    result = auth_module.availability.check({field: data.get('value')}, user_type, client_key)[field]
+    return jsonify(result)
+
+
+# Маршруты для студента (из предыдущей версии, с проверкой прав)
+@app.route('/student/starosta')
+def student_starosta():
+    if g.user['user_type'] != 'student':
+        return redirect(url_for('student_login'))
+
+    # Проверяем, является ли студент старостой
+    if g.user['username'] != 'starosta':
+        flash('Доступ только для старосты группы', 'error')
+        return redirect(url_for('student_dashboard'))
+
+    students = starosta_module.get_students_data('ПИ-21')
+    reports = starosta_module.get_reports_data()
+    info = starosta_module.get_info_for_headman()
+    messages = starosta_module.get_messages(message_address(g.user))
+
+    return render_template('starosta.html',
+                           user=g.user['name'],
+                           role='student',
+                           students=students,
+                           reports=reports,
+                           info=info,
+                           messages=messages['messages'],
+                           messages_cursor=messages['next_cursor'],
+                           unread=starosta_module.get_unread_count(message_address(g.user)))
+
+
+def message_address(user):
+    """Адрес пользователя в мессенджере: у старосты - должность с группой"""
+    if user['username'] == 'starosta':
+        return 'Староста ПИ-21'
+    return user['name']
+
+
+# Мессенджер: входящие текущего пользователя (?cursor=&limit=) и отправка
+@app.route('/api/messages', methods=['GET', 'POST'])
+def messages_api():
+    address = message_address(g.user)
+    if request.method == 'POST':
+        data = request.json or {}
+        if not data.get('to') or not data.get('message'):
+            return jsonify({'success': False, 'message': 'Укажите получателя и текст'}), 400
+        result = starosta_module.send_message(address, data['to'], data.get('subject', ''), data['message'],
+                                              can_broadcast=g.user['user_type'] == 'admin')
+        return jsonify(result), 200 if result['success'] else 403
+
+    page = starosta_module.get_messages(address, request.args.get('cursor', type=int),
+                                        max(1, min(request.args.get('limit', default=20, type=int), 100)))
+    return jsonify({**page, 'unread': starosta_module.get_unread_count(address)})
+
+
+# Переписка текущего пользователя с собеседником: ?with=адрес[&cursor=&limit=]
+@app.route('/api/messages/conversation')
+def messages_conversation():
+    other = request.args.get('with')
+    if not other:
+        return jsonify({'error': 'Укажите собеседника'}), 400
+    page = starosta_module.get_conversation(message_address(g.user), other,
+                                            request.args.get('cursor', type=int),
+                                            max(1, min(request.args.get('limit', default=20, type=int), 100)))
+    return jsonify(page)
+
+
+# Поток событий (SSE): ?topics=schedule,messages; продолжение по Last-Event-ID
+@app.route('/api/events')
+def events_stream():
+    requested = request.args.get('topics', 'schedule,messages').split(',')
+    topics = []
+    if 'schedule' in requested:
+        topics.append('schedule')
+    if 'messages' in requested:
+        address = message_address(g.user)
+        topics.append(f'messages:{address}')
+        topics += [f'messages:{channel}' for channel in starosta_module.messages.get_channels(address)]
+    if not topics:
+        return jsonify({'error': 'Неизвестные темы'}), 400
+
+    # EventSource передает Last-Event-ID заголовком только при переподключении
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    response = app.response_class(event_broker.stream(topics, last_event_id), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx не должен буферизовать поток
+    return response
+
+
+# Отметить прочитанными: {'ids': [...]} или {'all': true}
+@app.route('/api/messages/read', methods=['POST'])
+def messages_read():
+    address = message_address(g.user)
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Ожидается объект JSON'}), 400
+    ids = None if data.get('all') else data.get('ids', [])
+    try:
+        marked = starosta_module.mark_messages_read(address, ids)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    return jsonify({'marked': marked, 'unread': starosta_module.get_unread_count(address)})
+
+
+@app.route('/student/raspisanie')
+def student_raspisanie():
+    if g.user['user_type'] != 'student':
+        return redirect(url_for('student_login'))
+
+    course = request.args.get('course', default=1, type=int)
+    if course not in SCHEDULE_COURSES:
+        abort(404)
+    version = schedule_module.version
+    # Страница содержит имя пользователя, поэтому он тоже входит в ETag
+    etag = f'raspisanie-{course}-{version}-{g.user["id"]}'
+
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = make_response(render_template('raspisanie.html',
+                                                 user=g.user['name'],
+                                                 role='student',
+                                                 schedule_html=render_schedule_fragment(course, version),
+                                                 course=course,
+                                                 version=version))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def render_schedule_fragment(course, version):
+    """Отрисованное расписание курса из кэша (course, version)"""
+    global schedule_fragment_cache
+    cached_version, fragments = schedule_fragment_cache
+    html = fragments.get(course) if cached_version == version else None
+    if html is None:
+        # Рисуем без блокировки: одновременные промахи просто отрисуют дважды
+        html = Markup(render_template('_raspisanie_schedule.html',
+                                      schedule=schedule_module.get_schedule(course),
+                                      days=schedule_module.get_course_days(course),
+                                      exams=schedule_module.get_exams_schedule(course),
+                                      current_course=course,
+                                      courses=SCHEDULE_COURSES))
+        with schedule_fragment_lock:
+            cached_version, fragments = schedule_fragment_cache
+            if version > cached_version:
+                # Расписание изменилось - старые версии больше не нужны
+                schedule_fragment_cache = (version, {course: html})
+            elif version == cached_version:
+                schedule_fragment_cache = (version, {**fragments, course: html})
+    return html
+
+# Поиск по расписанию: неделя преподавателя, занятость аудитории, занятия по предмету
+@app.route('/api/schedule/teacher/<teacher>')
+def schedule_by_teacher(teacher):
+    week = schedule_module.get_teacher_schedule(teacher)
+    # Списком, чтобы сохранить порядок дней недели
+    return jsonify({'teacher': teacher,
+                    'week': [{'day': day, 'lessons': lessons} for day, lessons in week.items()]})
+
+
+@app.route('/api/schedule/room/<room>')
+def schedule_by_room(room):
+    day = request.args.get('day')
+    return jsonify({'room': room, 'day': day, 'lessons': schedule_module.get_room_schedule(room, day)})
+
+
+@app.route('/api/schedule/subject/<subject>')
+def schedule_by_subject(subject):
+    return jsonify({'subject': subject, 'lessons': schedule_module.get_subject_lessons(subject)})
+
+
+# Правки расписания после версии клиента: ?since=N[&course=K]
+@app.route('/api/schedule/changes')
+def schedule_changes():
+    since = request.args.get('since', type=int)
+    if since is None:
+        return jsonify({'error': 'Укажите версию since'}), 400
+    return jsonify(schedule_module.get_changes(since, request.args.get('course', type=int)))
+
+
+# Свободные аудитории на паре: ?day=Среда&pair=2&capacity=25
+@app.route('/api/schedule/free-rooms')
+def free_rooms():
+    day = request.args.get('day')
+    pair = request.args.get('pair', type=int)
+    if day not in DAYS or pair is None or not 1 <= pair <= len(PAIRS):
+        return jsonify({'error': f'Укажите день недели и номер пары от 1 до {len(PAIRS)}'}), 400
+    capacity = request.args.get('capacity', default=0, type=int)
+    return jsonify({'day': day, 'pair': pair, 'rooms': occupancy.free_rooms(day, pair, capacity)})
+
+
+# Первая пара недели, свободная у группы (или курса), преподавателя и аудитории
+@app.route('/api/schedule/free-slot')
+def free_slot():
+    course = request.args.get('course', type=int)
+    if request.args.get('group'):
+        course = schedule_module.get_course_by_group(request.args['group'])
+        if course is None:
+            return jsonify({'error': 'Группа не найдена'}), 404
+    teacher = request.args.get('teacher')
+    room = request.args.get('room')
+    if course is None and not teacher and not room:
+        return jsonify({'error': 'Укажите группу, курс, преподавателя или аудиторию'}), 400
+    days = request.args.getlist('day') or None
+    if days and any(day not in DAYS for day in days):
+        return jsonify({'error': 'Неизвестный день недели'}), 400
+    return jsonify({'slot': occupancy.first_common_free_slot(course, teacher, room, days)})
+
+
+# Календарь экзаменов всех курсов: ?days=N, ?date=ДД.ММ.ГГГГ или ?teacher=...
+@app.route('/api/exams')
+def exams_calendar():
+    try:
+        if request.args.get('date'):
+            exams = schedule_module.get_exams_on(request.args['date'])
+        elif request.args.get('teacher'):
+            exams = schedule_module.get_exams_by_teacher(request.args['teacher'])
+        else:
+            exams = schedule_module.get_upcoming_exams(request.args.get('days', default=14, type=int))
+    except ValueError:
+        return jsonify({'error': 'Дата должна быть в формате ДД.ММ.ГГГГ'}), 400
+    return jsonify({'exams': exams})
+
+
+# Подписка на расписание в календаре телефона (.ics)
+# Публичные: календарные приложения не передают cookie сессии
+@app.route('/calendar/course/<int:course>.ics')
+@public
+def calendar_course(course):
+    return calendar_response('course', course)
+
+
+@app.route('/calendar/group/<group>.ics')
+@public
+def calendar_group(group):
+    course = schedule_module.get_course_by_group(group)
+    if course is None:
+        abort(404)
+    return calendar_response('course', course)
+
+
+@app.route('/calendar/teacher/<teacher>.ics')
+@public
+def calendar_teacher(teacher):
+    return calendar_response('teacher', teacher)
+
+
+def calendar_response(kind, value):
+    """Потоковая отдача ленты с поддержкой If-None-Match; 404 для неизвестного курса или преподавателя"""
+    feed = calendar_feeds.get_feed(kind, value)
+    if feed is None:
+        abort(404)
+    etag, chunks = feed
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(chunks, mimetype='text/calendar')
+        response.headers['Content-Disposition'] = 'inline; filename="raspisanie.ics"'
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=900'
+    return response
+
+# Посещаемость группы: итоги (?threshold=N - только ниже порога) и отметка пары
+@app.route('/starosta/attendance/<group>', methods=['GET', 'POST'])
+def attendance_api(group):
+    if g.user['user_type'] != 'admin' and g.user['username'] != 'starosta':
+        return jsonify({'error': 'Доступ запрещен'}), 403
+    store = starosta_module.attendance
+    if group not in store.get_groups():
+        return jsonify({'error': 'Группа не найдена'}), 404
+
+    if request.method == 'POST':
+        data = request.json or {}
+        if not data.get('date') or not data.get('subject'):
+            return jsonify({'success': False, 'message': 'Укажите дату и предмет'}), 400
+        number = store.mark_lesson(group, data['date'], data['subject'], data.get('present', []))
+        return jsonify({'success': True, 'lesson': number})
+
+    return jsonify(store.get_summary(group, request.args.get('threshold', type=float)))
+
+
+# Выгрузка посещаемости: ?format=csv|xlsx|zip[&group=ПИ-21]; без группы - все группы
+@app.route('/starosta/attendance/export')
+def attendance_export():
+    if g.user['user_type'] != 'admin' and g.user['username'] != 'starosta':
+        abort(403)
+
+    store = starosta_module.attendance
+    group = request.args.get('group')
+    if group and group not in store.get_groups():
+        abort(404)
+    groups = [group] if group else store.get_groups()
+    export_format = request.args.get('format', 'csv')
+    if export_format not in FORMATS:
+        abort(400)
+    mimetype, extension = FORMATS[export_format]
+    filename = f'poseshchaemost-{group or "vse"}.{extension}'
+
+    # Таблицы строятся построчно по мере отдачи ответа
+    response = app.response_class(iter_attendance(store, groups, export_format, titled=not group),
+                                  mimetype=mimetype)
+    response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    return response
+
+
+# Добавьте остальные маршруты для студента...
+
+
+# Маршруты для преподавателя
+@app.route('/teacher/prepodavateli')
+def teacher_prepodavateli():
+    if g.user['user_type'] != 'teacher':
+        return redirect(url_for('teacher_login'))
+
+    # Только первая страница справочника - остальное подгружается через /api/teachers
+    page = teachers_module.list_teachers(limit=TEACHERS_PAGE_SIZE)
+    contacts = [{'id': teacher['id'], 'name': teacher['name']} for teacher in teachers_module.get_all_teachers()]
+
+    return render_template('prepodavateli.html',
+                           user=g.user['name'],
+                           role='teacher',
+                           teachers=page['teachers'],
+                           next_cursor=page['next_cursor'],
+                           contacts=contacts,
+                           departments=teachers_module.get_departments())
+
+# Справочник преподавателей: ?department=&subject=&position=&cursor=&limit=N
+@app.route('/api/teachers')
+def teachers_directory():
+    try:
+        page = teachers_module.list_teachers(
+            department=request.args.get('department'),
+            subject=request.args.get('subject'),
+            position=request.args.get('position'),
+            cursor=request.args.get('cursor'),
+            limit=min(request.args.get('limit', default=TEACHERS_PAGE_SIZE, type=int), 100)
+        )
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    return jsonify(page)
+
+
+@app.route('/api/admin/teachers', methods=['POST', 'PUT', 'DELETE'])
+def admin_teachers():
+    if g.user['user_type'] != 'admin':
+        return jsonify({'error': 'Доступ запрещен'}), 403
+
+    data = request.json or {}
+    if request.method == 'POST':
+        result = teachers_module.add_teacher(data.get('teacher', {}))
+    elif request.method == 'PUT':
+        result = teachers_module.update_teacher(data.get('id'), data.get('teacher', {}))
+    else:
+        result = teachers_module.remove_teacher(data.get('id'))
+    return jsonify(result), 200 if result['success'] else 400
+
+
+# Консультации: идущие сейчас или оставшиеся на неделе по предмету (?subject=...)
+@app.route('/api/consultations')
+def consultations_api():
+    if request.args.get('subject'):
+        return jsonify({'consultations': consultations.subject_slots(request.args['subject'])})
+    return jsonify({'consultations': consultations.consulting_now()})
+
+
+@app.route('/api/teachers/<int:teacher_id>/week')
+def teacher_week(teacher_id):
+    week = consultations.get_week(teacher_id)
+    if week is None:
+        return jsonify({'error': 'Преподаватель не найден'}), 404
+    return jsonify({'week': [{'day': day, 'items': items} for day, items in week.items()],
+                    'next_free': consultations.next_free(teacher_id)})
+
+
+@app.route('/api/teachers/<int:teacher_id>/workload')
+def teacher_workload(teacher_id):
+    workload = teacher_resolver.get_workload(teacher_id)
+    if workload is None:
+        return jsonify({'error': 'Преподаватель не найден'}), 404
+    return jsonify(workload)
+
+
+# Преподаватели из расписания, которых нельзя однозначно найти в справочнике
+@app.route('/api/admin/teachers/resolution')
+def admin_teacher_resolution():
+    if g.user['user_type'] != 'admin':
+        return jsonify({'error': 'Доступ запрещен'}), 403
+    return jsonify(teacher_resolver.report())
+
+
+# Поиск по справочнику преподавателей: ?q=...&limit=N
+@app.route('/api/teachers/search')
+def teachers_search():
+    query = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', default=20, type=int), 100))
+    if not query.strip():
+        return jsonify({'query': query, 'teachers': teachers_module.get_all_teachers()[:limit]})
+    return jsonify({'query': query, 'teachers': teachers_module.search_teachers(query, limit)})
+
+
+@app.route('/api/teachers/suggest')
+def teachers_suggest():
+    query = request.args.get('q', '')
+    return jsonify({'suggestions': teachers_module.suggest_teachers(query),
+                    'completions': teachers_module.complete_query(query)})
+
+# Добавьте остальные маршруты для преподавателя...
+
+
+# Маршруты для администратора
+@app.route('/admin/manage_users')
+def admin_manage_users():
+    if g.user['user_type'] != 'admin':
+        return redirect(url_for('admin_login'))
+
+    # Только первые страницы - остальное подгружается через /api/admin/users
+    students = auth_module.list_users('student', limit=USERS_PAGE_SIZE)
+    teachers = auth_module.list_users('teacher', limit=USERS_PAGE_SIZE)
+    admins = auth_module.list_users('admin', limit=USERS_PAGE_SIZE)
+
+    return render_template('manage_users.html',
+                           user=g.user,
+                           students=students['users'],
+                           teachers=teachers['users'],
+                           admins=admins['users'],
+                           students_cursor=students['next_cursor'],
+                           teachers_cursor=teachers['next_cursor'],
+                           admins_cursor=admins['next_cursor'])
+
+
+@app.route('/api/admin/users')
+def admin_users_api():
+    if g.user['user_type'] != 'admin':
+        return jsonify({'error': 'Доступ запрещен'}), 403
+
+    verified = request.args.get('verified')
+    try:
+        page = auth_module.list_users(
+            request.args.get('user_type'),
+            group=request.args.get('group'),
+            course=request.args.get('course', type=int),
+            verified=None if verified is None else verified in ('1', 'true'),
+            created_from=request.args.get('created_from'),
+            created_to=request.args.get('created_to'),
+            sort=request.args.get('sort', 'id'),
+            order=request.args.get('order', 'asc'),
+            cursor=request.args.get('cursor'),
+            limit=max(1, min(request.args.get('limit', default=USERS_PAGE_SIZE, type=int), 200))
+        )
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+
+    users = [{k: v for k, v in u.items() if k != 'password'} for u in page['users']]
+    return jsonify({'users': users, 'next_cursor': page['next_cursor']})
+
+# Загрузка файла расписания (CSV/XLSX)
+@app.route('/admin/schedule/import', methods=['POST'])
+def admin_schedule_import():
+    if g.user['user_type'] != 'admin':
+        return jsonify({'error': 'Доступ запрещен'}), 403
+
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'success': False, 'message': 'Файл не выбран', 'errors': []}), 400
+
+    result = schedule_importer.import_file(upload.stream, upload.filename)
+    return jsonify(result), 200 if result['success'] else 400
+
+
+# Редактирование отдельного занятия с проверкой накладок
+@app.route('/api/admin/schedule/lesson', methods=['POST', 'PUT', 'DELETE'])
+def admin_schedule_lesson():
+    if g.user['user_type'] != 'admin':
+        return jsonify({'error': 'Доступ запрещен'}), 403
+
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'message': 'Ожидается объект JSON'}), 400
+    try:
+        course = int(data.get('course'))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Не указан курс'}), 400
+    day = data.get('day')
+    force = bool(data.get('force'))
+
+    if request.method == 'POST':
+        result = schedule_module.add_lesson(course, day, data.get('lesson', {}), force=force)
+    elif request.method == 'PUT':
+        result = schedule_module.update_lesson(course, day, data.get('time'), data.get('lesson', {}),
+                                               force=force)
+    else:
+        result = schedule_module.remove_lesson(course, day, data.get('time'))
+
+    if result['success']:
+        return jsonify(result)
+    return jsonify(result), 409 if result.get('conflicts') else 400
+
+
+@app.route('/api/admin/schedule/conflicts')
+def admin_schedule_conflicts():
+    if g.user['user_type'] != 'admin':
+        return jsonify({'error': 'Доступ запрещен'}), 403
+
+    return jsonify({'conflicts': schedule_module.get_conflicts(), 'version': schedule_module.version})
+
+# Добавьте остальные маршруты для администратора...
+
+
+if __name__ == '__main__':
+    app.run(debug=True, host='0.0.0.0', port=5000)
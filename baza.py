@@ -0,0 +1,369 @@
+"""
+Модуль хранения пользователей, сессий и кодов подтверждения в SQLite
+"""
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from kursor import decode_cursor, encode_cursor
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    password TEXT NOT NULL,
+    name TEXT NOT NULL,
+    user_type TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone TEXT,
+    verified INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    group_name TEXT,
+    course INTEGER,
+    department TEXT,
+    position TEXT
+);
+-- Логин и email уникальны в пределах типа пользователя: проверка при
+-- регистрации может опоздать, если пишут несколько процессов
+DROP INDEX IF EXISTS users_username;
+DROP INDEX IF EXISTS users_email;
+CREATE UNIQUE INDEX IF NOT EXISTS users_username_unique ON users (username, user_type);
+CREATE UNIQUE INDEX IF NOT EXISTS users_email_unique ON users (email, user_type);
+CREATE INDEX IF NOT EXISTS users_phone ON users (phone, user_type);
+CREATE INDEX IF NOT EXISTS users_type ON users (user_type, id);
+CREATE INDEX IF NOT EXISTS users_type_created ON users (user_type, created_at, id);
+CREATE INDEX IF NOT EXISTS users_type_name ON users (user_type, name, id);
+CREATE INDEX IF NOT EXISTS users_group ON users (group_name, user_type, id);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_activity REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_user ON sessions (user_id, created_at);
+CREATE INDEX IF NOT EXISTS sessions_activity ON sessions (last_activity);
+
+CREATE TABLE IF NOT EXISTS verification_codes (
+    identifier TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+'''
+
+# Поля пользователя, которые хранятся в отдельных колонках
+USER_COLUMNS = ('id', 'username', 'password', 'name', 'user_type', 'email', 'phone',
+                'verified', 'created_at', 'group_name', 'course', 'department', 'position')
+# Ключ в словаре пользователя -> колонка таблицы
+USER_FIELD_COLUMNS = {'group': 'group_name'}
+USER_COLUMN_FIELDS = {column: field for field, column in USER_FIELD_COLUMNS.items()}
+OPTIONAL_COLUMNS = ('group_name', 'course', 'department', 'position')
+SORT_COLUMNS = ('id', 'created_at', 'name')
+SORT_TYPES = {'id': int, 'created_at': str, 'name': str}  # тип значения сортировки в курсоре
+UNIQUE_FIELDS = ('username', 'email')
+
+
+class UserExistsError(ValueError):
+    """Логин или email уже занят пользователем того же типа"""
+
+    LABELS = {'username': 'логином', 'email': 'email'}
+
+    def __init__(self, field):
+        super().__init__(f'Пользователь с таким {self.LABELS.get(field, field)} уже существует')
+        self.field = field
+
+
+class SQLiteStorage:
+    """Подключение к SQLite в режиме WAL с отдельным соединением на поток"""
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        with self.transaction() as connection:
+            connection.executescript(SCHEMA)
+
+    def connection(self):
+        """Получить соединение текущего потока"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            # Кэш подготовленных выражений - запросы ниже используют постоянный текст SQL
+            connection = sqlite3.connect(self.path, cached_statements=256)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('PRAGMA busy_timeout=5000')
+            self.local.connection = connection
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        """Транзакция: фиксация при успехе, откат при ошибке"""
+        connection = self.connection()
+        with connection:
+            yield connection
+
+    def close(self):
+        """Закрыть соединение текущего потока"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+
+class SQLiteUserRegistry:
+    """Реестр пользователей в SQLite с тем же интерфейсом, что и UserRegistry"""
+
+    INDEXED_FIELDS = ('username', 'email', 'phone')
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def __iter__(self):
+        rows = self.storage.connection().execute('SELECT * FROM users ORDER BY id')
+        return (self._to_user(row) for row in rows)
+
+    def __len__(self):
+        return self.storage.connection().execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+    def next_id(self):
+        """Получить следующий свободный ID"""
+        row = self.storage.connection().execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'users'").fetchone()
+        return (row[0] if row else 0) + 1
+
+    def add(self, user):
+        """Добавить пользователя одной транзакцией. UserExistsError - логин или email заняты"""
+        values = self._to_row(user)
+        columns = [c for c in USER_COLUMNS if c in values]
+        sql = 'INSERT INTO users ({}) VALUES ({})'.format(
+            ', '.join(columns), ', '.join('?' * len(columns)))
+        try:
+            with self.storage.transaction() as connection:
+                cursor = connection.execute(sql, [values[c] for c in columns])
+        except sqlite3.IntegrityError as error:
+            # Текст ошибки: 'UNIQUE constraint failed: users.username, users.user_type'
+            field = next((f for f in UNIQUE_FIELDS if f'users.{f}' in str(error)), None)
+            if field is None:
+                raise
+            raise UserExistsError(field) from error
+        user['id'] = cursor.lastrowid
+        return user
+
+    def update(self, user, **fields):
+        """Обновить поля пользователя"""
+        values = self._to_row(fields)
+        assignments = ', '.join(f'{column} = ?' for column in values)
+        with self.storage.transaction() as connection:
+            connection.execute(f'UPDATE users SET {assignments} WHERE id = ?',
+                               [*values.values(), user['id']])
+        user.update(fields)
+        return user
+
+    def get(self, user_id):
+        """Получить пользователя по ID"""
+        row = self.storage.connection().execute(
+            'SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+        return self._to_user(row) if row else None
+
+    def find(self, field, value, user_type=None):
+        """Найти пользователя по индексируемому полю"""
+        if not value or field not in self.INDEXED_FIELDS:
+            return None
+        connection = self.storage.connection()
+        if user_type:
+            row = connection.execute(
+                f'SELECT * FROM users WHERE {field} = ? AND user_type = ? ORDER BY id LIMIT 1',
+                (value, user_type)).fetchone()
+        else:
+            row = connection.execute(
+                f'SELECT * FROM users WHERE {field} = ? ORDER BY id LIMIT 1', (value,)).fetchone()
+        return self._to_user(row) if row else None
+
+    def find_by_identifier(self, identifier, user_type=None, fields=INDEXED_FIELDS):
+        """Найти пользователя по логину, email или телефону"""
+        for field in fields:
+            user = self.find(field, identifier, user_type)
+            if user:
+                return user
+        return None
+
+    def get_by_type(self, user_type):
+        """Получить всех пользователей определенного типа"""
+        rows = self.storage.connection().execute(
+            'SELECT * FROM users WHERE user_type = ? ORDER BY id', (user_type,))
+        return [self._to_user(row) for row in rows]
+
+    def list_users(self, user_type=None, group=None, course=None, verified=None,
+                   created_from=None, created_to=None, sort='id', order='asc',
+                   cursor=None, limit=50):
+        """Страница пользователей с фильтрами и курсором (created_to не включается)"""
+        if sort not in SORT_COLUMNS or order not in ('asc', 'desc'):
+            raise ValueError('Неизвестный порядок сортировки')
+        limit = max(1, limit)
+
+        conditions, params = [], []
+        for condition, value in (('user_type = ?', user_type), ('group_name = ?', group),
+                                 ('course = ?', course), ('created_at >= ?', created_from),
+                                 ('created_at < ?', created_to)):
+            if value:
+                conditions.append(condition)
+                params.append(value)
+        if verified is not None:
+            conditions.append('verified = ?')
+            params.append(int(verified))
+        if cursor:
+            conditions.append(f'({sort}, id) {"<" if order == "desc" else ">"} (?, ?)')
+            params.extend(decode_cursor(cursor, SORT_TYPES[sort]))
+
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        direction = order.upper()
+        rows = self.storage.connection().execute(
+            f'SELECT * FROM users{where} ORDER BY {sort} {direction}, id {direction} LIMIT ?',
+            [*params, limit + 1]).fetchall()
+
+        users = [self._to_user(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor([users[-1][sort], users[-1]['id']])
+        return {'users': users, 'next_cursor': next_cursor}
+
+    @staticmethod
+    def _to_row(user):
+        values = {}
+        for key, value in user.items():
+            column = USER_FIELD_COLUMNS.get(key, key)
+            if column in USER_COLUMNS:
+                values[column] = int(value) if column == 'verified' else value
+        return values
+
+    @staticmethod
+    def _to_user(row):
+        user = {}
+        for column in USER_COLUMNS:
+            value = row[column]
+            if column in OPTIONAL_COLUMNS and value is None:
+                continue
+            user[USER_COLUMN_FIELDS.get(column, column)] = value
+        user['verified'] = bool(user['verified'])
+        return user
+
+
+class SQLiteSessionStore:
+    """Хранилище сессий в SQLite с тем же интерфейсом, что и SessionStore"""
+
+    def __init__(self, storage, idle_timeout=1800, max_per_user=5):
+        self.storage = storage
+        self.idle_timeout = idle_timeout
+        self.max_per_user = max_per_user
+        self.expired_count = 0
+        self.evicted_count = 0
+        self.sweeper = None
+
+    def __contains__(self, session_id):
+        row = self.storage.connection().execute(
+            'SELECT 1 FROM sessions WHERE id = ?', (session_id,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self.storage.connection().execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    def create(self, user_id):
+        """Создать сессию, вытесняя самые старые сверх лимита на пользователя"""
+        session_id = secrets.token_hex(32)
+        now = time.time()
+        with self.storage.transaction() as connection:
+            connection.execute(
+                'INSERT INTO sessions (id, user_id, created_at, last_activity) VALUES (?, ?, ?, ?)',
+                (session_id, user_id, now, now))
+            cursor = connection.execute(
+                'DELETE FROM sessions WHERE id IN ('
+                'SELECT id FROM sessions WHERE user_id = ? '
+                'ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+                (user_id, self.max_per_user))
+        self.evicted_count += cursor.rowcount
+        return session_id
+
+    def validate(self, session_id):
+        """Проверить сессию и продлить ее. Возвращает user_id или None"""
+        now = time.time()
+        with self.storage.transaction() as connection:
+            cursor = connection.execute(
+                'UPDATE sessions SET last_activity = ? WHERE id = ? AND last_activity > ?',
+                (now, session_id, now - self.idle_timeout))
+            if cursor.rowcount:
+                row = connection.execute(
+                    'SELECT user_id FROM sessions WHERE id = ?', (session_id,)).fetchone()
+                return row[0]
+            # Сессия истекла
+            cursor = connection.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+        self.expired_count += cursor.rowcount
+        return None
+
+    def delete(self, session_id):
+        """Удалить сессию"""
+        with self.storage.transaction() as connection:
+            connection.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+
+    def sweep(self, limit=None):
+        """Удалить истекшие сессии (не более limit за вызов)"""
+        with self.storage.transaction() as connection:
+            cursor = connection.execute(
+                'DELETE FROM sessions WHERE id IN ('
+                'SELECT id FROM sessions WHERE last_activity <= ? ORDER BY last_activity LIMIT ?)',
+                (time.time() - self.idle_timeout, -1 if limit is None else limit))
+        self.expired_count += cursor.rowcount
+        return cursor.rowcount
+
+    def get_stats(self):
+        """Количество живых, истекших и вытесненных сессий"""
+        return {
+            'live': len(self),
+            'expired': self.expired_count,
+            'evicted': self.evicted_count
+        }
+
+    def start_sweeper(self, interval=60):
+        """Запустить фоновую очистку истекших сессий"""
+        if self.sweeper:
+            return self.sweeper
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.sweep()
+
+        self.sweeper = threading.Thread(target=run, name='session-sweeper', daemon=True)
+        self.sweeper.start()
+        return self.sweeper
+
+
+class SQLiteCodeStore:
+    """Коды подтверждения в SQLite (интерфейс словаря)"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def __contains__(self, identifier):
+        row = self.storage.connection().execute(
+            'SELECT 1 FROM verification_codes WHERE identifier = ?', (identifier,)).fetchone()
+        return row is not None
+
+    def __getitem__(self, identifier):
+        row = self.storage.connection().execute(
+            'SELECT data FROM verification_codes WHERE identifier = ?', (identifier,)).fetchone()
+        if row is None:
+            raise KeyError(identifier)
+        return json.loads(row[0])
+
+    def __setitem__(self, identifier, verification):
+        with self.storage.transaction() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO verification_codes (identifier, data) VALUES (?, ?)',
+                (identifier, json.dumps(verification)))
+
+    def __delitem__(self, identifier):
+        with self.storage.transaction() as connection:
+            connection.execute('DELETE FROM verification_codes WHERE identifier = ?', (identifier,))
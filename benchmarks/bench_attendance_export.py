@@ -0,0 +1,73 @@
+"""
+Бенчмарк выгрузки посещаемости за семестр: CSV, XLSX и ZIP по частям
+
+Запуск: python benchmarks/bench_attendance_export.py [--groups 400] [--students 25] [--lessons 100]
+Выгрузка всех групп колледжа тем же путем, что и /starosta/attendance/export.
+Пик памяти меряется только на время выгрузки: при потоковой отдаче он
+не должен расти вместе с размером файла
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eksport import FORMATS, iter_attendance  # noqa: E402
+from poseshchaemost import AttendanceStore  # noqa: E402
+
+SUBJECTS = ['Математика', 'Физика', 'Информатика', 'История', 'Базы данных', 'Сети', 'Экономика']
+
+
+def make_store(groups, students, lessons):
+    """Группы по students человек, lessons занятий; каждый пропускает ~15% пар"""
+    rng = random.Random(1)
+    store = AttendanceStore()
+    for group_number in range(groups):
+        group = f'ГР-{group_number:03d}'
+        ids = [group_number * students + number for number in range(students)]
+        for student_id in ids:
+            store.add_student(group, {'id': student_id, 'name': f'Студент {student_id} Иванович',
+                                      'student_id': f'{student_id:08d}'})
+        for lesson in range(lessons):
+            present = [student_id for student_id in ids if rng.random() > 0.15]
+            store.mark_lesson(group, f'2026-{9 + lesson // 40:02d}-{lesson % 28 + 1:02d}',
+                              SUBJECTS[lesson % len(SUBJECTS)], present)
+    return store
+
+
+def measure(store, groups, export_format):
+    """(байт, наибольшая часть, пик памяти, секунды) - части читаются и отбрасываются, как при отдаче"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    total = largest = 0
+    for chunk in iter_attendance(store, groups, export_format):
+        total += len(chunk)
+        largest = max(largest, len(chunk))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, largest, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--groups', type=int, default=400)
+    parser.add_argument('--students', type=int, default=25)
+    parser.add_argument('--lessons', type=int, default=100)
+    args = parser.parse_args()
+
+    store = make_store(args.groups, args.students, args.lessons)
+    groups = store.get_groups()
+    print(f'{args.groups * args.students} студентов ({args.groups} групп), {args.lessons} занятий в семестре')
+    print(f'{"формат":<7} {"файл, МБ":>9} {"часть, КБ":>10} {"пик, МБ":>8} {"время, с":>9}')
+    for export_format in FORMATS:
+        total, largest, peak, elapsed = measure(store, groups, export_format)
+        print(f'{export_format:<7} {total / 2 ** 20:>9.1f} {largest / 2 ** 10:>10.0f} '
+              f'{peak / 2 ** 20:>8.1f} {elapsed:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
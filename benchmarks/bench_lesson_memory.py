@@ -0,0 +1,69 @@
+"""
+Бенчмарк памяти расписания: словари занятий против Lesson с интернированными строками
+
+Запуск: python benchmarks/bench_lesson_memory.py [--groups 300] [--semesters 8]
+Расписание колледжа: группы x 6 дней x 6 пар x семестры истории. Строки
+создаются заново для каждого занятия, как при чтении из файла или базы
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rasp import DAYS, compact_schedule  # noqa: E402
+from zanyatost import PAIRS  # noqa: E402
+from vremya import format_time_range  # noqa: E402
+
+SUBJECTS = ['Математика', 'Физика', 'Информатика', 'История', 'Базы данных', 'Сети', 'Экономика']
+
+
+def make_schedule(groups, semesters):
+    """{курс: {день: [словарь занятия]}}; курс здесь - группа в семестре"""
+    schedule = {}
+    for course in range(groups * semesters):
+        schedule[course] = {
+            day: [{
+                # ''.join - отдельный объект строки, как после разбора входных данных
+                'time': ''.join(format_time_range(start, end)),
+                'subject': ''.join(SUBJECTS[(course + pair) % len(SUBJECTS)]),
+                'teacher': ''.join(f'Преподаватель{(course * 7 + pair) % 400} А.Б.'),
+                'room': ''.join(str(100 + (course + pair * 3) % 300)),
+            } for pair, (start, end) in enumerate(PAIRS)]
+            for day in DAYS
+        }
+    return schedule
+
+
+def measure(build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--groups', type=int, default=300)
+    parser.add_argument('--semesters', type=int, default=8)
+    args = parser.parse_args()
+
+    dicts, dict_size, dict_time = measure(lambda: make_schedule(args.groups, args.semesters))
+    lessons = sum(len(day) for days in dicts.values() for day in days.values())
+    # Словари уже построены: отдельно меряем только компактную копию
+    compact, compact_size, compact_time = measure(lambda: compact_schedule(dicts))
+    assert compact[0][DAYS[0]][0].to_dict() == dicts[0][DAYS[0]][0]
+
+    print(f'{lessons} занятий ({args.groups} групп x {args.semesters} семестров)')
+    print(f'{"":<10} {"МБ":>8} {"байт/занятие":>13} {"сборка, с":>10}')
+    for name, size, elapsed in (('словари', dict_size, dict_time), ('Lesson', compact_size, compact_time)):
+        print(f'{name:<10} {size / 2 ** 20:>8.1f} {size / lessons:>13.0f} {elapsed:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Бенчмарк входа при медленной KDF: проверок пароля в секунду при разном размере пула
+
+Запуск: python benchmarks/bench_password_pool.py [--workers 0 1 2 4] [--iterations 260000]
+Параллельные запросы имитирует пул потоков; workers=0 - проверка в потоке запроса
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vxod import PasswordHasher, PasswordHasherBusy  # noqa: E402
+
+
+def run(workers, iterations, logins, clients):
+    hasher = PasswordHasher('pbkdf2_sha256', (iterations,), workers=workers,
+                            max_queue=clients, queue_timeout=60)
+    hashed = hasher.hash('password123')  # заодно запускает процессы пула
+    busy = 0
+
+    def login(_):
+        nonlocal busy
+        try:
+            return hasher.verify('password123', hashed)
+        except PasswordHasherBusy:
+            busy += 1
+            return False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as requests:
+        results = list(requests.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+    assert all(results) or busy
+    return logins / elapsed, busy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({0, 1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--iterations', type=int, default=PasswordHasher.DEFAULT_PARAMS['pbkdf2_sha256'][0])
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--clients', type=int, default=32, help='одновременных запросов')
+    args = parser.parse_args()
+
+    print(f'pbkdf2_sha256, {args.iterations} итераций, {args.logins} входов, {args.clients} клиентов')
+    print(f'{"процессов":>10} {"входов/с":>10} {"отказов":>8}')
+    for workers in args.workers:
+        rate, busy = run(workers, args.iterations, args.logins, args.clients)
+        print(f'{workers or "в потоке":>10} {rate:>10.1f} {busy:>8}')
+
+
+if __name__ == '__main__':
+    main()
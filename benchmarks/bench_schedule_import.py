@@ -0,0 +1,85 @@
+"""
+Бенчмарк импорта расписания: 50 тысяч строк CSV и XLSX
+
+Запуск: python benchmarks/bench_schedule_import.py [--rows 50000] [--no-xlsx]
+Файл генерируется во временный каталог и читается потоково, как загрузка администратора
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rasp import DAYS, ScheduleModule  # noqa: E402
+from zagruzka import ScheduleImporter  # noqa: E402
+from zanyatost import PAIRS  # noqa: E402
+
+HEADER = ['Курс', 'День', 'Время', 'Предмет', 'Преподаватель', 'Аудитория']
+TEACHERS = 1500
+ROOMS = 1500
+SUBJECTS = ['Математика', 'Физика', 'Информатика', 'История', 'Базы данных', 'Сети', 'Экономика']
+
+
+def iter_rows(count):
+    """Строки расписания колледжа: у каждого курса (группы) все пары недели по очереди.
+
+    Преподаватель и аудитория сдвигаются по кругу от пары к паре, поэтому в одну
+    пару никто не занят дважды, пока курсов не больше преподавателей и аудиторий
+    """
+    slots = [(day, f'{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}')
+             for day in DAYS for start, end in PAIRS]
+    for number in range(count):
+        course, slot = divmod(number, len(slots))
+        day, time_range = slots[slot]
+        yield [course + 1, day, time_range, SUBJECTS[number % len(SUBJECTS)],
+               f'Преподаватель{(course + slot * 7) % TEACHERS} А.Б.', str(100 + (course + slot * 3) % ROOMS)]
+
+
+def write_csv(path, count):
+    with open(path, 'w', encoding='utf-8-sig', newline='') as file:
+        writer = csv.writer(file, delimiter=';')
+        writer.writerow(HEADER)
+        writer.writerows(iter_rows(count))
+
+
+def write_xlsx(path, count):
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(HEADER)
+    for row in iter_rows(count):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def run(path, name):
+    importer = ScheduleImporter(ScheduleModule())
+    started = time.perf_counter()
+    with open(path, 'rb') as stream:
+        result = importer.import_file(stream, name)
+    elapsed = time.perf_counter() - started
+    assert result['success'], result['errors'][:5]
+    return result['rows'], elapsed, len(result['conflicts'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--no-xlsx', action='store_true', help='не проверять XLSX (нужен openpyxl)')
+    args = parser.parse_args()
+
+    formats = [('csv', write_csv)] + ([] if args.no_xlsx else [('xlsx', write_xlsx)])
+    print(f'{"формат":>7} {"строк":>8} {"секунд":>8} {"строк/с":>9} {"накладок":>9}')
+    with tempfile.TemporaryDirectory() as directory:
+        for extension, write in formats:
+            path = os.path.join(directory, f'schedule.{extension}')
+            write(path, args.rows)
+            rows, elapsed, conflicts = run(path, os.path.basename(path))
+            print(f'{extension:>7} {rows:>8} {elapsed:>8.2f} {rows / elapsed:>9.0f} {conflicts:>9}')
+
+
+if __name__ == '__main__':
+    main()
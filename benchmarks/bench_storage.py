@@ -0,0 +1,99 @@
+"""
+Бенчмарк хранилища пользователей: SQLite (WAL) против прежнего списка в памяти
+
+Запуск: python benchmarks/bench_storage.py [--users 8000] [--operations 2000]
+Чтение - поиск по логину, email или телефону (как при входе и регистрации),
+запись - регистрация нового пользователя и подтверждение аккаунта
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from baza import SQLiteStorage, SQLiteUserRegistry  # noqa: E402
+
+
+class ListUsers:
+    """Прежняя реализация: список словарей, поиск перебором, id = len + 1"""
+
+    def __init__(self):
+        self.users = []
+
+    def add(self, user):
+        user['id'] = len(self.users) + 1
+        self.users.append(user)
+        return user
+
+    def find(self, field, value, user_type=None):
+        for user in self.users:
+            if user.get(field) == value and (user_type is None or user['user_type'] == user_type):
+                return user
+        return None
+
+    def update(self, user, **fields):
+        user.update(fields)
+        return user
+
+
+def make_user(number):
+    return {'username': f'student{number}', 'password': 'x', 'name': f'Студент {number}',
+            'user_type': 'student', 'email': f'student{number}@edu.tech', 'phone': f'+7900{number:07d}',
+            'verified': False, 'created_at': '2024-09-01'}
+
+
+def timed(operation, count):
+    """Задержки операций в микросекундах"""
+    latencies = []
+    for number in range(count):
+        started = time.perf_counter()
+        operation(number)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return latencies
+
+
+def report(name, latencies):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f'{name:<28} {statistics.median(latencies):>10.1f} {p99:>10.1f}')
+
+
+def bench(name, registry, users, operations):
+    for number in range(users):
+        registry.add(make_user(number))
+    rng = random.Random(1)
+
+    def read(_):
+        number = rng.randrange(users)
+        field = rng.choice(('username', 'email', 'phone'))
+        assert registry.find(field, make_user(number)[field], 'student')
+
+    def write(number):
+        user = registry.add(make_user(users + number))
+        registry.update(user, verified=True)
+
+    report(f'{name}: чтение', timed(read, operations))
+    report(f'{name}: запись', timed(write, operations))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=8000)
+    parser.add_argument('--operations', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f'{args.users} пользователей, {args.operations} операций, задержка в мкс')
+    print(f'{"":<28} {"медиана":>10} {"p99":>10}')
+    bench('список', ListUsers(), args.users, args.operations)
+    with tempfile.TemporaryDirectory() as directory:
+        storage = SQLiteStorage(os.path.join(directory, 'portal.db'))
+        bench('SQLite', SQLiteUserRegistry(storage), args.users, args.operations)
+        storage.close()
+
+
+if __name__ == '__main__':
+    main()
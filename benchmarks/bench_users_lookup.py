@@ -0,0 +1,70 @@
+"""
+Бенчмарк поиска пользователей: индексы UserRegistry против перебора списка
+
+Запуск: python benchmarks/bench_users_lookup.py [--sizes 1000 8000 64000]
+Время одного поиска по индексу не должно расти вместе с числом пользователей
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vxod import UserRegistry  # noqa: E402
+
+
+def make_users(count):
+    return [{
+        'id': number,
+        'username': f'student{number}',
+        'password': 'x',
+        'name': f'Студент {number}',
+        'user_type': 'student' if number % 10 else 'teacher',
+        'email': f'student{number}@edu.tech',
+        'phone': f'+7900{number:07d}',
+        'verified': True,
+        'created_at': '2024-09-01',
+    } for number in range(1, count + 1)]
+
+
+def scan(users, field, value, user_type):
+    # Как было до индексов: перебор всего списка
+    return next((user for user in users if user.get(field) == value and user['user_type'] == user_type), None)
+
+
+def measure(function, queries, repeat):
+    total = min(timeit.repeat(lambda: [function(*query) for query in queries], number=1, repeat=repeat))
+    return total / len(queries) * 1e6  # мкс на поиск
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 8000, 64000])
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{"пользователей":>14} {"индекс, мкс":>12} {"перебор, мкс":>13}')
+    for size in args.sizes:
+        users = make_users(size)
+        registry = UserRegistry()
+        for user in users:
+            registry.add(dict(user))
+        rng = random.Random(size)
+        queries = []
+        for _ in range(args.queries):
+            user = users[rng.randrange(size)]
+            field = rng.choice(('username', 'email', 'phone'))
+            queries.append((field, user[field], user['user_type']))
+        # Для перебора хватит меньшего числа запросов - он медленный
+        scan_queries = queries[:max(10, args.queries * 1000 // size)]
+        indexed = measure(registry.find, queries, args.repeat)
+        scanned = measure(lambda field, value, user_type: scan(users, field, value, user_type),
+                          scan_queries, args.repeat)
+        print(f'{size:>14} {indexed:>12.2f} {scanned:>13.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Модуль проверки доступности логина, email и телефона при регистрации
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class BloomFilter:
+    """Фильтр Блума: 'нет' - точно нет, 'да' - возможно есть"""
+
+    def __init__(self, capacity=100000, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, value):
+        """Добавить значение"""
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(value))
+
+    def _positions(self, value):
+        # Двойное хеширование: k позиций из двух 64-битных хешей
+        digest = hashlib.blake2b(str(value).encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+
+class AvailabilityChecker:
+    """Проверка занятости полей с префильтром Блума и коалесценцией запросов.
+
+    Только для подсказок в форме: фильтр живет в памяти процесса и не видит
+    пользователей, добавленных другими процессами. Регистрацию защищают
+    точная проверка и уникальные индексы хранилища
+    """
+
+    FIELDS = ('username', 'email', 'phone')
+
+    def __init__(self, users, capacity=100000, error_rate=0.01, debounce=1.0, client_cache_size=32,
+                 max_clients=1024):
+        self.users = users  # UserRegistry или SQLiteUserRegistry - точная проверка
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.debounce = debounce
+        self.client_cache_size = client_cache_size
+        # Кэш нужен только на время набора в форме: хватает последних активных клиентов
+        self.max_clients = max_clients
+        self.filters = {}  # {(user_type, field): BloomFilter}; user_type=None - все типы
+        self.recent = OrderedDict()  # {client_key: OrderedDict((user_type, field, value): (время, ответ))}
+        self.lock = threading.Lock()
+        for user in users:
+            self.add_user(user)
+
+    def add_user(self, user):
+        """Добавить значения полей пользователя в фильтры"""
+        for field in self.FIELDS:
+            value = user.get(field)
+            if value:
+                self._filter(user['user_type'], field).add(value)
+                self._filter(None, field).add(value)
+
+    def is_available(self, field, value, user_type=None):
+        """Свободно ли значение поля"""
+        if value not in self._filter(user_type, field):
+            # Точно свободно - хранилище не трогаем
+            return True
+        return self.users.find(field, value, user_type) is None
+
+    def check(self, fields, user_type=None, client_key=None):
+        """Проверить несколько полей за один запрос. ValueError - fields не словарь"""
+        if not isinstance(fields, dict):
+            raise ValueError('fields должен быть объектом {поле: значение}')
+        results = {}
+        for field, value in fields.items():
+            if field not in self.FIELDS:
+                results[field] = {'error': 'Invalid field'}
+                continue
+            if not isinstance(value, str):
+                results[field] = {'error': 'Invalid value'}
+                continue
+            results[field] = {'available': self._check_cached(field, value, user_type, client_key)}
+        return results
+
+    def _check_cached(self, field, value, user_type, client_key):
+        if client_key is None:
+            return self.is_available(field, value, user_type)
+
+        # Повторный запрос того же значения от того же клиента (набор с клавиатуры,
+        # дублирующиеся запросы формы) в пределах debounce отвечаем из кэша
+        key = (user_type, field, value)
+        now = time.monotonic()
+        with self.lock:
+            client_cache = self.recent.get(client_key)
+            if client_cache is not None:
+                self.recent.move_to_end(client_key)
+                cached = client_cache.get(key)
+                if cached and now - cached[0] < self.debounce:
+                    return cached[1]
+
+        available = self.is_available(field, value, user_type)
+
+        with self.lock:
+            client_cache = self.recent.setdefault(client_key, OrderedDict())
+            client_cache[key] = (now, available)
+            client_cache.move_to_end(key)
+            while len(client_cache) > self.client_cache_size:
+                client_cache.popitem(last=False)
+            while len(self.recent) > self.max_clients:
+                self.recent.popitem(last=False)
+        return available
+
+    def _filter(self, user_type, field):
+        bloom = self.filters.get((user_type, field))
+        if bloom is None:
+            bloom = self.filters[(user_type, field)] = BloomFilter(self.capacity, self.error_rate)
+        return bloom
@@ -0,0 +1,211 @@
+"""
+Модуль потоковой выгрузки посещаемости в CSV, XLSX и ZIP
+"""
+import csv
+import io
+import math
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+ROWS_PER_CHUNK = 500
+SHEET_NAME_RE = re.compile(r'[\[\]:*?/\\]')
+FILE_NAME_RE = re.compile(r'[\\/:*?"<>|]')
+# Формат выгрузки -> (тип содержимого, расширение файла)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'zip': ('application/zip', 'zip'),
+}
+
+
+def attendance_header(lessons):
+    """Заголовок таблицы: студент, занятия, итоги"""
+    return (['ФИО', 'Студенческий билет']
+            + [f'{lesson["date"]} {lesson["subject"]}' for lesson in lessons]
+            + ['Пропусков', 'Посещаемость, %'])
+
+
+def attendance_row(student, marks):
+    """Строка таблицы: '+' - был, 'н' - отсутствовал"""
+    absent = marks.count(False)
+    percent = round(100 * (len(marks) - absent) / len(marks), 1) if marks else 0
+    return [student['name'], student['student_id']] + ['+' if mark else 'н' for mark in marks] + [absent, percent]
+
+
+def iter_group_table(store, group):
+    """Таблица группы построчно: заголовок, затем студенты"""
+    yield attendance_header(store.get_lessons(group))
+    for student, marks in store.iter_rows(group):
+        yield attendance_row(student, marks)
+
+
+def iter_attendance(store, groups, export_format, titled=True):
+    """Выгрузка посещаемости групп по частям: CSV (блоки групп), XLSX (лист на группу) или ZIP из CSV"""
+    if export_format == 'csv':
+        # titled=False - одна группа без заголовка блока
+        return iter_csv([(name if titled else None, iter_group_table(store, name)) for name in groups])
+    if export_format == 'xlsx':
+        return iter_xlsx([(name, iter_group_table(store, name)) for name in groups])
+    if export_format == 'zip':
+        return iter_zip([(f'{_file_name(name)}.csv', iter_csv([(None, iter_group_table(store, name))]))
+                         for name in groups])
+    raise ValueError(f'Неизвестный формат выгрузки: {export_format}')
+
+
+def iter_csv(tables, encoding='utf-8-sig'):
+    """CSV по частям из [(группа или None, строки)]; несколько групп - блоками"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=';')
+    first = True
+    count = 0
+    for title, rows in tables:
+        if title is not None:
+            if not first:
+                writer.writerow([])
+            writer.writerow([f'Группа {title}'])
+        first = False
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+            if count % ROWS_PER_CHUNK == 0:
+                yield _take(buffer).encode(encoding)
+                # BOM нужен только в начале файла
+                encoding = 'utf-8'
+    yield _take(buffer).encode(encoding)
+
+
+def _take(buffer):
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+
+class _ChunkSink:
+    """Приемник для zipfile без seek: записанное сразу отдается генератором"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_zip(entries):
+    """ZIP по частям из [(имя файла, части содержимого)]"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, chunks in entries:
+            # Размер заранее неизвестен - force_zip64 разрешает файлы больше 2 ГБ
+            with archive.open(name, 'w', force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_xlsx(sheets):
+    """XLSX по частям из [(название листа, строки)]: каждый лист - отдельный файл архива"""
+    sheets = [(_sheet_name(title, number), rows) for number, (title, rows) in enumerate(sheets, 1)]
+    entries = [
+        ('[Content_Types].xml', [_content_types(len(sheets)).encode()]),
+        ('_rels/.rels', [RELS.encode()]),
+        ('xl/workbook.xml', [_workbook([title for title, _ in sheets]).encode()]),
+        ('xl/_rels/workbook.xml.rels', [_workbook_rels(len(sheets)).encode()]),
+    ]
+    entries += [(f'xl/worksheets/sheet{number}.xml', _iter_sheet(rows))
+                for number, (_, rows) in enumerate(sheets, 1)]
+    return iter_zip(entries)
+
+
+def _iter_sheet(rows):
+    yield ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+           '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>').encode()
+    parts = []
+    cells = {}  # отметки посещаемости повторяются - готовую ячейку берем из кэша
+    for number, row in enumerate(rows, 1):
+        parts.append(f'<row r="{number}">')
+        for value in row:
+            cell = cells.get(value) if isinstance(value, str) else None
+            if cell is None:
+                if value is None:
+                    cell = '<c/>'
+                elif isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+                    cell = f'<c><v>{value}</v></c>'
+                else:
+                    # Даты, bool, nan и прочее - текстом
+                    text = str(value)
+                    cell = f'<c t="inlineStr"><is><t>{escape(text)}</t></is></c>'
+                    if isinstance(value, str) and len(text) <= 2:
+                        cells[value] = cell
+            parts.append(cell)
+        parts.append('</row>')
+        if number % ROWS_PER_CHUNK == 0:
+            yield ''.join(parts).encode()
+            parts = []
+    parts.append('</sheetData></worksheet>')
+    yield ''.join(parts).encode()
+
+
+def _file_name(name):
+    # Косая черта в имени группы создала бы в архиве папку
+    return FILE_NAME_RE.sub('_', str(name)) or 'grupa'
+
+
+def _sheet_name(title, number):
+    # Excel: до 31 символа, без []:*?/\
+    return SHEET_NAME_RE.sub('_', str(title))[:31] or f'Лист {number}'
+
+
+def _content_types(sheet_count):
+    sheets = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{number}.xml" '
+        f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for number in range(1, sheet_count + 1))
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            f'{sheets}</Types>')
+
+
+RELS = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/></Relationships>')
+
+
+def _workbook(titles):
+    sheets = ''.join(f'<sheet name={quoteattr(title)} sheetId="{number}" r:id="rId{number}"/>'
+                     for number, title in enumerate(titles, 1))
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets></workbook>')
+
+
+def _workbook_rels(sheet_count):
+    relations = ''.join(
+        f'<Relationship Id="rId{number}" '
+        f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        f'Target="worksheets/sheet{number}.xml"/>'
+        for number in range(1, sheet_count + 1))
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{relations}</Relationships>')
@@ -0,0 +1,171 @@
+"""
+Модуль экспорта расписания в iCalendar (.ics) для подписки с телефона
+"""
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+
+from rasp import DAYS, parse_date
+from vremya import parse_time_range
+
+BYDAY = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA']
+TZID = 'Europe/Moscow'
+VTIMEZONE = [
+    'BEGIN:VTIMEZONE',
+    f'TZID:{TZID}',
+    'BEGIN:STANDARD',
+    'DTSTART:19700101T000000',
+    'TZOFFSETFROM:+0300',
+    'TZOFFSETTO:+0300',
+    'TZNAME:MSK',
+    'END:STANDARD',
+    'END:VTIMEZONE',
+]
+
+
+def current_semester(today=None):
+    """Границы текущего семестра: осенний - сентябрь-декабрь, весенний - февраль-июнь"""
+    today = today or date.today()
+    if today.month >= 8:
+        return date(today.year, 9, 1), date(today.year, 12, 31)
+    return date(today.year, 2, 1), date(today.year, 6, 30)
+
+
+def escape_text(value):
+    """Экранирование текста по RFC 5545"""
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n'))
+
+
+def fold_line(line):
+    """Перенос строк длиннее 75 байт по RFC 5545"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        # Не разрезаем многобайтовый символ UTF-8
+        while limit < len(encoded) and (encoded[limit] & 0xC0) == 0x80:
+            limit -= 1
+        parts.append(encoded[:limit].decode())
+        encoded = encoded[limit:]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+class CalendarFeeds:
+    """Генерация .ics лент по курсу и преподавателю с кэшем по версии расписания"""
+
+    def __init__(self, schedule_module, semester=None, cache_size=256):
+        self.schedule_module = schedule_module
+        self.semester = semester  # (начало, конец); None - текущий семестр
+        self.cache = OrderedDict()  # {(вид, значение, версия): текст ленты}
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+
+    def exists(self, kind, value):
+        """Есть ли в расписании курс или преподаватель (с занятиями или экзаменами)"""
+        if kind == 'course':
+            return value in self.schedule_module.schedule_data
+        return (self.schedule_module.lesson_index.has('teacher', value)
+                or value in self.schedule_module.exams_by_teacher)
+
+    def get_feed(self, kind, value):
+        """Получить (etag, части ленты). kind: 'course' или 'teacher'.
+
+        None - такого курса или преподавателя нет: произвольные имена не попадают в кэш
+        """
+        if not self.exists(kind, value):
+            return None
+        version = self.schedule_module.version
+        key = (kind, value, version)
+        # В заголовках допустим только latin-1 - имя преподавателя заменяем хешем
+        etag = f'ics-{kind}-{zlib.crc32(str(value).encode()):08x}-{version}'
+
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                return etag, [cached]
+
+        lessons, exams = self._collect(kind, value)
+        return etag, self._stream_and_cache(key, self._generate(kind, value, lessons, exams))
+
+    def _collect(self, kind, value):
+        if kind == 'course':
+            lessons = [
+                {'course': value, 'day': day, **lesson}
+                for day, day_lessons in self.schedule_module.get_schedule(value).items()
+                for lesson in day_lessons
+            ]
+            exams = [{'course': value, **exam} for exam in self.schedule_module.get_exams_schedule(value)]
+        else:
+            lessons = [lesson for day_lessons in self.schedule_module.get_teacher_schedule(value).values()
+                       for lesson in day_lessons]
+            exams = self.schedule_module.get_exams_by_teacher(value)
+        return lessons, exams
+
+    def _generate(self, kind, value, lessons, exams):
+        start, end = self.semester or current_semester()
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        # UNTIL при DTSTART с TZID задается в UTC: конец дня по Москве (UTC+3)
+        until = f'{end:%Y%m%d}T205959Z'
+        title = f'Расписание {value} курса' if kind == 'course' else f'Расписание: {value}'
+
+        header = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//techportal//raspisanie//RU',
+                  'CALSCALE:GREGORIAN', f'X-WR-CALNAME:{escape_text(title)}', f'X-WR-TIMEZONE:{TZID}',
+                  'REFRESH-INTERVAL;VALUE=DURATION:PT15M', *VTIMEZONE]
+        yield ''.join(fold_line(line) for line in header)
+
+        for lesson in lessons:
+            weekday = DAYS.index(lesson['day'])
+            # Первое занятие - ближайший нужный день недели с начала семестра
+            first_day = start + timedelta(days=(weekday - start.weekday()) % 7)
+            lesson_start, lesson_end = parse_time_range(lesson['time'])
+            summary = lesson['subject'] if kind == 'course' else f'{lesson["subject"]} ({lesson["course"]} курс)'
+            event = [
+                'BEGIN:VEVENT',
+                f'UID:lesson-{lesson["course"]}-{weekday}-{lesson_start}@techportal.edu',
+                f'DTSTAMP:{stamp}',
+                f'DTSTART;TZID={TZID}:{first_day:%Y%m%d}T{lesson_start // 60:02d}{lesson_start % 60:02d}00',
+                f'DTEND;TZID={TZID}:{first_day:%Y%m%d}T{lesson_end // 60:02d}{lesson_end % 60:02d}00',
+                f'RRULE:FREQ=WEEKLY;BYDAY={BYDAY[weekday]};UNTIL={until}',
+                f'SUMMARY:{escape_text(summary)}',
+                f'LOCATION:{escape_text("Ауд. " + lesson["room"])}',
+                f'DESCRIPTION:{escape_text("Преподаватель: " + lesson["teacher"])}',
+                'END:VEVENT',
+            ]
+            yield ''.join(fold_line(line) for line in event)
+
+        for exam in exams:
+            exam_date = parse_date(exam['date'])
+            event = [
+                'BEGIN:VEVENT',
+                f'UID:exam-{exam["course"]}-{exam_date:%Y%m%d}-{zlib.crc32(exam["subject"].encode())}@techportal.edu',
+                f'DTSTAMP:{stamp}',
+                f'DTSTART;VALUE=DATE:{exam_date:%Y%m%d}',
+                f'DTEND;VALUE=DATE:{exam_date + timedelta(days=1):%Y%m%d}',
+                f'SUMMARY:{escape_text("Экзамен: " + exam["subject"])}',
+                f'LOCATION:{escape_text(exam["room"])}',
+                f'DESCRIPTION:{escape_text("Преподаватель: " + exam["teacher"])}',
+                'END:VEVENT',
+            ]
+            yield ''.join(fold_line(line) for line in event)
+
+        yield fold_line('END:VCALENDAR')
+
+    def _stream_and_cache(self, key, chunks):
+        # Отдаем ленту по частям и одновременно собираем ее для кэша
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+
+        with self.lock:
+            version = key[2]
+            for stale in [k for k in self.cache if k[2] != version]:
+                del self.cache[stale]
+            self.cache[key] = ''.join(parts)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
@@ -0,0 +1,106 @@
+"""
+Модуль поиска накладок в расписании (преподаватель или аудитория заняты дважды)
+"""
+from bisect import bisect_left, insort
+
+# Общие обозначения, а не конкретные люди - у каждой группы свой куратор
+SHARED_TEACHERS = {'Куратор'}
+
+
+class ConflictDetector:
+    """Интервальные индексы по дням для преподавателей и аудиторий.
+
+    Занятия - rasp.Lesson: границы берутся из start/end в минутах без разбора строки
+    """
+
+    def __init__(self):
+        # {(вид, день, значение): [(начало, конец, курс, время)]} - отсортировано по началу
+        self.intervals = {}
+        self.max_length = 0  # самое длинное занятие - граница поиска назад
+
+    def rebuild(self, schedule_data):
+        """Перестроить индексы по всему расписанию"""
+        self.intervals = {}
+        self.max_length = 0
+        for course, days in schedule_data.items():
+            for day, lessons in days.items():
+                for lesson in lessons:
+                    self.add(course, day, lesson)
+
+    def add(self, course, day, lesson):
+        """Добавить занятие в индексы"""
+        start, end = lesson.start, lesson.end
+        self.max_length = max(self.max_length, end - start)
+        for key in self._keys(day, lesson):
+            insort(self.intervals.setdefault(key, []), (start, end, course, lesson['time']))
+
+    def remove(self, course, day, lesson):
+        """Убрать занятие из индексов"""
+        entry = (lesson.start, lesson.end, course, lesson['time'])
+        for key in self._keys(day, lesson):
+            entries = self.intervals.get(key, [])
+            position = bisect_left(entries, entry)
+            if position < len(entries) and entries[position] == entry:
+                del entries[position]
+            if not entries:
+                self.intervals.pop(key, None)
+
+    def find_all(self):
+        """Все накладки в расписании: O(n log n + число накладок)"""
+        conflicts = []
+        for (kind, day, value), entries in self.intervals.items():
+            for i, (start, end, course, time) in enumerate(entries):
+                j = i + 1
+                # Список отсортирован по началу: пересекаются только следующие,
+                # которые начинаются раньше конца текущего
+                while j < len(entries) and entries[j][0] < end:
+                    other = entries[j]
+                    conflicts.append(self._conflict(kind, day, value, (course, time), (other[2], other[3])))
+                    j += 1
+        return conflicts
+
+    def check(self, course, day, lesson, ignore=None):
+        """Накладки для нового или измененного занятия без полного пересчета.
+
+        ignore - (курс, время) занятия, которое заменяется при редактировании
+        """
+        start, end = lesson.start, lesson.end
+        conflicts = []
+        for kind, _, value in self._keys(day, lesson):
+            entries = self.intervals.get((kind, day, value), [])
+            position = bisect_left(entries, (start,))
+            # Назад: занятия, начавшиеся раньше, но еще не закончившиеся
+            i = position - 1
+            while i >= 0 and entries[i][0] > start - self.max_length:
+                if entries[i][1] > start:
+                    self._append_conflict(conflicts, kind, day, value, course, lesson, entries[i], ignore)
+                i -= 1
+            # Вперед: занятия, начинающиеся до конца нового
+            i = position
+            while i < len(entries) and entries[i][0] < end:
+                self._append_conflict(conflicts, kind, day, value, course, lesson, entries[i], ignore)
+                i += 1
+        return conflicts
+
+    def _append_conflict(self, conflicts, kind, day, value, course, lesson, entry, ignore):
+        other = (entry[2], entry[3])
+        if other == ignore or other == (course, lesson['time']):
+            return
+        conflicts.append(self._conflict(kind, day, value, (course, lesson['time']), other))
+
+    @staticmethod
+    def _conflict(kind, day, value, first, second):
+        return {
+            'kind': kind,
+            'value': value,
+            'day': day,
+            'lessons': [{'course': first[0], 'time': first[1]},
+                        {'course': second[0], 'time': second[1]}]
+        }
+
+    @staticmethod
+    def _keys(day, lesson):
+        keys = [('room', day, lesson['room'])]
+        if lesson['teacher'] not in SHARED_TEACHERS:
+            keys.append(('teacher', day, lesson['teacher']))
+        return keys
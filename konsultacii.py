@@ -0,0 +1,184 @@
+"""
+Модуль консультаций преподавателей: разбор часов консультаций и поиск свободного времени
+"""
+import re
+import threading
+from bisect import bisect_right, insort
+from datetime import date, datetime, timedelta
+
+from prepod import short_name
+from rasp import DAYS
+from vremya import format_time, format_time_range, parse_time, parse_time_range
+
+DAY_ABBREVIATIONS = {'пн': 'Понедельник', 'вт': 'Вторник', 'ср': 'Среда',
+                     'чт': 'Четверг', 'пт': 'Пятница', 'сб': 'Суббота'}
+CONSULTATION_RE = re.compile(r'(пн|вт|ср|чт|пт|сб)\.?\s+(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})', re.IGNORECASE)
+WORK_START = 8 * 60  # рабочий день для поиска свободного времени
+WORK_END = 20 * 60
+
+
+def valid_time(text):
+    """'09:30' - часы до 23, минуты до 59"""
+    hours, minutes = map(int, text.split(':'))
+    return hours <= 23 and minutes <= 59
+
+
+def parse_consultations(text):
+    """'Пн 15:00-17:00, Ср 10:00-12:00' -> [('Понедельник', 900, 1020), ('Среда', 600, 720)]"""
+    intervals = []
+    for day, start, end in CONSULTATION_RE.findall(text or ''):
+        if not (valid_time(start) and valid_time(end)):
+            continue
+        start, end = parse_time(start), parse_time(end)
+        if start < end:
+            intervals.append((DAY_ABBREVIATIONS[day.lower()], start, end))
+    return intervals
+
+
+def merge_intervals(intervals):
+    """Слить пересекающиеся и смежные интервалы [(начало, конец)]"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class ConsultationIndex:
+    """Консультации по дням недели и занятость преподавателей (занятия + консультации)"""
+
+    def __init__(self, teachers_module, schedule_module, resolver=None):
+        self.teachers_module = teachers_module
+        self.schedule_module = schedule_module
+        self.resolver = resolver  # nagruzka.TeacherResolver; без него - по 'Фамилия И.О.'
+        self.lock = threading.Lock()
+        self.consultations = {}  # {id преподавателя: [(день, начало, конец)]}
+        self.by_day = {}  # {день: [(начало, конец, id)]} - отсортировано по началу
+        self.max_length = 0  # самая длинная консультация - граница поиска назад
+        self.busy_cache = {}  # {id: {день: [(начало, конец)]}} для текущей версии расписания
+        self.busy_version = None
+        for teacher in teachers_module.get_all_teachers():
+            self._add(teacher)
+        teachers_module.add_listener(self._on_teacher_change)
+
+    def _on_teacher_change(self, action, teacher):
+        with self.lock:
+            self._remove(teacher['id'])
+            if action != 'remove':
+                self._add(teacher)
+            self.busy_cache.pop(teacher['id'], None)
+
+    def _add(self, teacher):
+        intervals = parse_consultations(teacher.get('consultation'))
+        self.consultations[teacher['id']] = intervals
+        for day, start, end in intervals:
+            insort(self.by_day.setdefault(day, []), (start, end, teacher['id']))
+            self.max_length = max(self.max_length, end - start)
+
+    def _remove(self, teacher_id):
+        for day, start, end in self.consultations.pop(teacher_id, []):
+            entries = self.by_day.get(day, [])
+            if (start, end, teacher_id) in entries:
+                entries.remove((start, end, teacher_id))
+
+    def consulting_now(self, now=None):
+        """Преподаватели, у которых сейчас идет консультация"""
+        day, minute = self._position(now or datetime.now())
+        found = []
+        with self.lock:
+            entries = self.by_day.get(day, [])
+            # Кандидаты - начавшиеся не раньше чем max_length назад
+            i = bisect_right(entries, (minute, float('inf'))) - 1
+            while i >= 0 and entries[i][0] > minute - self.max_length:
+                start, end, teacher_id = entries[i]
+                if end > minute:
+                    found.append((start, end, teacher_id))
+                i -= 1
+        return [self._slot(teacher_id, day, start, end) for start, end, teacher_id in sorted(found)]
+
+    def get_week(self, teacher_id):
+        """Неделя преподавателя: занятия и консультации {день: [...]} по времени"""
+        teacher = self.teachers_module.get_teacher_by_id(teacher_id)
+        if not teacher:
+            return None
+        if self.resolver:
+            names = self.resolver.schedule_names(teacher_id)
+        else:
+            names = [short_name(teacher['name'])]
+        week = {}
+        for name in names:
+            for day, lessons in self.schedule_module.get_teacher_schedule(name).items():
+                for lesson in lessons:
+                    week.setdefault(day, []).append({'kind': 'lesson', **lesson})
+        for day, start, end in self.consultations.get(teacher_id, []):
+            week.setdefault(day, []).append({'kind': 'consultation', 'time': format_time_range(start, end),
+                                             'room': teacher['room']})
+        return {day: sorted(week[day], key=lambda item: item['time']) for day in DAYS if day in week}
+
+    def next_free(self, teacher_id, now=None):
+        """Ближайшее время в рабочие часы без занятий и консультаций"""
+        busy = self._busy(teacher_id)
+        if busy is None:
+            return None
+        now = now or datetime.now()
+        for offset in range(7):
+            current = now + timedelta(days=offset)
+            if current.weekday() >= len(DAYS):
+                continue
+            day = DAYS[current.weekday()]
+            minute = max(WORK_START, current.hour * 60 + current.minute) if offset == 0 else WORK_START
+            intervals = busy.get(day, [])
+            i = bisect_right(intervals, (minute, float('inf'))) - 1
+            if i >= 0 and intervals[i][1] > minute:
+                # Интервалы слиты, поэтому конец текущего - уже свободное время
+                minute = intervals[i][1]
+            if minute < WORK_END:
+                return {'date': current.date().strftime('%d.%m.%Y'), 'day': day, 'time': format_time(minute)}
+        return None
+
+    def subject_slots(self, subject, today=None):
+        """Оставшиеся на этой неделе консультации преподавателей предмета"""
+        today = today or date.today()
+        monday = today - timedelta(days=today.weekday())
+        slots = []
+        for teacher in self.teachers_module.get_teachers_by_subject(subject):
+            for day, start, end in self.consultations.get(teacher['id'], []):
+                slot_date = monday + timedelta(days=DAYS.index(day))
+                if slot_date >= today:
+                    slots.append((slot_date, start, self._slot(teacher['id'], day, start, end)))
+        slots.sort(key=lambda item: item[:2])
+        return [{'date': slot_date.strftime('%d.%m.%Y'), **slot} for slot_date, _, slot in slots]
+
+    def _busy(self, teacher_id):
+        version = self.schedule_module.version
+        with self.lock:
+            if self.busy_version != version:
+                self.busy_cache = {}
+                self.busy_version = version
+            busy = self.busy_cache.get(teacher_id)
+        if busy is not None:
+            return busy
+
+        week = self.get_week(teacher_id)
+        if week is None:
+            return None
+        busy = {}
+        for day, items in week.items():
+            busy[day] = merge_intervals(parse_time_range(item['time']) for item in items)
+        with self.lock:
+            if self.busy_version == version:
+                self.busy_cache[teacher_id] = busy
+        return busy
+
+    def _slot(self, teacher_id, day, start, end):
+        teacher = self.teachers_module.get_teacher_by_id(teacher_id)
+        return {'teacher_id': teacher_id, 'teacher': teacher['name'], 'room': teacher['room'],
+                'day': day, 'time': format_time_range(start, end)}
+
+    @staticmethod
+    def _position(now):
+        if now.weekday() >= len(DAYS):
+            return None, 0
+        return DAYS[now.weekday()], now.hour * 60 + now.minute
@@ -0,0 +1,27 @@
+"""
+Модуль курсоров постраничного вывода: позиция страницы (значение сортировки, id) в строке
+"""
+import base64
+import binascii
+import json
+
+
+def encode_cursor(values):
+    """Закодировать позицию страницы (значение сортировки, id) в строку"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, value_type=None):
+    """Раскодировать позицию страницы; value_type - ожидаемый тип значения сортировки"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Некорректный курсор')
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError('Некорректный курсор')
+    # Курсор от другой сортировки не сравнить с ключами индекса
+    if value_type is not None and not all(
+            isinstance(value, expected) and not isinstance(value, bool)
+            for value, expected in zip(values, (value_type, int))):
+        raise ValueError('Курсор не подходит к выбранной сортировке')
+    return values
@@ -0,0 +1,142 @@
+"""
+Модуль связи расписания со справочником преподавателей и учебной нагрузки
+"""
+import re
+import threading
+
+from konflikty import SHARED_TEACHERS
+
+NAME_RE = re.compile(r'[a-zа-я]+')
+
+
+def name_key(name):
+    """Ключ сопоставления: 'Петрова М.И.' и 'Петрова Мария Ивановна' -> ('петрова', 'ми')"""
+    words = NAME_RE.findall(str(name).lower().replace('ё', 'е'))
+    if not words:
+        return None
+    return words[0], ''.join(word[0] for word in words[1:])
+
+
+class TeacherResolver:
+    """Соответствие 'Фамилия И.О.' из расписания -> id преподавателя и нагрузка по курсам.
+
+    Подключается к ScheduleModule.add_index и к TeachersModule.add_listener,
+    поэтому обе стороны обновляются по мере правок, без пересчета на запрос
+    """
+
+    def __init__(self, teachers_module):
+        self.teachers_module = teachers_module
+        self.lock = threading.Lock()
+        self.ids_by_key = {}  # {ключ: {id}} - больше одного id означает неоднозначность
+        self.key_by_id = {}
+        self.names_by_key = {}  # {ключ: {строка из расписания: число занятий}}
+        self.workload = {}  # {ключ: {курс: [пары, минуты]}}
+        for teacher in teachers_module.get_all_teachers():
+            self._add_teacher(teacher)
+        teachers_module.add_listener(self._on_teacher_change)
+
+    # Сторона справочника
+
+    def _on_teacher_change(self, action, teacher):
+        with self.lock:
+            self._remove_teacher(teacher['id'])
+            if action != 'remove':
+                self._add_teacher(teacher)
+
+    def _add_teacher(self, teacher):
+        key = name_key(teacher['name'])
+        self.key_by_id[teacher['id']] = key
+        self.ids_by_key.setdefault(key, set()).add(teacher['id'])
+
+    def _remove_teacher(self, teacher_id):
+        key = self.key_by_id.pop(teacher_id, None)
+        ids = self.ids_by_key.get(key)
+        if ids is not None:
+            ids.discard(teacher_id)
+            if not ids:
+                del self.ids_by_key[key]
+
+    # Сторона расписания: rebuild/add/remove как у остальных индексов ScheduleModule
+
+    def rebuild(self, schedule_data):
+        """Перестроить связи и нагрузку по всему расписанию"""
+        with self.lock:
+            self.names_by_key = {}
+            self.workload = {}
+        for course, days in schedule_data.items():
+            for day, lessons in days.items():
+                for lesson in lessons:
+                    self.add(course, day, lesson)
+
+    def add(self, course, day, lesson):
+        """Учесть занятие"""
+        self._count(course, lesson, 1)
+
+    def remove(self, course, day, lesson):
+        """Убрать занятие из учета"""
+        self._count(course, lesson, -1)
+
+    def _count(self, course, lesson, sign):
+        name = lesson['teacher']
+        if name in SHARED_TEACHERS:
+            return
+        key = name_key(name)
+        with self.lock:
+            names = self.names_by_key.setdefault(key, {})
+            names[name] = names.get(name, 0) + sign
+            if names[name] <= 0:
+                del names[name]
+            courses = self.workload.setdefault(key, {})
+            totals = courses.setdefault(course, [0, 0])
+            totals[0] += sign
+            totals[1] += sign * (lesson.end - lesson.start)
+            if totals[0] <= 0:
+                del courses[course]
+            if not names:
+                self.names_by_key.pop(key, None)
+                self.workload.pop(key, None)
+
+    # Запросы
+
+    def resolve(self, name):
+        """Преподаватель для строки из расписания: resolved, ambiguous или unknown"""
+        ids = sorted(self.ids_by_key.get(name_key(name), ()))
+        if not ids:
+            return {'status': 'unknown', 'ids': []}
+        return {'status': 'resolved' if len(ids) == 1 else 'ambiguous', 'ids': ids}
+
+    def schedule_names(self, teacher_id):
+        """Как преподаватель записан в расписании"""
+        key = self.key_by_id.get(teacher_id)
+        return sorted(self.names_by_key.get(key, {}))
+
+    def get_workload(self, teacher_id):
+        """Нагрузка за неделю по курсам: пары и академические часы (пара - 2 часа по 45 минут)"""
+        key = self.key_by_id.get(teacher_id)
+        if key is None:
+            return None
+        with self.lock:
+            courses = sorted((course, pairs, minutes)
+                             for course, (pairs, minutes) in self.workload.get(key, {}).items())
+            ambiguous = len(self.ids_by_key.get(key, ())) > 1
+        return {
+            'teacher_id': teacher_id,
+            # При однофамильцах с одинаковыми инициалами нагрузку не разделить
+            'ambiguous': ambiguous,
+            'courses': [{'course': course, 'pairs': pairs, 'hours': minutes // 45}
+                        for course, pairs, minutes in courses],
+            'total_pairs': sum(pairs for _, pairs, _ in courses),
+            'total_hours': sum(minutes for _, _, minutes in courses) // 45,
+        }
+
+    def report(self):
+        """Неоднозначные и не найденные в справочнике преподаватели из расписания"""
+        with self.lock:
+            ambiguous, unknown = [], []
+            for key, names in self.names_by_key.items():
+                ids = self.ids_by_key.get(key, ())
+                if len(ids) > 1:
+                    ambiguous.append({'names': sorted(names), 'ids': sorted(ids)})
+                elif not ids:
+                    unknown.extend(names)
+        return {'ambiguous': ambiguous, 'unknown': sorted(unknown)}
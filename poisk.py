@@ -0,0 +1,194 @@
+"""
+Модуль полнотекстового поиска с учетом русского языка (стемминг, опечатки, автодополнение)
+"""
+import re
+from bisect import bisect_left, insort
+
+TOKEN_RE = re.compile(r'[a-zа-я0-9]+')
+# Окончания по убыванию длины: отрезается самое длинное, если остается основа от 3 букв
+ENDINGS = sorted([
+    'иями', 'ями', 'ами', 'ией', 'ием', 'иях', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими',
+    'ая', 'яя', 'ое', 'ее', 'ие', 'ые', 'ой', 'ей', 'ий', 'ый', 'ом', 'ем', 'ам', 'ям',
+    'ах', 'ях', 'ов', 'ев', 'ую', 'юю', 'ия', 'ья', 'ью', 'ию', 'ии',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+], key=len, reverse=True)
+MIN_STEM = 3
+
+
+def normalize(text):
+    """Нижний регистр и ё -> е"""
+    return str(text).lower().replace('ё', 'е')
+
+
+def tokenize(text):
+    """Слова текста после нормализации"""
+    return TOKEN_RE.findall(normalize(text))
+
+
+def stem(token):
+    """Упрощенный стемминг: отрезать окончание"""
+    for ending in ENDINGS:
+        if token.endswith(ending) and len(token) - len(ending) >= MIN_STEM:
+            return token[:-len(ending)]
+    return token
+
+
+def edit_distance(first, second, limit):
+    """Расстояние Дамерау-Левенштейна (перестановка соседних букв - одна правка).
+
+    Считается не дальше limit: если правок больше, возвращает limit + 1
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = first[i - 1] != second[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def trigrams(term):
+    """Триграммы слова с границами: 'мат' -> {'  м', ' ма', 'мат', 'ат '}"""
+    padded = f'  {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Обратный индекс по основам слов с триграммами для опечаток и префиксами слов"""
+
+    def __init__(self, weights, fuzzy_threshold=0.4):
+        self.weights = weights  # {поле: вес}; имя весит больше кафедры
+        self.fuzzy_threshold = fuzzy_threshold
+        self.postings = {}  # {основа: {doc_id: вес}}
+        self.words = {}  # {слово: {doc_id: вес}} - для префиксного поиска
+        self.vocabulary = []  # отсортированные слова
+        self.trigram_index = {}  # {триграмма: {основы}}
+        self.documents = {}  # {doc_id: [(слово, основа)]} - чтобы удалить документ
+
+    def add(self, doc_id, fields):
+        """Проиндексировать документ {поле: текст или список текстов}"""
+        self.remove(doc_id)
+        terms = {}
+        for field, value in fields.items():
+            texts = value if isinstance(value, (list, tuple)) else [value]
+            for text in texts:
+                for word in tokenize(text):
+                    key = (word, stem(word))
+                    terms[key] = max(terms.get(key, 0), self.weights.get(field, 1))
+
+        for (word, word_stem), weight in terms.items():
+            stem_docs = self.postings.setdefault(word_stem, {})
+            if not stem_docs:
+                for trigram in trigrams(word_stem):
+                    self.trigram_index.setdefault(trigram, set()).add(word_stem)
+            stem_docs[doc_id] = max(stem_docs.get(doc_id, 0), weight)
+
+            word_docs = self.words.setdefault(word, {})
+            if not word_docs:
+                insort(self.vocabulary, word)
+            word_docs[doc_id] = max(word_docs.get(doc_id, 0), weight)
+        self.documents[doc_id] = list(terms)
+
+    def remove(self, doc_id):
+        """Убрать документ из индекса"""
+        for word, word_stem in self.documents.pop(doc_id, []):
+            stem_docs = self.postings.get(word_stem, {})
+            stem_docs.pop(doc_id, None)
+            if not stem_docs:
+                self.postings.pop(word_stem, None)
+                for trigram in trigrams(word_stem):
+                    stems = self.trigram_index.get(trigram)
+                    if stems is not None:
+                        stems.discard(word_stem)
+                        if not stems:
+                            del self.trigram_index[trigram]
+
+            word_docs = self.words.get(word, {})
+            word_docs.pop(doc_id, None)
+            if not word_docs:
+                self.words.pop(word, None)
+                position = bisect_left(self.vocabulary, word)
+                if position < len(self.vocabulary) and self.vocabulary[position] == word:
+                    del self.vocabulary[position]
+
+    def search(self, query, limit=None):
+        """Документы по убыванию релевантности: [(doc_id, оценка)]; limit=None - все, limit <= 0 - ничего.
+
+        Должно найтись каждое слово запроса: точно по основе, по началу слова
+        или с опечаткой. Последнее слово всегда ищется и как префикс (набор с клавиатуры)
+        """
+        words = tokenize(query)
+        if not words or (limit is not None and limit <= 0):
+            return []
+        scores = None
+        for number, word in enumerate(words):
+            matches = self._match_word(word, prefix=number == len(words) - 1)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {doc_id: score + matches[doc_id] for doc_id, score in scores.items() if doc_id in matches}
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if limit is None else ranked[:limit]
+
+    def complete(self, prefix, limit=10):
+        """Слова словаря, начинающиеся с prefix, самые частые первыми"""
+        if limit <= 0:
+            return []
+        words = list(self._words_with_prefix(normalize(prefix)))
+        words.sort(key=lambda word: (-len(self.words[word]), word))
+        return words[:limit]
+
+    def _words_with_prefix(self, prefix):
+        position = bisect_left(self.vocabulary, prefix)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(prefix):
+            yield self.vocabulary[position]
+            position += 1
+
+    def _match_word(self, word, prefix):
+        # {doc_id: лучшая оценка совпадения слова}
+        matches = {}
+
+        def merge(docs, factor):
+            for doc_id, weight in docs.items():
+                matches[doc_id] = max(matches.get(doc_id, 0), weight * factor)
+
+        word_stem = stem(word)
+        merge(self.postings.get(word_stem, {}), 1.0)
+
+        if prefix or len(word) >= MIN_STEM:
+            for candidate in self._words_with_prefix(word):
+                merge(self.words[candidate], 0.8)
+
+        if len(word_stem) >= MIN_STEM:
+            for candidate, similarity in self._similar_stems(word_stem):
+                merge(self.postings[candidate], 0.6 * similarity)
+        return matches
+
+    def _similar_stems(self, word_stem):
+        # Кандидаты - основы с общими триграммами; сходство - коэффициент Жаккара.
+        # В коротком слове одна опечатка портит большую часть триграмм ('ивон' и
+        # 'иван' - 0.25), поэтому ниже порога проверяем число правок
+        query_trigrams = trigrams(word_stem)
+        max_edits = 1 if len(word_stem) <= 5 else 2
+        shared = {}
+        for trigram in query_trigrams:
+            for candidate in self.trigram_index.get(trigram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        for candidate, count in shared.items():
+            if candidate == word_stem:
+                continue
+            similarity = count / (len(query_trigrams) + len(trigrams(candidate)) - count)
+            if similarity < self.fuzzy_threshold:
+                edits = edit_distance(word_stem, candidate, max_edits)
+                if edits > max_edits:
+                    continue
+                similarity = max(similarity, 1 - edits / max(len(word_stem), len(candidate)))
+            yield candidate, similarity
@@ -0,0 +1,147 @@
+"""
+Модуль учета посещаемости студентов по группам
+"""
+import threading
+
+import numpy as np
+
+# Число единичных битов в байте - для подсчета посещений без распаковки
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+class GroupAttendance:
+    """Посещаемость одной группы: битовая матрица студенты x занятия.
+
+    Строка - студент, бит j строки - был ли он на занятии j (младший бит байта первый)
+    """
+
+    def __init__(self, group):
+        self.group = group
+        self.students = []  # [{'id', 'name', 'student_id'}] в порядке списка группы
+        self.rows = {}  # {id студента: номер строки}
+        self.lessons = []  # [{'date', 'subject'}] в порядке проведения
+        self.bits = np.zeros((4, 8), dtype=np.uint8)
+
+    def add_student(self, student):
+        row = len(self.students)
+        if row == self.bits.shape[0]:
+            self._grow(rows=row * 2)
+        self.students.append(student)
+        self.rows[student['id']] = row
+
+    def add_lesson(self, lesson, present_ids):
+        number = len(self.lessons)
+        if number >> 3 == self.bits.shape[1]:
+            self._grow(columns=self.bits.shape[1] * 2)
+        self.lessons.append(lesson)
+        rows = [self.rows[student_id] for student_id in present_ids if student_id in self.rows]
+        # Вся пара одной записью по индексам строк
+        self.bits[rows, number >> 3] |= np.uint8(1 << (number & 7))
+        return number
+
+    def set_mark(self, number, student_id, present):
+        row, mask = self.rows[student_id], np.uint8(1 << (number & 7))
+        if present:
+            self.bits[row, number >> 3] |= mask
+        else:
+            self.bits[row, number >> 3] &= ~mask
+
+    def matrix(self):
+        """Булева матрица посещений (студенты x занятия)"""
+        used = self.bits[:len(self.students), :(len(self.lessons) + 7) >> 3]
+        return np.unpackbits(used, axis=1, count=len(self.lessons), bitorder='little').astype(bool)
+
+    def present_counts(self):
+        """Сколько занятий посетил каждый студент"""
+        return POPCOUNT[self.bits[:len(self.students)]].sum(axis=1, dtype=np.int64)
+
+    def _grow(self, rows=None, columns=None):
+        bits = np.zeros((rows or self.bits.shape[0], columns or self.bits.shape[1]), dtype=np.uint8)
+        bits[:self.bits.shape[0], :self.bits.shape[1]] = self.bits
+        self.bits = bits
+
+
+class AttendanceStore:
+    """Посещаемость всех групп"""
+
+    def __init__(self):
+        self.groups = {}  # {группа: GroupAttendance}
+        self.lock = threading.Lock()
+
+    def add_student(self, group, student):
+        """Добавить студента в список группы"""
+        with self.lock:
+            attendance = self.groups.setdefault(group, GroupAttendance(group))
+            attendance.add_student({'id': student['id'], 'name': student['name'],
+                                    'student_id': student.get('student_id', '')})
+
+    def mark_lesson(self, group, lesson_date, subject, present_ids):
+        """Отметить проведенное занятие: present_ids - кто присутствовал. Возвращает номер занятия"""
+        with self.lock:
+            return self.groups[group].add_lesson({'date': lesson_date, 'subject': subject}, present_ids)
+
+    def set_mark(self, group, number, student_id, present):
+        """Исправить отметку одного студента"""
+        with self.lock:
+            self.groups[group].set_mark(number, student_id, present)
+
+    def get_groups(self):
+        """Группы с учетом посещаемости"""
+        return sorted(self.groups)
+
+    def get_lessons(self, group):
+        """Проведенные занятия группы"""
+        attendance = self.groups.get(group)
+        return list(attendance.lessons) if attendance else []
+
+    def iter_rows(self, group):
+        """Построчно: (студент, [присутствовал на занятии 0, 1, ...])"""
+        attendance = self.groups.get(group)
+        if attendance is None:
+            return
+        with self.lock:
+            students = list(attendance.students)
+            matrix = attendance.matrix()
+        for student, marks in zip(students, matrix):
+            yield student, marks.tolist()
+
+    def get_summary(self, group, threshold=None):
+        """Итоги по группе: посещаемость в процентах, текущая и самая длинная серия пропусков.
+
+        threshold - оставить только студентов с посещаемостью ниже порога (в процентах)
+        """
+        attendance = self.groups.get(group)
+        if attendance is None:
+            return None
+        with self.lock:
+            students = list(attendance.students)
+            lesson_count = len(attendance.lessons)
+            present = attendance.present_counts()
+            matrix = attendance.matrix()
+
+        percent = np.round(100 * present / lesson_count, 1) if lesson_count else np.zeros(len(students))
+        if lesson_count:
+            # Длина серии пропусков, заканчивающейся на каждом занятии:
+            # номер занятия минус номер последнего посещенного до него
+            numbers = np.arange(lesson_count)
+            last_present = np.maximum.accumulate(np.where(matrix, numbers, -1), axis=1)
+            streaks = numbers - last_present
+            current_streak, longest_streak = streaks[:, -1], streaks.max(axis=1)
+        else:
+            current_streak = longest_streak = np.zeros(len(students), dtype=np.int64)
+
+        selected = np.arange(len(students))
+        if threshold is not None:
+            selected = np.flatnonzero(percent < threshold)
+        return {
+            'group': group,
+            'lessons': lesson_count,
+            'students': [{
+                **students[row],
+                'present': int(present[row]),
+                'absent': lesson_count - int(present[row]),
+                'percent': float(percent[row]),
+                'current_streak': int(current_streak[row]),
+                'longest_streak': int(longest_streak[row]),
+            } for row in selected],
+        }
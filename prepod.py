@@ -1,12 +1,34 @@
 """
 Модуль для работы со списком преподавателей
 """
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from kursor import decode_cursor, encode_cursor
+from poisk import SearchIndex, tokenize
+
+# Вес совпадения по полю: совпадение в ФИО важнее совпадения по кафедре
+SEARCH_WEIGHTS = {'name': 3, 'subjects': 2, 'department': 1, 'position': 1}
+REQUIRED_FIELDS = ('name', 'position', 'department')
+EDITABLE_FIELDS = ('name', 'position', 'department', 'subjects', 'email', 'phone', 'room', 'consultation')
+
+
+def short_name(full_name):
+    """'Петрова Мария Ивановна' -> 'Петрова М.И.' (так преподаватели записаны в расписании)"""
+    parts = full_name.split()
+    if len(parts) < 2:
+        return full_name
+    return parts[0] + ' ' + ''.join(f'{part[0]}.' for part in parts[1:])
 
 
 class TeachersModule:
     def __init__(self):
         self.teachers = []
+        self.lock = threading.Lock()
+        self.listeners = []  # callback(action, teacher): 'add', 'update' или 'remove'
         self.load_teachers()
+        self.rebuild_indexes()
 
     def load_teachers(self):
         """Загрузить данные преподавателей"""
@@ -101,39 +123,175 @@ class TeachersModule:
             }
         ]
 
+    def rebuild_indexes(self):
+        """Перестроить индексы и поиск по всем преподавателям"""
+        self.by_id = {}
+        self.by_department = {}  # {кафедра: {id}}
+        self.by_subject = {}  # {предмет: {id}}
+        self.by_position = {}  # {должность: {id}}
+        self.by_name = []  # [(ФИО, id)] по возрастанию - порядок справочника
+        self.search_index = SearchIndex(SEARCH_WEIGHTS)
+        for teacher in self.teachers:
+            self._index(teacher)
+
+    def _index(self, teacher):
+        self.by_id[teacher['id']] = teacher
+        self.by_department.setdefault(teacher['department'], set()).add(teacher['id'])
+        self.by_position.setdefault(teacher['position'], set()).add(teacher['id'])
+        for subject in teacher['subjects']:
+            self.by_subject.setdefault(subject, set()).add(teacher['id'])
+        insort(self.by_name, (teacher['name'], teacher['id']))
+        self.search_index.add(teacher['id'], {field: teacher[field] for field in SEARCH_WEIGHTS})
+
+    def _unindex(self, teacher):
+        self.by_id.pop(teacher['id'], None)
+        self._discard(self.by_department, teacher['department'], teacher['id'])
+        self._discard(self.by_position, teacher['position'], teacher['id'])
+        for subject in teacher['subjects']:
+            self._discard(self.by_subject, subject, teacher['id'])
+        entry = (teacher['name'], teacher['id'])
+        position = bisect_left(self.by_name, entry)
+        if position < len(self.by_name) and self.by_name[position] == entry:
+            del self.by_name[position]
+        self.search_index.remove(teacher['id'])
+
+    @staticmethod
+    def _discard(index, key, teacher_id):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(teacher_id)
+            if not ids:
+                del index[key]
+
+    def add_teacher(self, data):
+        """Добавить преподавателя"""
+        teacher, error = self._validate({field: data.get(field, '') for field in EDITABLE_FIELDS})
+        if error:
+            return {'success': False, 'message': error}
+        with self.lock:
+            teacher['id'] = max(self.by_id, default=0) + 1
+            self.teachers.append(teacher)
+            self._index(teacher)
+            self._notify('add', teacher)
+        return {'success': True, 'message': 'Преподаватель добавлен', 'teacher': teacher}
+
+    def update_teacher(self, teacher_id, fields):
+        """Изменить поля преподавателя"""
+        with self.lock:
+            old = self.by_id.get(teacher_id)
+            if not old:
+                return {'success': False, 'message': 'Преподаватель не найден'}
+            changes = {field: value for field, value in fields.items() if field in EDITABLE_FIELDS}
+            teacher, error = self._validate({**old, **changes})
+            if error:
+                return {'success': False, 'message': error}
+            self._unindex(old)
+            # Обновляем тот же словарь: на него ссылаются self.teachers и вызывающий код
+            old.update(teacher)
+            self._index(old)
+            self._notify('update', old)
+        return {'success': True, 'message': 'Данные преподавателя сохранены', 'teacher': old}
+
+    def remove_teacher(self, teacher_id):
+        """Удалить преподавателя"""
+        with self.lock:
+            teacher = self.by_id.get(teacher_id)
+            if not teacher:
+                return {'success': False, 'message': 'Преподаватель не найден'}
+            self._unindex(teacher)
+            self.teachers.remove(teacher)
+            self._notify('remove', teacher)
+        return {'success': True, 'message': 'Преподаватель удален'}
+
+    def add_listener(self, callback):
+        """Подписаться на изменения справочника: callback(action, teacher)"""
+        self.listeners.append(callback)
+
+    def _notify(self, action, teacher):
+        for callback in self.listeners:
+            callback(action, teacher)
+
+    @staticmethod
+    def _validate(teacher):
+        teacher = dict(teacher)
+        empty = [field for field in REQUIRED_FIELDS if not str(teacher.get(field, '')).strip()]
+        if empty:
+            return None, 'Не заполнено: ' + ', '.join(empty)
+        subjects = teacher.get('subjects') or []
+        if isinstance(subjects, str):
+            subjects = subjects.split(',')
+        teacher['subjects'] = [subject.strip() for subject in subjects if subject.strip()]
+        return teacher, None
+
     def get_all_teachers(self):
         """Получить всех преподавателей"""
         return self.teachers
 
     def get_teacher_by_id(self, teacher_id):
         """Получить преподавателя по ID"""
-        for teacher in self.teachers:
-            if teacher['id'] == teacher_id:
-                return teacher
-        return None
+        return self.by_id.get(teacher_id)
 
     def get_teachers_by_department(self, department):
         """Получить преподавателей по кафедре"""
-        return [t for t in self.teachers if t['department'] == department]
+        return self._teachers(self.by_department.get(department, ()))
 
     def get_teachers_by_subject(self, subject):
         """Получить преподавателей по предмету"""
-        return [t for t in self.teachers if subject in t['subjects']]
+        return self._teachers(self.by_subject.get(subject, ()))
 
     def get_departments(self):
         """Получить список кафедр"""
-        departments = set()
-        for teacher in self.teachers:
-            departments.add(teacher['department'])
-        return list(departments)
+        return sorted(self.by_department)
 
-    def search_teachers(self, query):
-        """Поиск преподавателей"""
-        query = query.lower()
-        results = []
-        for teacher in self.teachers:
-            if (query in teacher['name'].lower() or
-                    query in teacher['department'].lower() or
-                    any(query in subject.lower() for subject in teacher['subjects'])):
-                results.append(teacher)
-        return results
\ No newline at end of file
+    def get_subjects(self):
+        """Все предметы преподавателей"""
+        return sorted(self.by_subject)
+
+    def get_positions(self):
+        """Все должности"""
+        return sorted(self.by_position)
+
+    def list_teachers(self, department=None, subject=None, position=None, cursor=None, limit=20):
+        """Страница справочника по ФИО с фильтрами и курсором"""
+        limit = max(1, limit)
+        after = tuple(decode_cursor(cursor, str)) if cursor else None
+        filters = [index.get(value, set()) for index, value in
+                   ((self.by_department, department), (self.by_subject, subject), (self.by_position, position))
+                   if value is not None]
+        if filters:
+            # Пересечение начинаем с самого маленького множества
+            filters.sort(key=len)
+            ids = set(filters[0]).intersection(*filters[1:])
+            total = len(ids)
+            # Из отфильтрованных берем limit + 1 первых после курсора, не сортируя все
+            entries = ((self.by_id[teacher_id]['name'], teacher_id) for teacher_id in ids)
+            page = heapq.nsmallest(limit + 1, (entry for entry in entries if after is None or entry > after))
+        else:
+            total = len(self.by_name)
+            start = bisect_right(self.by_name, after) if after else 0
+            page = self.by_name[start:start + limit + 1]
+
+        next_cursor = encode_cursor(list(page[limit - 1])) if len(page) > limit else None
+        return {'teachers': [self.by_id[teacher_id] for _, teacher_id in page[:limit]],
+                'total': total,
+                'next_cursor': next_cursor}
+
+    def _teachers(self, ids):
+        return [self.by_id[teacher_id] for teacher_id in sorted(ids)]
+
+    def search_teachers(self, query, limit=None):
+        """Поиск преподавателей по ФИО, кафедре, должности и предметам (по релевантности)"""
+        return [self.by_id[teacher_id] for teacher_id, _ in self.search_index.search(query, limit)]
+
+    def suggest_teachers(self, query, limit=10):
+        """Автодополнение: лучшие совпадения по началу набранного слова"""
+        return [{'id': teacher['id'], 'name': teacher['name']}
+                for teacher in self.search_teachers(query, limit)]
+
+    def complete_query(self, query, limit=10):
+        """Варианты запроса с дописанным последним словом: 'петрова ма' -> 'петрова мария'"""
+        words = tokenize(query)
+        if not words:
+            return []
+        head = ' '.join(words[:-1])
+        return [f'{head} {word}'.lstrip() for word in self.search_index.complete(words[-1], limit)]
@@ -1,15 +1,229 @@
 """
 Модуль для работы с расписанием
 """
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+from konflikty import ConflictDetector
+from vremya import format_time_range, parse_time_range
+
+DAYS = ['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота']
+TIME_RE = re.compile(r'^(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})$')
+LESSON_FIELDS = ('time', 'subject', 'teacher', 'room')
+
+
+def parse_date(value):
+    """'25.12.2023' или date -> date"""
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%d.%m.%Y').date()
+
+
+class StringTable:
+    """Интернирование повторяющихся строк (преподаватели, предметы, аудитории): строка <-> id"""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+        self.lock = threading.Lock()
+
+    def intern(self, value):
+        """id строки; новая строка получает следующий номер"""
+        string_id = self.ids.get(value)
+        if string_id is None:
+            with self.lock:
+                string_id = self.ids.get(value)
+                if string_id is None:
+                    string_id = self.ids[value] = len(self.values)
+                    self.values.append(value)
+        return string_id
+
+    def __getitem__(self, string_id):
+        return self.values[string_id]
+
+    def __len__(self):
+        return len(self.values)
+
+
+# Одна таблица на процесс: одинаковые строки всех занятий хранятся один раз
+LESSON_STRINGS = StringTable()
+
+
+class Lesson:
+    """Компактное занятие: время в минутах, строки - id в LESSON_STRINGS.
+
+    Читается и как словарь (lesson['time'], {**lesson}), и через атрибуты
+    (lesson.time в шаблонах), поэтому расписание сохраняет прежний вид.
+    """
+
+    __slots__ = ('start', 'end', 'subject_id', 'teacher_id', 'room_id')
+    FIELDS = ('time', 'subject', 'teacher', 'room')
+
+    def __init__(self, start, end, subject='', teacher='', room=''):
+        self.start = start
+        self.end = end
+        self.subject_id = LESSON_STRINGS.intern(subject)
+        self.teacher_id = LESSON_STRINGS.intern(teacher)
+        self.room_id = LESSON_STRINGS.intern(room)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Занятие из словаря {'time', 'subject', 'teacher', 'room'}"""
+        if isinstance(data, cls):
+            return data
+        start, end = parse_time_range(data['time'])
+        return cls(start, end, data.get('subject', ''), data.get('teacher', ''), data.get('room', ''))
+
+    @property
+    def time(self):
+        return format_time_range(self.start, self.end)
+
+    @property
+    def subject(self):
+        return LESSON_STRINGS[self.subject_id]
+
+    @property
+    def teacher(self):
+        return LESSON_STRINGS[self.teacher_id]
+
+    @property
+    def room(self):
+        return LESSON_STRINGS[self.room_id]
+
+    def keys(self):
+        return self.FIELDS
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def to_dict(self):
+        """Обычный словарь, например для JSON"""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __repr__(self):
+        return f'Lesson({self.to_dict()!r})'
+
+
+def validate_lesson(data):
+    """Проверить занятие {'time', 'subject', 'teacher', 'room'} из админки или строки файла.
+
+    Возвращает (Lesson, None) или (None, текст ошибки)
+    """
+    if not isinstance(data, dict):
+        return None, 'Занятие должно быть объектом с полями time, subject, teacher, room'
+    wrong = [field for field in LESSON_FIELDS if not isinstance(data.get(field, ''), str)]
+    if wrong:
+        return None, 'Должны быть строками: ' + ', '.join(wrong)
+    values = {field: data.get(field, '').strip() for field in LESSON_FIELDS}
+    # Пустой преподаватель или аудитория дали бы ложные накладки
+    empty = [field for field in LESSON_FIELDS if not values[field]]
+    if empty:
+        return None, 'Не заполнено: ' + ', '.join(empty)
+
+    match = TIME_RE.match(values['time'].replace(' ', ''))
+    if not match:
+        return None, f'Время должно быть в формате ЧЧ:ММ-ЧЧ:ММ: {values["time"]}'
+    start_h, start_m, end_h, end_m = map(int, match.groups())
+    if start_h > 23 or end_h > 23 or start_m > 59 or end_m > 59 or \
+            (start_h, start_m) >= (end_h, end_m):
+        return None, f'Некорректный интервал времени: {values["time"]}'
+    return Lesson(start_h * 60 + start_m, end_h * 60 + end_m,
+                  values['subject'], values['teacher'], values['room']), None
+
+
+def compact_schedule(schedule_data):
+    """Перевести занятия расписания {курс: {день: [занятия]}} в Lesson"""
+    return {
+        course: {day: [Lesson.from_dict(lesson) for lesson in lessons] for day, lessons in days.items()}
+        for course, days in schedule_data.items()
+    }
+
+
+class LessonIndex:
+    """Обратные индексы занятий по преподавателю, аудитории и предмету"""
+
+    FIELDS = ('teacher', 'room', 'subject')
+
+    def __init__(self):
+        # {field: {значение: {(курс, день, время): занятие}}}
+        self.index = {field: {} for field in self.FIELDS}
+
+    def rebuild(self, schedule_data):
+        """Перестроить индексы по всему расписанию"""
+        self.index = {field: {} for field in self.FIELDS}
+        for course, days in schedule_data.items():
+            for day, lessons in days.items():
+                for lesson in lessons:
+                    self.add(course, day, lesson)
+
+    def add(self, course, day, lesson):
+        """Добавить занятие в индексы"""
+        for field in self.FIELDS:
+            self.index[field].setdefault(lesson[field], {})[(course, day, lesson['time'])] = lesson
+
+    def remove(self, course, day, lesson):
+        """Убрать занятие из индексов"""
+        for field in self.FIELDS:
+            lessons = self.index[field].get(lesson[field])
+            if lessons is None:
+                continue
+            lessons.pop((course, day, lesson['time']), None)
+            if not lessons:
+                del self.index[field][lesson[field]]
+
+    def lookup(self, field, value, day=None):
+        """Занятия с данным значением поля, по порядку дней и времени"""
+        found = [
+            (DAYS.index(lesson_day), lesson.start, course, lesson_day, lesson)
+            for (course, lesson_day, _), lesson in self.index[field].get(value, {}).items()
+            if day is None or lesson_day == day
+        ]
+        found.sort(key=lambda item: item[:3])
+        return [{'course': course, 'day': lesson_day, **lesson} for _, _, course, lesson_day, lesson in found]
+
+    def values(self, field):
+        """Все значения поля (преподаватели, аудитории или предметы)"""
+        return sorted(self.index[field])
+
+    def has(self, field, value):
+        """Есть ли занятия с данным значением поля"""
+        return value in self.index[field]
+
 
 class ScheduleModule:
+    CHANGE_LOG_SIZE = 1000  # сколько последних правок хранится для синхронизации
+
     def __init__(self):
         self.schedule_data = {}
+        self.version = 0  # увеличивается при каждом изменении расписания
+        self.lock = threading.Lock()
+        # Журнал правок по возрастанию версии; клиенту с версией старше changes_floor
+        # дельты уже не собрать - он получает reset и загружает расписание заново
+        self.changes = []
+        self.changes_floor = 0
+        self.listeners = []  # callback(change) - вызываются под блокировкой, должны быть быстрыми
+        self.group_courses = {}  # {группа: курс}
+        # Индексы поверх schedule_data: rebuild(schedule_data), add/remove(course, day, lesson)
+        self.conflicts = ConflictDetector()
+        self.lesson_index = LessonIndex()
+        self.indexes = [self.conflicts, self.lesson_index]
         self.load_schedule()
+        self.rebuild_indexes()
+        self.load_exams()
 
     def load_schedule(self):
         """Загрузить данные расписания"""
-        self.schedule_data = {
+        schedule_data = {
             1: {  # 1 курс
                 'Понедельник': [
                     {'time': '09:00-10:30', 'subject': 'Математика', 'teacher': 'Петрова М.И.', 'room': '301'},
@@ -64,6 +278,157 @@ class ScheduleModule:
                 ]
             }
         }
+        self.schedule_data = compact_schedule(schedule_data)
+        self.group_courses = {'ПИ-21': 3}
+
+    def rebuild_indexes(self):
+        """Перестроить все индексы расписания"""
+        for index in self.indexes:
+            index.rebuild(self.schedule_data)
+
+    def add_index(self, index):
+        """Подключить внешний индекс: строится сразу и дальше обновляется при правках"""
+        with self.lock:
+            index.rebuild(self.schedule_data)
+            self.indexes.append(index)
+
+    def replace_schedule(self, schedule_data):
+        """Атомарно заменить все расписание (например, после импорта файла)"""
+        with self.lock:
+            self.schedule_data = compact_schedule(schedule_data)
+            self.rebuild_indexes()
+            self.version += 1
+            # После полной замены дельты не имеют смысла: журнал начинается заново
+            self.changes = []
+            self.changes_floor = self.version
+            self._notify({'version': self.version, 'action': 'replace'})
+            return self.version
+
+    def add_listener(self, callback):
+        """Подписаться на правки расписания: callback(change)"""
+        self.listeners.append(callback)
+
+    def get_changes(self, since, course=None):
+        """Правки после версии since (для курса или всех).
+
+        Если журнал уже не покрывает since, возвращает reset - нужна полная загрузка
+        """
+        with self.lock:
+            version = self.version
+            if since < self.changes_floor or since > version:
+                return {'version': version, 'reset': True, 'changes': []}
+            # Каждая правка увеличивает версию на 1, поэтому позиция в журнале вычисляется
+            changes = self.changes[since - self.changes_floor:]
+        if course is not None:
+            changes = [change for change in changes if change['course'] == course]
+        return {'version': version, 'reset': False, 'changes': changes}
+
+    def get_conflicts(self):
+        """Все накладки преподавателей и аудиторий"""
+        return self.conflicts.find_all()
+
+    def get_teacher_schedule(self, teacher):
+        """Неделя преподавателя: {день: [занятия с курсом]}"""
+        week = {}
+        for lesson in self.lesson_index.lookup('teacher', teacher):
+            week.setdefault(lesson['day'], []).append(lesson)
+        return week
+
+    def get_room_schedule(self, room, day=None):
+        """Занятия в аудитории (за день или за неделю)"""
+        return self.lesson_index.lookup('room', room, day)
+
+    def get_subject_lessons(self, subject):
+        """Все занятия по предмету"""
+        return self.lesson_index.lookup('subject', subject)
+
+    def find_lesson(self, course, day, time):
+        """Найти занятие курса по дню и времени"""
+        for lesson in self.schedule_data.get(course, {}).get(day, []):
+            if lesson['time'] == time:
+                return lesson
+        return None
+
+    def add_lesson(self, course, day, lesson, force=False):
+        """Добавить занятие. При накладках не сохраняет, если не указан force"""
+        with self.lock:
+            return self._save_lesson(course, day, None, lesson, force)
+
+    def update_lesson(self, course, day, time, fields, force=False):
+        """Изменить поля занятия (в том числе время)"""
+        with self.lock:
+            old = self.find_lesson(course, day, time)
+            if not old:
+                return {'success': False, 'message': 'Занятие не найдено', 'conflicts': []}
+            if not isinstance(fields, dict):
+                return {'success': False, 'message': 'Поля занятия должны быть объектом', 'conflicts': []}
+            return self._save_lesson(course, day, old, {**old, **fields}, force)
+
+    def remove_lesson(self, course, day, time):
+        """Удалить занятие"""
+        with self.lock:
+            lesson = self.find_lesson(course, day, time)
+            if not lesson:
+                return {'success': False, 'message': 'Занятие не найдено'}
+            lessons = self.schedule_data[course][day]
+            lessons.remove(lesson)
+            if not lessons:
+                del self.schedule_data[course][day]
+            for index in self.indexes:
+                index.remove(course, day, lesson)
+            self.version += 1
+            self._record_change('remove', course, day, time, None)
+            return {'success': True, 'message': 'Занятие удалено', 'version': self.version}
+
+    def _save_lesson(self, course, day, old, lesson, force):
+        if day not in DAYS:
+            return {'success': False, 'message': f'Неизвестный день недели: {day}', 'conflicts': []}
+        lesson, error = validate_lesson(lesson)
+        if error:
+            return {'success': False, 'message': error, 'conflicts': []}
+
+        existing = self.find_lesson(course, day, lesson['time'])
+        if existing and existing is not old:
+            return {'success': False, 'message': 'Это время у курса уже занято', 'conflicts': []}
+
+        ignore = (course, old['time']) if old else None
+        conflicts = self.conflicts.check(course, day, lesson, ignore=ignore)
+        if conflicts and not force:
+            return {'success': False, 'message': 'Накладка в расписании', 'conflicts': conflicts}
+
+        days = self.schedule_data.setdefault(course, {})
+        if day not in days:
+            days[day] = []
+            # Дни курса держим в порядке недели
+            self.schedule_data[course] = dict(sorted(days.items(), key=lambda item: DAYS.index(item[0])))
+        lessons = self.schedule_data[course][day]
+        if old:
+            lessons.remove(old)
+            for index in self.indexes:
+                index.remove(course, day, old)
+        lessons.append(lesson)
+        lessons.sort(key=lambda item: item.start)
+        for index in self.indexes:
+            index.add(course, day, lesson)
+        self.version += 1
+        self._record_change('update' if old else 'add', course, day, old['time'] if old else lesson['time'], lesson)
+        return {'success': True, 'message': 'Занятие сохранено', 'lesson': lesson.to_dict(),
+                'conflicts': conflicts, 'version': self.version}
+
+    def _record_change(self, action, course, day, time, lesson):
+        # time - время занятия до правки: по нему клиент находит, что заменить или удалить
+        change = {'version': self.version, 'action': action, 'course': course, 'day': day,
+                  'time': time, 'lesson': lesson.to_dict() if lesson else None}
+        self.changes.append(change)
+        if len(self.changes) > 2 * self.CHANGE_LOG_SIZE:
+            # Сжатие пачкой, а не по одной записи: старые правки отбрасываются
+            del self.changes[:-self.CHANGE_LOG_SIZE]
+            self.changes_floor = self.changes[0]['version'] - 1
+        self._notify(change)
+
+    def _notify(self, change):
+        for callback in self.listeners:
+            callback(change)
 
     def get_schedule(self, course):
         """Получить расписание для курса"""
@@ -73,14 +438,23 @@ class ScheduleModule:
         """Получить все расписания"""
         return self.schedule_data
 
+    def get_course_by_group(self, group):
+        """Курс группы из справочника групп (None - группа неизвестна или у курса нет расписания)"""
+        course = self.group_courses.get(group)
+        return course if course in self.schedule_data else None
+
+    def set_group_course(self, group, course):
+        """Записать курс группы (при переводе на следующий курс)"""
+        self.group_courses[group] = course
+
     def get_course_days(self, course):
         """Получить дни недели для курса"""
         schedule = self.get_schedule(course)
         return list(schedule.keys()) if schedule else []
 
-    def get_exams_schedule(self, course):
-        """Получить расписание экзаменов"""
-        exams = {
+    def load_exams(self):
+        """Загрузить расписание экзаменов и построить календарь по датам"""
+        self.exams_data = {
             1: [
                 {'date': '25.12.2023', 'subject': 'Математика', 'teacher': 'Петрова М.И.', 'room': '301'},
                 {'date': '27.12.2023', 'subject': 'Информатика', 'teacher': 'Иванов С.П.', 'room': '205'},
@@ -98,4 +472,46 @@ class ScheduleModule:
                 {'date': '20.12.2023', 'subject': 'Защита диплома', 'teacher': 'Комиссия', 'room': 'Актовый зал'}
             ]
         }
-        return exams.get(course, [])
\ No newline at end of file
+        self.rebuild_exam_calendar()
+
+    def rebuild_exam_calendar(self):
+        """Разобрать даты экзаменов один раз и отсортировать по дате"""
+        calendar = []
+        for course, exams in self.exams_data.items():
+            for exam in exams:
+                calendar.append((parse_date(exam['date']), course, exam))
+        calendar.sort(key=lambda item: (item[0], item[1]))
+
+        self.exam_dates = [exam_date for exam_date, _, _ in calendar]
+        self.exam_calendar = [{'course': course, **exam} for _, course, exam in calendar]
+        # {преподаватель: ([даты], [экзамены])} - тоже по дате
+        self.exams_by_teacher = {}
+        for exam_date, exam in zip(self.exam_dates, self.exam_calendar):
+            dates, exams = self.exams_by_teacher.setdefault(exam['teacher'], ([], []))
+            dates.append(exam_date)
+            exams.append(exam)
+
+    def get_exams_schedule(self, course):
+        """Получить расписание экзаменов"""
+        return self.exams_data.get(course, [])
+
+    def get_exams_between(self, start, end):
+        """Экзамены всех курсов с start по end включительно"""
+        start, end = parse_date(start), parse_date(end)
+        return self.exam_calendar[bisect_left(self.exam_dates, start):bisect_right(self.exam_dates, end)]
+
+    def get_exams_on(self, day):
+        """Экзамены всех курсов в указанный день"""
+        return self.get_exams_between(day, day)
+
+    def get_upcoming_exams(self, days, today=None):
+        """Экзамены в ближайшие days дней"""
+        today = today or date.today()
+        return self.get_exams_between(today, today + timedelta(days=days))
+
+    def get_exams_by_teacher(self, teacher, start=None, end=None):
+        """Экзамены преподавателя (при необходимости - в диапазоне дат)"""
+        dates, exams = self.exams_by_teacher.get(teacher, ([], []))
+        low = bisect_left(dates, parse_date(start)) if start else 0
+        high = bisect_right(dates, parse_date(end)) if end else len(dates)
+        return exams[low:high]
@@ -0,0 +1,102 @@
+"""
+Модуль push-уведомлений через Server-Sent Events (SSE)
+
+Каждое подключение - генератор, который ждет события в своей очереди.
+Под gevent-воркером (gunicorn -k gevent) это гринлет, а не поток ОС,
+поэтому тысячи простаивающих подключений обходятся дешево
+"""
+import json
+import queue
+import threading
+from collections import deque
+
+
+class Subscriber:
+    """Очередь событий одного подключения"""
+
+    def __init__(self, size):
+        self.queue = queue.Queue(size)
+        self.overflowed = False  # клиент не успевал читать - поток закрывается
+
+
+class EventBroker:
+    """Рассылка событий по темам с повтором пропущенного по Last-Event-ID"""
+
+    def __init__(self, history_size=1000, heartbeat=15, queue_size=100):
+        self.lock = threading.Lock()
+        self.last_id = 0  # id событий общие для всех тем - клиент помнит один Last-Event-ID
+        self.history = {}  # {тема: deque[(id, событие, данные)]} - кольцевой буфер
+        self.evicted = {}  # {тема: id последнего вытесненного из буфера события}
+        self.history_size = history_size
+        self.subscribers = {}  # {тема: {Subscriber}}
+        self.heartbeat = heartbeat
+        self.queue_size = queue_size
+
+    def publish(self, topic, event, data):
+        """Отправить событие всем подписчикам темы"""
+        with self.lock:
+            self.last_id += 1
+            item = (self.last_id, event, data)
+            history = self.history.setdefault(topic, deque(maxlen=self.history_size))
+            if len(history) == self.history_size:
+                self.evicted[topic] = history[0][0]
+            history.append(item)
+            subscribers = list(self.subscribers.get(topic, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(item)
+            except queue.Full:
+                # При переподключении клиент дочитает пропущенное из истории
+                subscriber.overflowed = True
+
+    def stream(self, topics, last_event_id=None):
+        """SSE-поток по темам: сначала пропущенное после last_event_id, затем новые события"""
+        subscriber = Subscriber(self.queue_size)
+        # Подписка и снимок истории под одной блокировкой: событие попадает
+        # либо в пропущенные, либо в очередь, но не туда и туда
+        with self.lock:
+            for topic in topics:
+                self.subscribers.setdefault(topic, set()).add(subscriber)
+            missed, complete = self._missed(topics, last_event_id)
+            current_id = self.last_id
+
+        try:
+            yield 'retry: 3000\n\n'
+            if not complete:
+                # Пропущенное не восстановить - клиент должен загрузить данные заново
+                yield self._format(current_id, 'reset', {})
+            for item in missed:
+                yield self._format(*item)
+            while not subscriber.overflowed:
+                try:
+                    item = subscriber.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    # Комментарий не дает прокси закрыть простаивающее соединение
+                    yield ': heartbeat\n\n'
+                    continue
+                yield self._format(*item)
+        finally:
+            with self.lock:
+                for topic in topics:
+                    subscribers = self.subscribers.get(topic)
+                    if subscribers is not None:
+                        subscribers.discard(subscriber)
+                        if not subscribers:
+                            del self.subscribers[topic]
+
+    def _missed(self, topics, last_event_id):
+        if last_event_id is None:
+            return [], True
+        # id больше выданных - сервер перезапускался, история потеряна
+        complete = last_event_id <= self.last_id
+        missed = []
+        for topic in topics:
+            if self.evicted.get(topic, 0) > last_event_id:
+                complete = False
+            missed.extend(item for item in self.history.get(topic, ()) if item[0] > last_event_id)
+        missed.sort(key=lambda item: item[0])
+        return missed, complete
+
+    @staticmethod
+    def _format(event_id, event, data):
+        return f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
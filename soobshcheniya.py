@@ -0,0 +1,164 @@
+"""
+Модуль сообщений: личные входящие, рассылки по каналам и счетчики непрочитанных
+"""
+import heapq
+import threading
+from bisect import bisect_left
+from datetime import datetime
+
+
+class MessageStore:
+    """Сообщения с индексом входящих по получателю.
+
+    Рассылка ('Все старосты') хранится один раз в ленте канала и попадает
+    во входящие участников только при чтении
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.messages = {}  # {id: сообщение}
+        self.last_id = 0
+        self.inboxes = {}  # {получатель: [id]} - личные сообщения по возрастанию id
+        self.conversations = {}  # {(участник, участник): [id]} - переписка двоих
+        self.channels = {}  # {канал: [id]} - рассылки
+        self.channel_members = {}  # {канал: {получатели}}
+        self.members = {}  # {получатель: {каналы}}
+        self.read = {}  # {получатель: {id прочитанных}}
+        self.unread_direct = {}  # {получатель: непрочитанных личных}
+        self.read_in_channel = {}  # {(получатель, канал): прочитано рассылок канала}
+        self.listeners = []  # callback(message) - вызываются под блокировкой, должны быть быстрыми
+
+    def add_listener(self, callback):
+        """Подписаться на новые сообщения: callback(message)"""
+        self.listeners.append(callback)
+
+    def is_channel(self, name):
+        """Является ли адрес каналом рассылки"""
+        return name in self.channels
+
+    def get_channels(self, recipient):
+        """Каналы рассылки, в которых состоит получатель"""
+        with self.lock:
+            return sorted(self.members.get(recipient, ()))
+
+    def add_channel(self, channel, members):
+        """Создать канал рассылки или добавить в него участников"""
+        with self.lock:
+            self.channels.setdefault(channel, [])
+            self.channel_members.setdefault(channel, set()).update(members)
+            for member in members:
+                self.members.setdefault(member, set()).add(channel)
+
+    def send(self, sender, to, subject, text, date=None, read=False):
+        """Отправить сообщение получателю или в канал. read - сразу прочитано (для загрузки истории)"""
+        with self.lock:
+            self.last_id += 1
+            message = {
+                'id': self.last_id,
+                'from': sender,
+                'to': to,
+                'subject': subject,
+                'message': text,
+                'date': date or datetime.now().strftime('%d.%m.%Y %H:%M'),
+                'broadcast': to in self.channels,
+            }
+            self.messages[message['id']] = message
+            if message['broadcast']:
+                self.channels[to].append(message['id'])
+            else:
+                self.inboxes.setdefault(to, []).append(message['id'])
+                self.conversations.setdefault(self._pair(sender, to), []).append(message['id'])
+                self.unread_direct[to] = self.unread_direct.get(to, 0) + 1
+            if read:
+                for recipient in self.channel_members.get(to, {to}):
+                    self._mark_read(recipient, [message['id']])
+            for callback in self.listeners:
+                callback(message)
+            return message
+
+    def get_inbox(self, recipient, cursor=None, limit=20):
+        """Входящие (личные и рассылки) от новых к старым; cursor - id последнего на прошлой странице"""
+        limit = max(1, limit)
+        with self.lock:
+            feeds = [self.inboxes.get(recipient, [])]
+            feeds += [self.channels[channel] for channel in self.members.get(recipient, ())]
+            ids = self._page(feeds, cursor, limit)
+            read = self.read.get(recipient, set())
+            messages = [{**self.messages[message_id], 'read': message_id in read} for message_id in ids]
+        return self._result(messages, limit)
+
+    def get_conversation(self, first, second, cursor=None, limit=20):
+        """Переписка двоих от новых сообщений к старым"""
+        limit = max(1, limit)
+        with self.lock:
+            ids = self._page([self.conversations.get(self._pair(first, second), [])], cursor, limit)
+            messages = [self.messages[message_id] for message_id in ids]
+        return self._result(messages, limit)
+
+    def unread_count(self, recipient):
+        """Непрочитанные: счетчик личных плюс разница длины ленты и прочитанного по каждому каналу"""
+        with self.lock:
+            count = self.unread_direct.get(recipient, 0)
+            for channel in self.members.get(recipient, ()):
+                count += len(self.channels[channel]) - self.read_in_channel.get((recipient, channel), 0)
+            return count
+
+    def mark_read(self, recipient, ids):
+        """Отметить прочитанными сообщения из списка id. ValueError - не список целых чисел"""
+        if not isinstance(ids, list) or not all(type(message_id) is int for message_id in ids):
+            raise ValueError('ids должен быть списком id сообщений')
+        with self.lock:
+            return self._mark_read(recipient, ids)
+
+    def mark_all_read(self, recipient):
+        """Отметить прочитанными все входящие"""
+        with self.lock:
+            ids = list(self.inboxes.get(recipient, []))
+            for channel in self.members.get(recipient, ()):
+                ids += self.channels[channel]
+            return self._mark_read(recipient, ids)
+
+    def _mark_read(self, recipient, ids):
+        read = self.read.setdefault(recipient, set())
+        channels = self.members.get(recipient, set())
+        marked = 0
+        for message_id in ids:
+            message = self.messages.get(message_id)
+            if message is None or message_id in read:
+                continue
+            if message['broadcast']:
+                if message['to'] not in channels:
+                    continue
+                key = (recipient, message['to'])
+                self.read_in_channel[key] = self.read_in_channel.get(key, 0) + 1
+            elif message['to'] == recipient:
+                self.unread_direct[recipient] -= 1
+            else:
+                continue
+            read.add(message_id)
+            marked += 1
+        return marked
+
+    @staticmethod
+    def _page(feeds, cursor, limit):
+        # Каждая лента отсортирована по id: идем с конца каждой и сливаем
+        def newest_first(feed):
+            position = len(feed) if cursor is None else bisect_left(feed, cursor)
+            for index in range(position - 1, -1, -1):
+                yield feed[index]
+
+        merged = heapq.merge(*(newest_first(feed) for feed in feeds), reverse=True)
+        return [message_id for _, message_id in zip(range(limit + 1), merged)]
+
+    @staticmethod
+    def _result(messages, limit):
+        next_cursor = None
+        # Пустая страница (limit <= 0) - курсора нет
+        if len(messages) > limit > 0:
+            messages = messages[:limit]
+            next_cursor = messages[-1]['id']
+        return {'messages': messages, 'next_cursor': next_cursor}
+
+    @staticmethod
+    def _pair(first, second):
+        return (first, second) if first <= second else (second, first)
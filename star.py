@@ -1,13 +1,35 @@
 """
 Модуль для работы с функционалом старосты
 """
+from poseshchaemost import AttendanceStore
+from soobshcheniya import MessageStore
 
 
 class StarostaModule:
     def __init__(self):
         self.students = []
         self.reports = []
-        self.messages = []
+        self.messages = MessageStore()
+        self.attendance = AttendanceStore()
+        self.load_attendance()
+        self.load_messages()
+
+    def load_attendance(self):
+        """Загрузить посещаемость групп"""
+        for student in self.get_students_data():
+            self.attendance.add_student(student['group'], student)
+        lessons = [
+            ('04.09.2023', 'Математика', [1, 2, 3, 4]),
+            ('04.09.2023', 'Информатика', [1, 2, 3, 4]),
+            ('05.09.2023', 'Иностранный язык', [1, 3, 4]),
+            ('05.09.2023', 'Программирование', [1, 2, 3]),
+            ('06.09.2023', 'Математика', [1, 2, 4]),
+            ('07.09.2023', 'Базы данных', [1, 3, 4]),
+            ('08.09.2023', 'Физика', [2, 3, 4]),
+            ('11.09.2023', 'Математика', [1, 3]),
+        ]
+        for lesson_date, subject, present_ids in lessons:
+            self.attendance.mark_lesson('ПИ-21', lesson_date, subject, present_ids)
 
     def get_students_data(self, group=None):
         """Получить список студентов"""
@@ -100,39 +122,36 @@ class StarostaModule:
         ]
         return info
 
-    def get_messages(self, user_id=None):
-        """Получить сообщения мессенджера"""
-        messages = [
-            {
-                'id': 1,
-                'from': 'Деканат',
-                'to': 'Все старосты',
-                'subject': 'Собрание старост',
-                'message': 'Напоминаем о собрании 15 октября в 15:00',
-                'date': '10.10.2023 14:30',
-                'read': True
-            },
-            {
-                'id': 2,
-                'from': 'Преподаватель Сидоров А.В.',
-                'to': 'Староста ПИ-21',
-                'subject': 'Список группы',
-                'message': 'Пришлите, пожалуйста, актуальный список группы',
-                'date': '09.10.2023 10:15',
-                'read': True
-            },
-            {
-                'id': 3,
-                'from': 'Студент Петров П.П.',
-                'to': 'Староста',
-                'subject': 'Вопрос по практике',
-                'message': 'Когда будет информация о месте прохождения практики?',
-                'date': '08.10.2023 16:45',
-                'read': False
-            }
-        ]
+    def load_messages(self):
+        """Загрузить сообщения мессенджера"""
+        self.messages.add_channel('Все старосты', ['Староста ПИ-21'])
+        self.messages.send('Студент Петров П.П.', 'Староста ПИ-21', 'Вопрос по практике',
+                           'Когда будет информация о месте прохождения практики?', '08.10.2023 16:45')
+        self.messages.send('Преподаватель Сидоров А.В.', 'Староста ПИ-21', 'Список группы',
+                           'Пришлите, пожалуйста, актуальный список группы', '09.10.2023 10:15', read=True)
+        self.messages.send('Деканат', 'Все старосты', 'Собрание старост',
+                           'Напоминаем о собрании 15 октября в 15:00', '10.10.2023 14:30', read=True)
+
+    def get_messages(self, recipient, cursor=None, limit=20):
+        """Входящие получателя (личные и рассылки) от новых к старым"""
+        return self.messages.get_inbox(recipient, cursor, limit)
+
+    def send_message(self, sender, to, subject, text, can_broadcast=False):
+        """Отправить сообщение получателю или в канал рассылки (только при can_broadcast)"""
+        if self.messages.is_channel(to) and not can_broadcast:
+            return {'success': False, 'message': 'Рассылку по каналу могут отправлять только администраторы'}
+        return {'success': True, 'message': self.messages.send(sender, to, subject, text)}
+
+    def get_conversation(self, first, second, cursor=None, limit=20):
+        """Переписка двоих от новых сообщений к старым"""
+        return self.messages.get_conversation(first, second, cursor, limit)
+
+    def get_unread_count(self, recipient):
+        """Число непрочитанных сообщений"""
+        return self.messages.unread_count(recipient)
 
-        if user_id:
-            return [m for m in messages if
-                    m['id'] == user_id or m['to'] == 'Староста ПИ-21' or m['to'] == 'Все старосты']
-        return messages
\ No newline at end of file
+    def mark_messages_read(self, recipient, ids=None):
+        """Отметить прочитанными выбранные (или все) сообщения"""
+        if ids is None:
+            return self.messages.mark_all_read(recipient)
+        return self.messages.mark_read(recipient, ids)
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from baza import SQLiteStorage, SQLiteUserRegistry, UserExistsError
+from vxod import AuthModule, PasswordHasher, UserRegistry
+
+
+def make_user(username, email, user_type='student', **fields):
+    return {'username': username, 'password': 'x', 'name': username, 'user_type': user_type,
+            'email': email, 'verified': False, 'created_at': '2024-01-01', **fields}
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def registry(request, tmp_path):
+    if request.param == 'memory':
+        return UserRegistry()
+    return SQLiteUserRegistry(SQLiteStorage(str(tmp_path / 'portal.db')))
+
+
+def test_duplicate_username_and_email_are_rejected(registry):
+    registry.add(make_user('ivanov', 'ivanov@edu.tech'))
+    with pytest.raises(UserExistsError) as error:
+        registry.add(make_user('ivanov', 'other@edu.tech'))
+    assert error.value.field == 'username'
+    with pytest.raises(UserExistsError) as error:
+        registry.add(make_user('other', 'ivanov@edu.tech'))
+    assert error.value.field == 'email'
+    assert len(registry) == 1
+
+
+def test_same_username_allowed_for_other_user_type(registry):
+    registry.add(make_user('ivanov', 'ivanov@edu.tech'))
+    registry.add(make_user('ivanov', 'ivanov@edu.tech', user_type='teacher'))
+    assert len(registry) == 2
+
+
+def test_concurrent_registration_creates_one_user(tmp_path):
+    # Два "процесса" с отдельными соединениями к одной базе
+    path = str(tmp_path / 'portal.db')
+    registries = [SQLiteUserRegistry(SQLiteStorage(path)) for _ in range(2)]
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def register(registry):
+        barrier.wait()
+        try:
+            registry.add(make_user('petrov', 'petrov@edu.tech'))
+        except UserExistsError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=register, args=(registry,)) for registry in registries]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 1
+    assert len(registries[0]) == 1
+
+
+def test_unique_indexes_replace_old_ones(tmp_path):
+    path = str(tmp_path / 'portal.db')
+    # База в прежней схеме: неуникальные индексы по логину и email
+    connection = SQLiteStorage(path).connection()
+    connection.executescript('DROP INDEX users_username_unique; DROP INDEX users_email_unique;'
+                             'CREATE INDEX users_username ON users (username, user_type);'
+                             'CREATE INDEX users_email ON users (email, user_type);')
+    connection.close()
+    storage = SQLiteStorage(path)
+    names = {row[0] for row in storage.connection().execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert 'users_username' not in names
+    assert {'users_username_unique', 'users_email_unique'} <= names
+
+
+def test_create_user_raises_user_exists(tmp_path):
+    auth = AuthModule(password_hasher=PasswordHasher(params=(1000,), workers=0),
+                      db_path=str(tmp_path / 'portal.db'))
+    with pytest.raises(UserExistsError):
+        auth.create_user('student1', 'secret1', 'Дубль', 'student', 'new@edu.tech')
+    user = auth.create_user('student9', 'secret1', 'Новый', 'student', 'new@edu.tech')
+    assert auth.users.get(user['id'])['username'] == 'student9'
@@ -0,0 +1,70 @@
+import pytest
+
+from baza import SQLiteStorage, SQLiteUserRegistry
+from dostupnost import BloomFilter
+from vxod import AuthModule, PasswordHasher
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    values = [f'user{number}' for number in range(1000)]
+    for value in values:
+        bloom.add(value)
+    assert all(value in bloom for value in values)
+    false_positives = sum(f'other{number}' in bloom for number in range(10000))
+    assert false_positives < 300  # ~1% при расчетной емкости
+
+
+def test_checker_confirms_hits_in_store():
+    auth = AuthModule(password_hasher=PasswordHasher(params=(1000,), workers=0))
+    checker = auth.availability
+    assert not checker.is_available('username', 'student1', 'student')
+    assert checker.is_available('username', 'student1', 'teacher')
+    result = checker.check({'username': 'nobody', 'email': 'student1@edu.tech', 'age': 1}, 'student')
+    assert result == {'username': {'available': True}, 'email': {'available': False},
+                      'age': {'error': 'Invalid field'}}
+
+
+def test_debounce_answers_repeated_query_from_cache():
+    auth = AuthModule(password_hasher=PasswordHasher(params=(1000,), workers=0))
+    checker = auth.availability
+    checker.debounce = 60
+    assert checker.check({'username': 'fresh'}, 'student', 'client')['username']['available']
+    auth.create_user('fresh', 'secret1', 'Новый', 'student', 'fresh@edu.tech')
+    assert checker.check({'username': 'fresh'}, 'student', 'client')['username']['available']
+    assert not checker.check({'username': 'fresh'}, 'student', 'other')['username']['available']
+
+
+def test_registration_check_sees_users_from_other_process(tmp_path):
+    path = str(tmp_path / 'portal.db')
+    hasher = PasswordHasher(params=(1000,), workers=0)
+    first, second = AuthModule(hasher, db_path=path), AuthModule(hasher, db_path=path)
+    first.create_user('newcomer', 'secret1', 'Новый', 'student', 'newcomer@edu.tech')
+    # Фильтр второго процесса о пользователе не знает, точная проверка - знает
+    assert second.availability.is_available('username', 'newcomer', 'student')
+    assert second.check_username_exists('newcomer', 'student')
+    assert second.check_email_exists('newcomer@edu.tech', 'student')
+    assert isinstance(second.users, SQLiteUserRegistry)
+    assert not SQLiteUserRegistry(SQLiteStorage(path)).find('phone', '+7000', 'student')
+
+
+def test_check_rejects_malformed_input():
+    auth = AuthModule(password_hasher=PasswordHasher(params=(1000,), workers=0))
+    checker = auth.availability
+    for fields in (['username'], 'student1', None):
+        with pytest.raises(ValueError):
+            checker.check(fields, 'student', 'client')
+    result = checker.check({'username': ['student1'], 'email': {'a': 1}, 'phone': None}, 'student', 'client')
+    assert result == {'username': {'error': 'Invalid value'}, 'email': {'error': 'Invalid value'},
+                      'phone': {'error': 'Invalid value'}}
+
+
+def test_recent_results_keep_only_latest_clients():
+    auth = AuthModule(password_hasher=PasswordHasher(params=(1000,), workers=0))
+    checker = auth.availability
+    checker.max_clients, checker.client_cache_size = 3, 2
+    for client in range(10):
+        for value in ('a', 'b', 'c'):
+            checker.check({'username': value}, 'student', f'client{client}')
+    assert list(checker.recent) == ['client7', 'client8', 'client9']
+    assert all(len(cache) == 2 for cache in checker.recent.values())
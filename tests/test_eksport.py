@@ -0,0 +1,80 @@
+import csv
+import io
+import zipfile
+from datetime import date
+
+import openpyxl
+import pytest
+
+from eksport import ROWS_PER_CHUNK, iter_attendance, iter_xlsx
+from poseshchaemost import AttendanceStore
+
+
+def make_store(students=3):
+    store = AttendanceStore()
+    for group in ('ПИ-21', 'ИС[2]/22'):
+        for student_id in range(students):
+            store.add_student(group, {'id': student_id, 'name': f'<Студент> {student_id} & Ко',
+                                      'student_id': f'S{student_id}'})
+        store.mark_lesson(group, '2026-09-01', 'Физика', [0])
+        store.mark_lesson(group, '2026-09-02', 'История', [0, 1])
+    return store
+
+
+def test_csv_has_single_bom_and_group_blocks():
+    store = make_store(students=ROWS_PER_CHUNK + 10)
+    chunks = list(iter_attendance(store, store.get_groups(), 'csv'))
+    assert len(chunks) > 2
+    data = b''.join(chunks)
+    assert data.startswith(b'\xef\xbb\xbf') and data.count(b'\xef\xbb\xbf') == 1
+    rows = list(csv.reader(io.StringIO(data.decode('utf-8-sig')), delimiter=';'))
+    assert rows[0] == ['Группа ИС[2]/22']
+    assert rows[1] == ['ФИО', 'Студенческий билет', '2026-09-01 Физика', '2026-09-02 История',
+                       'Пропусков', 'Посещаемость, %']
+    assert rows[2] == ['<Студент> 0 & Ко', 'S0', '+', '+', '0', '100.0']
+    assert rows[4] == ['<Студент> 2 & Ко', 'S2', 'н', 'н', '2', '0.0']
+    assert ['Группа ПИ-21'] in rows
+
+    single = b''.join(iter_attendance(store, ['ПИ-21'], 'csv', titled=False)).decode('utf-8-sig')
+    assert single.startswith('ФИО;')
+
+
+def test_xlsx_opens_in_openpyxl():
+    store = make_store()
+    data = b''.join(iter_attendance(store, store.get_groups(), 'xlsx'))
+    workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True)
+    # Недопустимые в названии листа символы заменены
+    assert workbook.sheetnames == ['ИС_2__22', 'ПИ-21']
+    rows = list(workbook['ПИ-21'].iter_rows(values_only=True))
+    assert rows[0][:3] == ('ФИО', 'Студенческий билет', '2026-09-01 Физика')
+    assert rows[2] == ('<Студент> 1 & Ко', 'S1', 'н', '+', 1, 50)
+    assert len(rows) == 4
+
+
+def test_zip_has_csv_per_group():
+    store = make_store()
+    data = b''.join(iter_attendance(store, store.get_groups(), 'zip'))
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ['ИС[2]_22.csv', 'ПИ-21.csv']
+        text = archive.read('ПИ-21.csv').decode('utf-8-sig')
+    assert text.splitlines()[0].startswith('ФИО;')
+    assert len(text.splitlines()) == 4
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        iter_attendance(make_store(), ['ПИ-21'], 'pdf')
+
+
+def test_xlsx_accepts_non_string_cells():
+    rows = [['Дата', 'Оценка', 'Зачет', 'Пусто', 'Доля'],
+            [date(2026, 9, 1), 5, True, None, float('nan')],
+            ['н', 4.5, False, '', 0.25]]
+    data = b''.join(iter_xlsx([('Итоги', iter(rows))]))
+    sheet = openpyxl.load_workbook(io.BytesIO(data), read_only=True)['Итоги']
+    assert list(sheet.iter_rows(values_only=True)) == [
+        ('Дата', 'Оценка', 'Зачет', 'Пусто', 'Доля'),
+        ('2026-09-01', 5, 'True', None, 'nan'),
+        ('н', 4.5, 'False', '', 0.25),
+    ]
@@ -0,0 +1,55 @@
+from datetime import date
+
+from kalendar import CalendarFeeds
+from rasp import ScheduleModule
+
+
+def feed_text(feeds, kind, value):
+    etag, chunks = feeds.get_feed(kind, value)
+    return etag, ''.join(chunks)
+
+
+def test_group_course_comes_from_mapping_not_date():
+    schedule = ScheduleModule()
+    assert schedule.get_course_by_group('ПИ-21') == 3
+    assert schedule.get_course_by_group('ПИ-99') is None
+    schedule.set_group_course('ПИ-21', 4)
+    assert schedule.get_course_by_group('ПИ-21') == 4
+    schedule.set_group_course('ПИ-21', 9)  # курса без расписания нет
+    assert schedule.get_course_by_group('ПИ-21') is None
+
+
+def test_course_feed_has_weekly_events():
+    schedule = ScheduleModule()
+    feeds = CalendarFeeds(schedule, semester=(date(2026, 9, 1), date(2026, 12, 31)))
+    _, text = feed_text(feeds, 'course', 3)
+    assert text.startswith('BEGIN:VCALENDAR')
+    assert text.count('BEGIN:VEVENT') >= len(schedule.get_schedule(3)['Понедельник'])
+    assert 'RRULE:FREQ=WEEKLY' in text
+    assert '\r\n' in text
+
+
+def test_feed_is_cached_per_version():
+    schedule = ScheduleModule()
+    feeds = CalendarFeeds(schedule, semester=(date(2026, 9, 1), date(2026, 12, 31)))
+    etag, first = feed_text(feeds, 'course', 1)
+    again, second = feed_text(feeds, 'course', 1)
+    assert (etag, first) == (again, second)
+    assert len(feeds.cache) == 1
+    schedule.remove_lesson(1, 'Понедельник', '09:00-10:30')
+    changed, third = feed_text(feeds, 'course', 1)
+    assert changed != etag
+    assert third.count('BEGIN:VEVENT') == first.count('BEGIN:VEVENT') - 1
+
+
+def test_unknown_teacher_or_course_is_not_cached():
+    schedule = ScheduleModule()
+    feeds = CalendarFeeds(schedule, semester=(date(2026, 9, 1), date(2026, 12, 31)), cache_size=2)
+    feed_text(feeds, 'teacher', 'Иванов С.П.')
+    for number in range(5):
+        assert feeds.get_feed('teacher', f'Случайный {number}') is None
+    assert feeds.get_feed('course', 9) is None
+    assert list(feeds.cache) == [('teacher', 'Иванов С.П.', schedule.version)]
+    # Преподаватель только с экзаменами
+    _, text = feed_text(feeds, 'teacher', 'Комиссия')
+    assert 'Защита диплома' in text
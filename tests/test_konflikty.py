@@ -0,0 +1,89 @@
+import random
+
+from konflikty import ConflictDetector
+from rasp import Lesson
+
+
+def lesson(start, end, teacher='Иванов И.И.', room='101'):
+    return Lesson(start, end, 'Математика', teacher, room)
+
+
+def normalize(conflicts):
+    """Накладки без учета порядка занятий в паре"""
+    return sorted((item['kind'], item['day'], item['value'],
+                   tuple(sorted((entry['course'], entry['time']) for entry in item['lessons'])))
+                  for item in conflicts)
+
+
+def brute_force(schedule):
+    lessons = [(course, day, item) for course, days in schedule.items()
+               for day, items in days.items() for item in items]
+    conflicts = []
+    for i, (course, day, first) in enumerate(lessons):
+        for other_course, other_day, second in lessons[i + 1:]:
+            if day != other_day or first.start >= second.end or second.start >= first.end:
+                continue
+            for kind in ('room', 'teacher'):
+                if first[kind] == second[kind] and (kind == 'room' or first[kind] != 'Куратор'):
+                    conflicts.append({'kind': kind, 'day': day, 'value': first[kind],
+                                      'lessons': [{'course': course, 'time': first['time']},
+                                                  {'course': other_course, 'time': second['time']}]})
+    return conflicts
+
+
+def random_schedule(rng, courses=6):
+    schedule = {}
+    for course in range(1, courses + 1):
+        schedule[course] = {}
+        for day in ('Понедельник', 'Вторник'):
+            starts = sorted(rng.sample(range(480, 1080, 15), 4))
+            schedule[course][day] = [
+                lesson(start, start + rng.choice((45, 90, 180)),
+                       rng.choice(['Иванов И.И.', 'Петров П.П.', 'Куратор']), rng.choice(['101', '102', '103']))
+                for start in starts]
+    return schedule
+
+
+def test_find_all_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(20):
+        schedule = random_schedule(rng)
+        detector = ConflictDetector()
+        detector.rebuild(schedule)
+        assert normalize(detector.find_all()) == normalize(brute_force(schedule))
+
+
+def test_check_finds_overlaps_before_and_after():
+    detector = ConflictDetector()
+    detector.rebuild({1: {'Понедельник': [lesson(480, 660, room='201'),  # 08:00-11:00
+                                          lesson(700, 790, teacher='Петров П.П.')]}})
+    # 10:30-12:00: длинное занятие началось раньше, следующее - позже
+    conflicts = detector.check(2, 'Понедельник', lesson(630, 720, room='101'))
+    assert normalize(conflicts) == [
+        ('room', 'Понедельник', '101', ((1, '11:40-13:10'), (2, '10:30-12:00'))),
+        ('teacher', 'Понедельник', 'Иванов И.И.', ((1, '08:00-11:00'), (2, '10:30-12:00'))),
+    ]
+    # Стык без перекрытия - не накладка
+    assert detector.check(2, 'Понедельник', lesson(660, 700, teacher='Сидоров С.С.', room='301')) == []
+
+
+def test_check_ignores_edited_lesson_and_shared_teacher():
+    detector = ConflictDetector()
+    original = lesson(480, 570)
+    detector.rebuild({1: {'Вторник': [original, lesson(600, 690, teacher='Куратор', room='102')]}})
+    moved = lesson(500, 590)
+    assert detector.check(1, 'Вторник', moved, ignore=(1, original['time'])) == []
+    assert detector.check(2, 'Вторник', lesson(600, 690, teacher='Куратор', room='103')) == []
+
+
+def test_remove_drops_lesson_and_empty_keys():
+    detector = ConflictDetector()
+    first, second = lesson(480, 570), lesson(500, 590, room='102')
+    detector.add(1, 'Среда', first)
+    detector.add(2, 'Среда', second)
+    assert len(detector.find_all()) == 1
+    detector.remove(2, 'Среда', second)
+    assert detector.find_all() == []
+    assert ('room', 'Среда', '102') not in detector.intervals
+    detector.remove(2, 'Среда', second)
+    assert list(detector.intervals) == [('room', 'Среда', '101'), ('teacher', 'Среда', 'Иванов И.И.')]
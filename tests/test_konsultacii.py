@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+
+from konsultacii import ConsultationIndex, parse_consultations
+from prepod import TeachersModule
+from rasp import ScheduleModule
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Пн 15:00-17:00, Ср 10:00-12:00', [('Понедельник', 900, 1020), ('Среда', 600, 720)]),
+    ('пн. 9:00 - 10:30; СР 10:00-09:00', [('Понедельник', 540, 630)]),
+    ('Пн 25:00-26:00, Вт 10:75-11:00', []),
+    ('Вс 10:00-12:00', []),
+    ('по договоренности', []),
+    ('', []),
+    (None, []),
+])
+def test_parse_consultations(text, expected):
+    assert parse_consultations(text) == expected
+
+
+@pytest.fixture
+def index():
+    teachers = TeachersModule()
+    # Суббота занята целиком, в остальные дни занятий нет
+    teachers.add_teacher({'name': 'Орлова Елена Николаевна', 'department': 'Химия',
+                          'position': 'Доцент', 'consultation': 'Сб 08:00-20:00'})
+    return ConsultationIndex(teachers, ScheduleModule())
+
+
+@pytest.mark.parametrize('now, expected', [
+    # Петрова М.И.: пн 09:00-10:30 и 10:45-12:15
+    (datetime(2026, 10, 19, 8, 30), ('19.10.2026', 'Понедельник', '08:30')),
+    (datetime(2026, 10, 19, 9, 30), ('19.10.2026', 'Понедельник', '10:30')),
+    (datetime(2026, 10, 19, 6, 0), ('19.10.2026', 'Понедельник', '08:00')),
+    # После конца рабочего дня - следующий день с утра
+    (datetime(2026, 10, 23, 20, 30), ('24.10.2026', 'Суббота', '08:00')),
+    # Воскресенье пропускается
+    (datetime(2026, 10, 24, 21, 0), ('26.10.2026', 'Понедельник', '08:00')),
+    (datetime(2026, 10, 18, 12, 0), ('19.10.2026', 'Понедельник', '08:00')),
+])
+def test_next_free_across_day_boundaries(index, now, expected):
+    result = index.next_free(2, now)
+    assert (result['date'], result['day'], result['time']) == expected
+
+
+def test_next_free_skips_fully_busy_day(index):
+    teacher = index.teachers_module.search_teachers('Орлова')[0]
+    result = index.next_free(teacher['id'], datetime(2026, 10, 24, 7, 0))
+    assert (result['day'], result['time']) == ('Понедельник', '08:00')
+    assert index.next_free(999, datetime(2026, 10, 24, 7, 0)) is None
+
+
+def test_consulting_now_and_teacher_updates(index):
+    tuesday = datetime(2026, 10, 20, 15, 0)
+    assert 2 in [slot['teacher_id'] for slot in index.consulting_now(tuesday)]
+    index.teachers_module.update_teacher(2, {'consultation': 'Ср 15:00-16:00'})
+    assert 2 not in [slot['teacher_id'] for slot in index.consulting_now(tuesday)]
+    assert index.consulting_now(datetime(2026, 10, 25, 15, 0)) == []
@@ -0,0 +1,54 @@
+from nagruzka import TeacherResolver, name_key
+from prepod import TeachersModule
+from rasp import ScheduleModule
+
+
+def make_resolver():
+    teachers, schedule = TeachersModule(), ScheduleModule()
+    resolver = TeacherResolver(teachers)
+    schedule.add_index(resolver)
+    return resolver, teachers, schedule
+
+
+def test_name_key_matches_short_and_full_names():
+    assert name_key('Петрова М.И.') == name_key('Петрова Мария Ивановна') == ('петрова', 'ми')
+    assert name_key('Ёлкин А.') == name_key('елкин Антон') == ('елкин', 'а')
+    assert name_key('  ') is None
+
+
+def test_resolve_resolved_ambiguous_unknown():
+    resolver, teachers, _ = make_resolver()
+    assert resolver.resolve('Петрова М.И.') == {'status': 'resolved', 'ids': [2]}
+    assert resolver.resolve('Новиков А.А.') == {'status': 'unknown', 'ids': []}
+
+    namesake = teachers.add_teacher({'name': 'Петрова Марина Игоревна', 'department': 'Физика',
+                                     'position': 'Доцент'})['teacher']
+    assert resolver.resolve('Петрова М.И.') == {'status': 'ambiguous', 'ids': sorted([2, namesake['id']])}
+    assert resolver.get_workload(2)['ambiguous']
+    assert {'names': ['Петрова М.И.'], 'ids': sorted([2, namesake['id']])} in resolver.report()['ambiguous']
+
+    teachers.remove_teacher(namesake['id'])
+    assert resolver.resolve('Петрова М.И.')['status'] == 'resolved'
+    # Переименование: старое имя больше не находится
+    teachers.update_teacher(2, {'name': 'Смирнова Мария Ивановна'})
+    assert resolver.resolve('Петрова М.И.')['status'] == 'unknown'
+    assert 'Петрова М.И.' in resolver.report()['unknown']
+
+
+def test_workload_follows_schedule_edits():
+    resolver, _, schedule = make_resolver()
+    before = resolver.get_workload(2)
+    assert resolver.schedule_names(2) == ['Петрова М.И.']
+    # 1 курс: пн и ср, 3 курс: пн - по 90 минут
+    assert [(item['course'], item['pairs']) for item in before['courses']] == [(1, 2), (3, 1)]
+    assert before['total_hours'] == 3 * 90 // 45
+
+    schedule.add_lesson(2, 'Среда', {'time': '16:30-18:00', 'subject': 'Математика',
+                                     'teacher': 'Петрова М.И.', 'room': '500'})
+    assert resolver.get_workload(2)['total_pairs'] == 4
+    schedule.remove_lesson(1, 'Понедельник', '09:00-10:30')
+    schedule.remove_lesson(1, 'Среда', '09:00-10:30')
+    assert [item['course'] for item in resolver.get_workload(2)['courses']] == [2, 3]
+    # Общее обозначение не попадает ни в нагрузку, ни в отчет
+    assert 'Куратор' not in resolver.report()['unknown']
+    assert resolver.get_workload(999) is None
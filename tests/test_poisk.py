@@ -0,0 +1,84 @@
+import pytest
+
+from poisk import SearchIndex, edit_distance, normalize, stem, tokenize
+from prepod import TeachersModule
+
+
+def make_index():
+    index = SearchIndex({'name': 3, 'department': 1})
+    index.add(1, {'name': 'Иванов Сергей Петрович', 'department': 'Программирование'})
+    index.add(2, {'name': 'Петрова Мария Ивановна', 'department': 'Математика'})
+    index.add(3, {'name': 'Сидоров Алексей', 'department': ['Физика', 'Базы данных']})
+    return index
+
+
+def test_normalization_and_stemming():
+    assert normalize('Ёлкин') == 'елкин'
+    assert tokenize('Петрова М.И., каб. 301') == ['петрова', 'м', 'и', 'каб', '301']
+    assert stem('математики') == stem('математика') == 'математик'
+    assert stem('ива') == 'ива'  # основа короче трех букв не остается
+
+
+@pytest.mark.parametrize('first, second, expected', [
+    ('иван', 'ивон', 1), ('петорва', 'петрова', 1), ('иван', 'ивна', 1), ('кот', 'котик', 2),
+    ('абв', 'где', 3),
+])
+def test_edit_distance(first, second, expected):
+    assert edit_distance(first, second, 3) == expected
+
+
+def test_edit_distance_stops_past_limit():
+    assert edit_distance('математика', 'физика', 1) == 2
+
+
+def test_exact_prefix_and_word_forms():
+    index = make_index()
+    assert [doc for doc, _ in index.search('математике')] == [2]
+    assert {doc for doc, _ in index.search('пет')} == {1, 2}
+    assert [doc for doc, _ in index.search('базы данн')] == [3]
+    assert index.search('') == []
+
+
+@pytest.mark.parametrize('query, expected', [('ивонов', 1), ('сидаров', 3), ('петрво', 2)])
+def test_single_typo_in_short_surname(query, expected):
+    assert make_index().search(query)[0][0] == expected
+
+
+def test_name_outranks_department():
+    index = SearchIndex({'name': 3, 'department': 1})
+    index.add(1, {'name': 'Физиков Иван', 'department': 'Химия'})
+    index.add(2, {'name': 'Орлов Петр', 'department': 'Физика'})
+    assert [doc for doc, _ in index.search('физик')] == [1, 2]
+
+
+def test_remove_cleans_up_index():
+    index = make_index()
+    index.remove(3)
+    assert index.search('сидоров') == []
+    assert 'сидоров' not in index.vocabulary
+    assert all('сидор' not in stems for stems in index.trigram_index.values())
+
+
+def test_complete_orders_by_frequency():
+    index = make_index()
+    index.add(4, {'name': 'Петров Олег', 'department': 'Математика'})
+    assert index.complete('мат') == ['математика']
+    assert index.complete('пет') == ['петров', 'петрова', 'петрович']
+
+
+def test_teachers_complete_query():
+    teachers = TeachersModule()
+    assert 'петрова мария' in teachers.complete_query('Петрова Ма')
+    assert teachers.complete_query('  ') == []
+
+
+def test_non_positive_limit_returns_nothing():
+    index = make_index()
+    assert len(index.search('петр')) == 2
+    assert len(index.search('петр', limit=None)) == 2
+    assert index.search('петр', limit=0) == [] and index.search('петр', limit=-1) == []
+    assert len(index.search('петр', limit=1)) == 1
+    assert index.complete('п', limit=0) == []
+    teachers = TeachersModule()
+    assert teachers.search_teachers('Иванов', limit=0) == []
+    assert teachers.suggest_teachers('Иванов', limit=0) == []
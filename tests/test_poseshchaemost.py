@@ -0,0 +1,63 @@
+import random
+
+from poseshchaemost import AttendanceStore
+
+
+def streaks(marks):
+    """(текущая, самая длинная) серия пропусков перебором"""
+    current = longest = 0
+    for mark in marks:
+        current = 0 if mark else current + 1
+        longest = max(longest, current)
+    return current, longest
+
+
+def make_store(rng, students=11, lessons=21):
+    store = AttendanceStore()
+    for student_id in range(students):
+        store.add_student('ПИ-21', {'id': student_id, 'name': f'Студент {student_id}'})
+    marks = {student_id: [] for student_id in range(students)}
+    for lesson in range(lessons):
+        present = [student_id for student_id in range(students) if rng.random() < 0.6]
+        store.mark_lesson('ПИ-21', f'2026-09-{lesson + 1:02d}', 'Физика', present + [999])
+        for student_id in range(students):
+            marks[student_id].append(student_id in present)
+    return store, marks
+
+
+def test_summary_matches_brute_force_after_growth():
+    rng = random.Random(3)
+    for _ in range(10):
+        store, marks = make_store(rng)
+        number = rng.randrange(21)
+        store.set_mark('ПИ-21', number, 4, not marks[4][number])
+        marks[4][number] = not marks[4][number]
+        assert [row for _, row in store.iter_rows('ПИ-21')] == [marks[student_id] for student_id in range(11)]
+
+        summary = store.get_summary('ПИ-21')
+        assert summary['lessons'] == 21
+        for student in summary['students']:
+            row = marks[student['id']]
+            assert student['present'] == sum(row)
+            assert student['absent'] == row.count(False)
+            assert student['percent'] == round(100 * sum(row) / len(row), 1)
+            assert (student['current_streak'], student['longest_streak']) == streaks(row)
+
+
+def test_summary_threshold_and_empty_group():
+    store = AttendanceStore()
+    assert store.get_summary('ПИ-21') is None
+    assert list(store.iter_rows('ПИ-21')) == []
+    for student_id in (1, 2):
+        store.add_student('ПИ-21', {'id': student_id, 'name': f'Студент {student_id}', 'student_id': 'S1'})
+    summary = store.get_summary('ПИ-21')
+    assert [(student['percent'], student['longest_streak']) for student in summary['students']] == [(0, 0), (0, 0)]
+
+    for _ in range(4):
+        store.mark_lesson('ПИ-21', '2026-09-01', 'Физика', [1])
+    store.set_mark('ПИ-21', 3, 2, True)
+    low = store.get_summary('ПИ-21', threshold=50)
+    assert [(student['id'], student['percent'], student['current_streak']) for student in low['students']] == [
+        (2, 25.0, 0)]
+    assert low['students'][0]['longest_streak'] == 3
+    assert store.get_lessons('ПИ-21')[0] == {'date': '2026-09-01', 'subject': 'Физика'}
@@ -0,0 +1,59 @@
+import pytest
+
+from kursor import encode_cursor
+from prepod import TeachersModule
+
+
+def make_module(count=30):
+    teachers = TeachersModule()
+    for teacher in list(teachers.get_all_teachers()):
+        teachers.remove_teacher(teacher['id'])
+    for number in range(count):
+        result = teachers.add_teacher({
+            'name': f'Преподаватель {number:02d}', 'position': 'Доцент' if number % 2 else 'Преподаватель',
+            'department': 'Математика' if number % 3 else 'Физика', 'subjects': [f'Предмет {number % 4}']})
+        assert result['success'], result
+    return teachers
+
+
+def collect(teachers, **filters):
+    names, cursor = [], None
+    while True:
+        page = teachers.list_teachers(cursor=cursor, limit=7, **filters)
+        names += [teacher['name'] for teacher in page['teachers']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            return names, page['total']
+
+
+def test_unfiltered_pages_follow_name_order():
+    names, total = collect(make_module())
+    assert names == [f'Преподаватель {number:02d}' for number in range(30)]
+    assert total == 30
+
+
+def test_filtered_pages_match_intersection():
+    teachers = make_module()
+    names, total = collect(teachers, department='Математика', position='Доцент')
+    expected = [f'Преподаватель {number:02d}' for number in range(30) if number % 3 and number % 2]
+    assert names == expected
+    assert total == len(expected)
+    assert collect(teachers, subject='Нет такого') == ([], 0)
+
+
+def test_indexes_follow_edits():
+    teachers = make_module(3)
+    teacher = teachers.get_teachers_by_department('Физика')[0]
+    teachers.update_teacher(teacher['id'], {'name': 'Аардварк Анна', 'department': 'Химия'})
+    assert teachers.get_teachers_by_department('Физика') == []
+    assert teachers.list_teachers(department='Химия')['teachers'][0]['name'] == 'Аардварк Анна'
+    assert teachers.list_teachers(limit=1)['teachers'][0]['name'] == 'Аардварк Анна'
+    teachers.remove_teacher(teacher['id'])
+    assert teachers.get_teacher_by_id(teacher['id']) is None
+    assert len(teachers.by_name) == 2
+
+
+@pytest.mark.parametrize('cursor', ['мусор', encode_cursor([1, 2]), encode_cursor(['Имя', 'id'])])
+def test_bad_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        make_module(3).list_teachers(cursor=cursor)
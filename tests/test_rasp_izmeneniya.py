@@ -0,0 +1,74 @@
+from rasp import ScheduleModule
+
+LESSON = {'time': '16:30-18:00', 'subject': 'Физика', 'teacher': 'Новиков А.А.', 'room': '500'}
+
+
+def test_every_write_bumps_version_and_logs_change():
+    schedule = ScheduleModule()
+    seen = []
+    schedule.add_listener(seen.append)
+    start = schedule.version
+    assert schedule.add_lesson(1, 'Среда', LESSON)['version'] == start + 1
+    assert schedule.update_lesson(1, 'Среда', '16:30-18:00', {'time': '18:10-19:40'})['success']
+    assert schedule.remove_lesson(2, 'Вторник', '09:00-10:30')['success']
+    # Отклоненная правка версию не меняет - ETag страницы остается прежним
+    assert not schedule.add_lesson(1, 'Среда', {**LESSON, 'time': '19:00-20:00'})['success']
+    assert schedule.version == start + 3
+
+    delta = schedule.get_changes(start)
+    assert delta['version'] == start + 3 and not delta['reset']
+    assert [(change['version'], change['action'], change['time']) for change in delta['changes']] == [
+        (start + 1, 'add', '16:30-18:00'),
+        (start + 2, 'update', '16:30-18:00'),
+        (start + 3, 'remove', '09:00-10:30'),
+    ]
+    assert delta['changes'][1]['lesson']['time'] == '18:10-19:40'
+    assert seen == delta['changes']
+    assert [change['course'] for change in schedule.get_changes(start, course=2)['changes']] == [2]
+    assert schedule.get_changes(start + 3)['changes'] == []
+
+
+def test_future_or_replaced_version_requires_reset():
+    schedule = ScheduleModule()
+    schedule.add_lesson(1, 'Среда', LESSON)
+    assert schedule.get_changes(schedule.version + 1)['reset']
+    before = schedule.version
+    assert schedule.replace_schedule({1: {'Понедельник': [LESSON]}}) == before + 1
+    assert schedule.get_changes(before) == {'version': before + 1, 'reset': True, 'changes': []}
+    assert schedule.get_changes(before + 1) == {'version': before + 1, 'reset': False, 'changes': []}
+
+
+def test_change_log_compaction_keeps_recent_deltas():
+    schedule = ScheduleModule()
+    schedule.CHANGE_LOG_SIZE = 3
+    start = schedule.version
+    for _ in range(4):
+        schedule.add_lesson(1, 'Среда', LESSON)
+        schedule.remove_lesson(1, 'Среда', LESSON['time'])
+    # 8 правок: после сжатия на 7-й остались последние 3 + новая
+    assert len(schedule.changes) == 4
+    assert schedule.changes_floor == start + 4
+    assert schedule.get_changes(start + 3)['reset']
+    delta = schedule.get_changes(start + 4)
+    assert [change['version'] for change in delta['changes']] == [start + 5, start + 6, start + 7, start + 8]
+
+
+def test_admin_edit_validates_like_importer():
+    schedule = ScheduleModule()
+    start = schedule.version
+    bad = [
+        ({**LESSON, 'time': '25:00-26:00'}, 'Некорректный интервал времени: 25:00-26:00'),
+        ({**LESSON, 'teacher': '', 'room': ' '}, 'Не заполнено: teacher, room'),
+        ({**LESSON, 'teacher': ['Иванов']}, 'Должны быть строками: teacher'),
+        ({**LESSON, 'time': 930}, 'Должны быть строками: time'),
+        ('16:30-18:00', 'Занятие должно быть объектом с полями time, subject, teacher, room'),
+    ]
+    for lesson, message in bad:
+        result = schedule.add_lesson(1, 'Среда', lesson)
+        assert (result['success'], result['message']) == (False, message)
+    result = schedule.update_lesson(1, 'Понедельник', '09:00-10:30', ['room'])
+    assert not result['success']
+    result = schedule.update_lesson(1, 'Понедельник', '09:00-10:30', {'room': ''})
+    assert result['message'] == 'Не заполнено: room'
+    assert schedule.version == start
+    assert ('room', 'Среда', '') not in schedule.conflicts.intervals
@@ -0,0 +1,78 @@
+import vxod
+from vxod import SessionStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_store(monkeypatch, **options):
+    clock = Clock()
+    monkeypatch.setattr(vxod.time, 'time', clock)
+    return SessionStore(**options), clock
+
+
+def test_idle_session_expires(monkeypatch):
+    store, clock = make_store(monkeypatch, idle_timeout=100)
+    session_id = store.create(1)
+    clock.now += 99
+    assert store.validate(session_id) == 1
+    clock.now += 100
+    assert store.validate(session_id) is None
+    assert session_id not in store
+    assert store.get_stats() == {'live': 0, 'expired': 1, 'evicted': 0}
+
+
+def test_sweep_keeps_active_sessions_and_reschedules_them(monkeypatch):
+    store, clock = make_store(monkeypatch, idle_timeout=100)
+    active, idle = store.create(1), store.create(2)
+    clock.now += 60
+    store.validate(active)
+    clock.now += 50
+    # Срок active в куче устарел: он переносится, а не удаляется
+    assert store.sweep() == 1
+    assert active in store and idle not in store
+    assert store.user_sessions == {1: {active: None}}
+    clock.now += 60
+    assert store.sweep() == 1
+    assert len(store) == 0 and not store.expiry_heap
+
+
+def test_sweep_limit_and_sweep_on_create(monkeypatch):
+    store, clock = make_store(monkeypatch, idle_timeout=10, sweep_batch=2)
+    for user_id in range(5):
+        store.create(user_id)
+    clock.now += 10
+    assert store.sweep(limit=1) == 1
+    # Создание сессии попутно убирает не больше sweep_batch истекших
+    store.create(99)
+    assert len(store) == 3
+    assert store.get_stats()['expired'] == 3
+
+
+def test_oldest_session_evicted_over_user_limit(monkeypatch):
+    store, clock = make_store(monkeypatch, max_per_user=2)
+    first = store.create(1)
+    second = store.create(1)
+    other = store.create(2)
+    third = store.create(1)
+    assert first not in store
+    assert {second, third, other} == set(store.sessions)
+    assert list(store.user_sessions[1]) == [second, third]
+    assert store.get_stats() == {'live': 3, 'expired': 0, 'evicted': 1}
+    # Запись вытесненной сессии в куче пропускается
+    clock.now += store.idle_timeout
+    assert store.sweep() == 3
+
+
+def test_delete_removes_user_index(monkeypatch):
+    store, _ = make_store(monkeypatch)
+    session_id = store.create(1)
+    store.delete(session_id)
+    store.delete(session_id)
+    assert store.validate(session_id) is None
+    assert store.user_sessions == {}
@@ -0,0 +1,61 @@
+import json
+
+from sobytiya import EventBroker
+
+
+def parse(frame):
+    """Кадр SSE -> (id, событие, данные)"""
+    fields = dict(line.split(': ', 1) for line in frame.strip().split('\n'))
+    return int(fields['id']), fields['event'], json.loads(fields['data'])
+
+
+def test_resume_replays_missed_events_of_subscribed_topics():
+    broker = EventBroker()
+    broker.publish('raspisanie', 'change', {'version': 1})
+    broker.publish('inbox:1', 'message', {'text': 'Привет'})
+    broker.publish('inbox:2', 'message', {'text': 'чужое'})
+    broker.publish('raspisanie', 'change', {'version': 2})
+
+    stream = broker.stream(['inbox:1', 'raspisanie'], last_event_id=1)
+    assert next(stream) == 'retry: 3000\n\n'
+    assert parse(next(stream)) == (2, 'message', {'text': 'Привет'})
+    assert parse(next(stream)) == (4, 'change', {'version': 2})
+    # Новое событие приходит через очередь подписчика
+    broker.publish('inbox:1', 'message', {'text': 'еще'})
+    assert parse(next(stream)) == (5, 'message', {'text': 'еще'})
+    stream.close()
+    assert broker.subscribers == {}
+
+
+def test_reset_when_history_evicted_or_id_unknown():
+    broker = EventBroker(history_size=2)
+    for version in range(1, 5):
+        broker.publish('raspisanie', 'change', {'version': version})
+    stream = broker.stream(['raspisanie'], last_event_id=1)
+    next(stream)
+    assert parse(next(stream)) == (4, 'reset', {})
+    assert [parse(next(stream))[0] for _ in range(2)] == [3, 4]
+    stream.close()
+
+    # Id из будущего - сервер перезапускался
+    stream = broker.stream(['raspisanie'], last_event_id=99)
+    next(stream)
+    assert parse(next(stream))[1] == 'reset'
+    stream.close()
+
+    stream = broker.stream(['raspisanie'], last_event_id=2)
+    next(stream)
+    assert parse(next(stream)) == (3, 'change', {'version': 3})
+    stream.close()
+
+
+def test_heartbeat_while_idle_and_close_on_overflow():
+    broker = EventBroker(heartbeat=0.01, queue_size=1)
+    stream = broker.stream(['raspisanie'])
+    next(stream)
+    assert next(stream) == ': heartbeat\n\n'
+    broker.publish('raspisanie', 'change', {'version': 1})
+    broker.publish('raspisanie', 'change', {'version': 2})
+    # Клиент отстал: поток заканчивается, при переподключении он дочитает историю
+    assert list(stream) == []
+    assert broker.subscribers == {}
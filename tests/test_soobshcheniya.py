@@ -0,0 +1,91 @@
+import pytest
+
+from soobshcheniya import MessageStore
+from star import StarostaModule
+
+
+def make_store():
+    store = MessageStore()
+    store.add_channel('Все старосты', ['Староста ПИ-21', 'Староста ИС-22'])
+    return store
+
+
+def collect(store, recipient, limit):
+    ids, cursor = [], None
+    while True:
+        page = store.get_inbox(recipient, cursor, limit)
+        ids += [message['id'] for message in page['messages']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            return ids
+
+
+def test_inbox_merges_direct_and_broadcast_newest_first():
+    store = make_store()
+    for number in range(10):
+        to = 'Все старосты' if number % 3 == 0 else 'Староста ПИ-21'
+        store.send('Деканат', to, f'Тема {number}', 'текст')
+    store.send('Деканат', 'Староста ИС-22', 'Чужое', 'текст')
+    assert collect(store, 'Староста ПИ-21', 3) == list(range(10, 0, -1))
+    assert collect(store, 'Староста ИС-22', 3) == [11, 10, 7, 4, 1]
+
+
+def test_unread_counters_follow_marks():
+    store = make_store()
+    direct = store.send('Студент', 'Староста ПИ-21', 'Вопрос', 'текст')
+    broadcast = store.send('Деканат', 'Все старосты', 'Собрание', 'текст')
+    assert store.unread_count('Староста ПИ-21') == 2
+    assert store.unread_count('Староста ИС-22') == 1
+    # Чужие и повторные отметки не учитываются
+    assert store.mark_read('Староста ИС-22', [direct['id'], broadcast['id'], broadcast['id']]) == 1
+    assert store.unread_count('Староста ПИ-21') == 2
+    assert store.mark_all_read('Староста ПИ-21') == 2
+    assert store.unread_count('Староста ПИ-21') == 0
+
+
+def test_conversation_contains_both_directions():
+    store = make_store()
+    store.send('Студент', 'Староста ПИ-21', 'Вопрос', 'раз')
+    store.send('Староста ПИ-21', 'Студент', 'Ответ', 'два')
+    store.send('Другой', 'Староста ПИ-21', 'Вопрос', 'три')
+    page = store.get_conversation('Староста ПИ-21', 'Студент')
+    assert [message['message'] for message in page['messages']] == ['два', 'раз']
+
+
+def test_listeners_see_new_messages():
+    store = make_store()
+    seen = []
+    store.add_listener(seen.append)
+    message = store.send('Деканат', 'Все старосты', 'Тема', 'текст')
+    assert seen == [message]
+
+
+def test_only_admins_broadcast_to_channels():
+    starosta = StarostaModule()
+    result = starosta.send_message('Студент', 'Все старосты', 'Спам', 'текст')
+    assert result == {'success': False, 'message': 'Рассылку по каналу могут отправлять только администраторы'}
+    assert starosta.send_message('Деканат', 'Все старосты', 'Собрание', 'текст', can_broadcast=True)['success']
+    assert starosta.send_message('Студент', 'Староста ПИ-21', 'Вопрос', 'текст')['success']
+
+
+def test_zero_or_negative_limit_returns_one_message():
+    store = make_store()
+    for number in range(3):
+        store.send('Деканат', 'Староста ПИ-21', f'Тема {number}', 'текст')
+    for limit in (0, -5):
+        page = store.get_inbox('Староста ПИ-21', limit=limit)
+        assert [message['id'] for message in page['messages']] == [3]
+        assert page['next_cursor'] == 3
+    assert store.get_inbox('Никто', limit=0) == {'messages': [], 'next_cursor': None}
+    assert store.get_conversation('Деканат', 'Староста ПИ-21', limit=0)['next_cursor'] == 3
+    assert MessageStore._result([], 0) == {'messages': [], 'next_cursor': None}
+
+
+def test_mark_read_rejects_non_list_ids():
+    store = make_store()
+    store.send('Деканат', 'Староста ПИ-21', 'Тема', 'текст')
+    for ids in (5, '1', {'id': 1}, [1, '2'], [[1]], [True]):
+        with pytest.raises(ValueError):
+            store.mark_read('Староста ПИ-21', ids)
+    assert store.unread_count('Староста ПИ-21') == 1
+    assert store.mark_read('Староста ПИ-21', [1, 99]) == 1
@@ -0,0 +1,54 @@
+import pytest
+
+from baza import SQLiteStorage, SQLiteUserRegistry
+from kursor import encode_cursor
+from vxod import UserRegistry
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def registry(request, tmp_path):
+    registry = UserRegistry() if request.param == 'memory' else \
+        SQLiteUserRegistry(SQLiteStorage(str(tmp_path / 'portal.db')))
+    for number in range(1, 8):
+        registry.add({'username': f'user{number}', 'password': 'x', 'name': f'Студент {8 - number}',
+                      'user_type': 'student', 'email': f'user{number}@edu.tech', 'group': 'ПИ-21',
+                      'verified': number % 2 == 0, 'created_at': f'2024-01-0{number}'})
+    return registry
+
+
+def collect(registry, **filters):
+    pages, cursor = [], None
+    while True:
+        page = registry.list_users('student', cursor=cursor, limit=3, **filters)
+        pages.append([user['username'] for user in page['users']])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pages_cover_all_users_once(registry):
+    assert collect(registry) == [['user1', 'user2', 'user3'], ['user4', 'user5', 'user6'], ['user7']]
+    assert collect(registry, sort='name') == [['user7', 'user6', 'user5'], ['user4', 'user3', 'user2'], ['user1']]
+    assert collect(registry, sort='created_at', order='desc', verified=True) == [['user6', 'user4', 'user2']]
+
+
+def test_created_range_excludes_upper_bound(registry):
+    pages = collect(registry, sort='created_at', created_from='2024-01-02', created_to='2024-01-05')
+    assert pages == [['user2', 'user3', 'user4']]
+
+
+def test_non_positive_limit_returns_one_user(registry):
+    page = registry.list_users('student', limit=0)
+    assert [user['username'] for user in page['users']] == ['user1']
+
+
+@pytest.mark.parametrize('cursor', ['не курсор', encode_cursor(['2024-01-01', 1]), encode_cursor([1, 'a']),
+                                    encode_cursor([True, 1])])
+def test_bad_cursor_raises_value_error(registry, cursor):
+    with pytest.raises(ValueError):
+        registry.list_users('student', sort='id', cursor=cursor)
+
+
+def test_unknown_sort_raises_value_error(registry):
+    with pytest.raises(ValueError):
+        registry.list_users('student', sort='password')
@@ -0,0 +1,96 @@
+import smtplib
+import time
+
+from uvedomleniya import NotificationQueue
+
+
+class FakeConnection:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, message):
+        self.sent.append(message['To'])
+
+
+class FakePool:
+    sender = 'noreply@example.com'
+
+    def __init__(self):
+        self.connection = FakeConnection()
+
+    def acquire(self):
+        return self.connection
+
+    def release(self, connection, broken=False):
+        pass
+
+
+def test_invalid_addresses_are_rejected():
+    notifications = NotificationQueue(workers=1)
+    assert not notifications.send_email('a@b.ru\nBcc: x@y.ru', 'Тема', 'Текст')
+    assert not notifications.send_email('без собаки', 'Тема', 'Текст')
+    assert not notifications.send_sms('123\n', 'Текст')
+    assert notifications.queue.qsize() == 0
+
+
+def test_worker_survives_bad_notification():
+    pool = FakePool()
+    notifications = NotificationQueue(smtp_pool=pool, workers=1)
+    # Мимо проверки адреса - как если бы письмо попало в очередь напрямую
+    notifications.queue.put({'kind': 'email', 'to': 'a@b.ru\r\nX: y', 'subject': 'т', 'body': 'т', 'attempts': 0})
+    notifications.start()
+    notifications.join()
+    assert notifications.send_email('student@example.com', 'Код', '123456')
+    notifications.join()
+    assert all(thread.is_alive() for thread in notifications.threads)
+    assert pool.connection.sent == ['student@example.com']
+    assert notifications.stats == {'sent': 1, 'retried': 0, 'failed': 1}
+
+
+def test_failing_sender_is_retried_then_failed():
+    calls = []
+
+    def sender(phone, text):
+        calls.append(phone)
+        raise OSError('нет связи')
+
+    notifications = NotificationQueue(sms_sender=sender, workers=1, max_attempts=3, backoff=0.01)
+    assert notifications.send_sms('+7 900 000-00-00', 'Код')
+    deadline = time.time() + 5
+    while notifications.stats['failed'] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(calls) == 3
+    assert notifications.stats == {'sent': 0, 'retried': 2, 'failed': 1}
+
+
+def test_requeue_does_not_block_on_full_queue():
+    notifications = NotificationQueue(workers=1, max_size=1)
+    notifications.queue.put({'kind': 'sms', 'to': '+70000000000', 'body': '', 'attempts': 0})
+    for _ in range(3):
+        notifications.retry_heap.append((0, len(notifications.retry_heap),
+                                         {'kind': 'sms', 'to': '+70000000001', 'body': '', 'attempts': 1}))
+    notifications._requeue_due()  # без put_nowait здесь был бы вечный deadlock
+    assert len(notifications.retry_heap) == 3
+    assert notifications.queue.qsize() == 1
+
+
+def test_dead_workers_are_restarted():
+    notifications = NotificationQueue(workers=2)
+    notifications.start()
+    notifications.threads[0] = type('Dead', (), {'is_alive': lambda self: False})()
+    notifications.start()
+    assert len(notifications.threads) == 2
+    assert all(thread.is_alive() for thread in notifications.threads)
+
+
+def test_smtp_errors_schedule_retry():
+    pool = FakePool()
+
+    def refuse(message):
+        raise smtplib.SMTPRecipientsRefused({})
+
+    pool.connection.send_message = refuse
+    notifications = NotificationQueue(smtp_pool=pool, workers=1, backoff=60)
+    notifications._deliver_emails([{'kind': 'email', 'to': 'a@b.ru', 'subject': 'т', 'body': 'т', 'attempts': 0}])
+    assert notifications.stats['retried'] == 1
+    assert len(notifications.retry_heap) == 1
@@ -0,0 +1,89 @@
+import hashlib
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from vxod import AuthModule, PasswordHasher, PasswordHasherBusy
+
+
+def make_auth(db_path=None):
+    return AuthModule(password_hasher=PasswordHasher(params=(1000,), workers=0), db_path=db_path)
+
+
+@pytest.mark.parametrize('in_db', [False, True])
+def test_shared_email_verifies_and_resets_only_requested_type(tmp_path, in_db):
+    auth = make_auth(str(tmp_path / 'portal.db') if in_db else None)
+    email = 'i.s.petrovich@tech.edu'  # уже у teacher1
+    student = auth.create_user('newstudent', 'secret1', 'Новый', 'student', email)
+    _, code = auth.create_verification_code(email, 'email', 'student')
+    result = auth.verify_code(email, code)
+    assert result['user_type'] == 'student'
+
+    verified = auth.verify_user(email, result['user_type'])
+    assert verified['user']['username'] == 'newstudent'
+    assert auth.get_user_by_email(email, 'student')['verified']
+    assert auth.get_user_by_email(email, 'teacher')['username'] == 'teacher1'
+
+    assert auth.update_password(email, 'changed1', 'student')['success']
+    assert auth.authenticate(email, 'changed1', 'student')['success']
+    assert auth.authenticate(email, 'teacher123', 'teacher')['success']
+    assert not auth.update_password(email, 'changed1', 'admin')['success']
+    assert student['id'] != auth.get_user_by_email(email, 'teacher')['id']
+
+
+def test_hash_and_verify_all_formats():
+    hasher = PasswordHasher(params=(1000,), workers=0)
+    hashed = hasher.hash('secret1')
+    assert hashed.startswith('pbkdf2_sha256$1000$')
+    assert hashed != hasher.hash('secret1')  # соль каждый раз новая
+    assert hasher.verify('secret1', hashed) and not hasher.verify('secret2', hashed)
+    assert not hasher.needs_rehash(hashed)
+
+    scrypt = PasswordHasher('scrypt', params=(2 ** 8, 8, 1), workers=0)
+    assert scrypt.verify('secret1', scrypt.hash('secret1'))
+    legacy = hashlib.sha256(b'secret1').hexdigest()
+    assert hasher.verify('secret1', legacy) and hasher.needs_rehash(legacy)
+
+
+def test_login_rehashes_with_current_params():
+    auth = make_auth()
+    user = auth.users.find('username', 'student1')
+    auth.users.update(user, password=hashlib.sha256(b'password123').hexdigest())
+    assert not auth.authenticate('student1', 'wrong', 'student')['success']
+    assert auth.authenticate('student1', 'password123', 'student')['success']
+    assert auth.users.find('username', 'student1')['password'].startswith('pbkdf2_sha256$1000$')
+
+    auth.password_hasher.params = (2000,)
+    assert auth.authenticate('student1', 'password123', 'student')['success']
+    assert auth.users.find('username', 'student1')['password'].startswith('pbkdf2_sha256$2000$')
+
+
+def test_full_queue_raises_busy():
+    hasher = PasswordHasher(params=(1000,), workers=1, max_queue=0, queue_timeout=0.01)
+    auth = AuthModule(password_hasher=PasswordHasher(params=(1000,), workers=0))
+    auth.password_hasher = hasher
+    # Единственный слот занят другим запросом
+    hasher.slots.acquire()
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash('secret1')
+        assert auth.authenticate('student1', 'password123')['message'] == 'Сервер перегружен, попробуйте позже'
+        with pytest.raises(PasswordHasherBusy):
+            auth.create_user('busy', 'secret1', 'Новый', 'student', 'busy@edu.tech')
+        assert not auth.check_username_exists('busy')
+    finally:
+        hasher.slots.release()
+
+
+def test_pool_recovers_after_worker_death():
+    hasher = PasswordHasher(params=(1000,), workers=1)
+    try:
+        assert hasher.verify('secret1', hasher.hash('secret1'))
+        first_pool = hasher.pool
+        with pytest.raises(BrokenProcessPool):
+            hasher._run(os._exit, 1)
+        assert hasher.verify('secret1', hasher.hash('secret1'))
+        assert hasher.pool is not first_pool
+    finally:
+        hasher.shutdown()
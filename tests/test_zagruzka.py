@@ -0,0 +1,74 @@
+import io
+
+import pytest
+from openpyxl import Workbook
+
+from rasp import ScheduleModule
+from zagruzka import ScheduleImporter
+
+HEADER = 'Курс;День;Время;Предмет;Преподаватель;Аудитория\n'
+
+
+@pytest.fixture
+def importer():
+    return ScheduleImporter(ScheduleModule())
+
+
+def import_csv(importer, text):
+    return importer.import_file(io.BytesIO(text.encode('utf-8-sig')), 'schedule.csv')
+
+
+def test_csv_replaces_schedule(importer):
+    result = import_csv(importer, HEADER + '1;понедельник;10:40-12:10;Математика;Петрова М.И.;301\n'
+                                           '1;Понедельник;9:00-10:30;Физика;Сидоров А.В.;205\n')
+    assert result['success'], result
+    lessons = importer.schedule_module.get_schedule(1)['Понедельник']
+    assert [lesson['time'] for lesson in lessons] == ['09:00-10:30', '10:40-12:10']
+
+
+@pytest.mark.parametrize('course', ['inf', '-inf', 'nan', '2.5', '0', 'два'])
+def test_bad_course_is_row_error(importer, course):
+    result = import_csv(importer, HEADER + f'{course};Понедельник;9:00-10:30;Физика;Сидоров А.В.;205\n')
+    assert not result['success']
+    assert result['errors'] == [{'line': 2, 'message': f'Некорректный курс: {course}'}]
+
+
+@pytest.mark.parametrize('time, message', [
+    ('25:00-26:00', 'Некорректный интервал времени: 25:00-26:00'),
+    ('10:60-11:00', 'Некорректный интервал времени: 10:60-11:00'),
+    ('10:30-09:00', 'Некорректный интервал времени: 10:30-09:00'),
+    ('9-10', 'Время должно быть в формате ЧЧ:ММ-ЧЧ:ММ: 9-10'),
+])
+def test_bad_time_is_row_error(importer, time, message):
+    result = import_csv(importer, HEADER + f'1;Понедельник;{time};Физика;Сидоров А.В.;205\n')
+    assert result['errors'] == [{'line': 2, 'message': message}]
+
+
+def test_duplicate_time_is_reported(importer):
+    before = importer.schedule_module.get_all_schedules()
+    result = import_csv(importer, HEADER + '1;Понедельник;9:00-10:30;Физика;Сидоров А.В.;205\n'
+                                           '2;Понедельник;9:00-10:30;Физика;Сидоров А.В.;206\n'
+                                           '1;Понедельник;09:00-10:30;Химия;Орлова Е.Н.;101\n')
+    assert not result['success']
+    assert result['errors'] == [{'line': 4, 'message': 'Это время у курса уже занято (строка 2)'}]
+    assert importer.schedule_module.get_all_schedules() == before
+
+
+@pytest.mark.parametrize('content', [b'not a zip file', b'PK\x03\x04broken'])
+def test_corrupt_xlsx_is_reported(importer, content):
+    result = importer.import_file(io.BytesIO(content), 'schedule.xlsx')
+    assert not result['success']
+    assert result['message'].startswith('Не удалось прочитать файл')
+
+
+def test_xlsx_numeric_course(importer):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['course', 'day', 'time', 'subject', 'teacher', 'room'])
+    sheet.append([3.0, 'Среда', '13:00-14:30', 'История', 'Кузнецов П.П.', 404])
+    stream = io.BytesIO()
+    workbook.save(stream)
+    stream.seek(0)
+    result = importer.import_file(stream, 'schedule.XLSX')
+    assert result['success'], result
+    assert importer.schedule_module.get_schedule(3)['Среда'][0]['room'] == '404'
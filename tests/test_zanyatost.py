@@ -0,0 +1,52 @@
+from rasp import Lesson
+from zanyatost import ALL_SLOTS, OccupancyIndex, lesson_mask, slot_bit
+
+
+def lesson(start, end, teacher='Иванов С.П.', room='205'):
+    return Lesson(start, end, 'Информатика', teacher, room)
+
+
+def test_lesson_mask_covers_overlapped_pairs():
+    assert lesson_mask('Понедельник', lesson(540, 630)) == slot_bit('Понедельник', 1)
+    # 10:00-13:30 задевает 2-ю и 3-ю пары вторника
+    assert lesson_mask('Вторник', lesson(600, 810)) == (
+        slot_bit('Вторник', 1) | slot_bit('Вторник', 2) | slot_bit('Вторник', 3))
+    assert lesson_mask('Вторник', lesson(630, 645)) == 0
+
+
+def test_overlapping_lessons_free_slot_only_after_last_removed():
+    index = OccupancyIndex(room_capacity={'205': 20, '410': 60})
+    first, second = lesson(540, 630), lesson(540, 630, teacher='Петрова М.И.')
+    index.add(1, 'Понедельник', first)
+    index.add(2, 'Понедельник', second)
+    assert [item['room'] for item in index.free_rooms('Понедельник', 1)] == ['410']
+    index.remove(1, 'Понедельник', first)
+    assert [item['room'] for item in index.free_rooms('Понедельник', 1)] == ['410']
+    assert index.busy_mask(teacher='Иванов С.П.') == 0
+    index.remove(2, 'Понедельник', second)
+    assert [item['room'] for item in index.free_rooms('Понедельник', 1, min_capacity=10)] == ['205', '410']
+    assert index.counts == {}
+
+
+def test_first_common_free_slot():
+    index = OccupancyIndex()
+    index.rebuild({1: {'Понедельник': [lesson(540, 630)]},
+                   2: {'Понедельник': [lesson(645, 735, teacher='Куратор', room='105')]}})
+    assert index.first_common_free_slot(course=1) == {'day': 'Понедельник', 'pair': 2, 'time': '10:45-12:15'}
+    assert index.first_common_free_slot(teacher='Иванов С.П.', room='105')['pair'] == 3
+    # Куратор - общее обозначение, его занятость не учитывается
+    assert index.busy_mask(teacher='Куратор') == 0
+    assert index.first_common_free_slot(course=1, days=['Среда'])['day'] == 'Среда'
+    index.masks['course'][1] = ALL_SLOTS
+    assert index.first_common_free_slot(course=1) is None
+
+
+def test_rooms_from_schedule_without_capacity_are_searched():
+    index = OccupancyIndex(room_capacity={'205': 20})
+    index.rebuild({1: {'Понедельник': [lesson(540, 630, room='Лаборатория 1'),
+                                       lesson(645, 735, teacher='Петрова М.И.', room='Лаборатория 2')]}})
+    free = index.free_rooms('Понедельник', 1)
+    assert free == [{'room': '205', 'capacity': 20}, {'room': 'Лаборатория 2', 'capacity': None}]
+    # С фильтром по вместимости неизвестные не подходят
+    assert index.free_rooms('Понедельник', 1, min_capacity=10) == [{'room': '205', 'capacity': 20}]
+    assert index.free_rooms('Понедельник', 1, min_capacity=30) == []
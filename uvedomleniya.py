@@ -0,0 +1,264 @@
+"""
+Модуль очереди уведомлений (email и SMS)
+"""
+import heapq
+import itertools
+import queue
+import re
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+# Адрес без пробелов и переводов строк - иначе заголовок письма не собрать
+EMAIL_RE = re.compile(r'[^@\s]+@[^@\s]+\.[^@\s]+')
+PHONE_RE = re.compile(r'\+?[0-9][0-9 ()-]{5,20}')
+
+
+class SMTPConnectionPool:
+    """Пул переиспользуемых SMTP-соединений"""
+
+    def __init__(self, host, port=25, username=None, password=None, use_tls=False,
+                 sender='noreply@techportal.edu', size=2, timeout=10):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.sender = sender
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(maxsize=size)
+
+    def acquire(self):
+        """Взять соединение из пула или открыть новое"""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, connection, broken=False):
+        """Вернуть соединение в пул (сломанное - закрыть)"""
+        if not broken:
+            try:
+                self.idle.put_nowait(connection)
+                return
+            except queue.Full:
+                pass
+        self._close(connection)
+
+    def close_all(self):
+        """Закрыть все простаивающие соединения"""
+        while True:
+            try:
+                self._close(self.idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password)
+        return connection
+
+    def _close(self, connection):
+        try:
+            connection.quit()
+        except smtplib.SMTPException:
+            connection.close()
+        except OSError:
+            pass
+
+
+class NotificationQueue:
+    """Асинхронная очередь отправки уведомлений с пакетной доставкой и повторами"""
+
+    def __init__(self, smtp_pool=None, sms_sender=None, workers=2, batch_size=20,
+                 max_attempts=5, backoff=1.0, max_size=10000):
+        self.smtp_pool = smtp_pool  # None - демо-режим, вывод в консоль
+        self.sms_sender = sms_sender or self.print_sms
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.queue = queue.Queue(maxsize=max_size)
+        self.retry_heap = []  # [(время следующей попытки, порядковый номер, уведомление)]
+        self.retry_lock = threading.Lock()
+        self.sequence = itertools.count()
+        self.threads = []
+        self.start_lock = threading.Lock()
+        self.stats = {'sent': 0, 'retried': 0, 'failed': 0}
+        self.stats_lock = threading.Lock()
+
+    def send_email(self, email, subject, body):
+        """Поставить email в очередь отправки"""
+        return self.enqueue({'kind': 'email', 'to': email, 'subject': subject, 'body': body})
+
+    def send_sms(self, phone, text):
+        """Поставить SMS в очередь отправки"""
+        return self.enqueue({'kind': 'sms', 'to': phone, 'body': text})
+
+    def enqueue(self, notification):
+        """Добавить уведомление в очередь. False - неверный адрес или очередь переполнена"""
+        pattern = EMAIL_RE if notification['kind'] == 'email' else PHONE_RE
+        if not isinstance(notification['to'], str) or not pattern.fullmatch(notification['to']):
+            return False
+        self.start()
+        notification.setdefault('attempts', 0)
+        try:
+            self.queue.put_nowait(notification)
+        except queue.Full:
+            return False
+        return True
+
+    def start(self):
+        """Запустить фоновые обработчики; завершившиеся запускаются заново"""
+        if len(self.threads) == self.workers and all(thread.is_alive() for thread in self.threads):
+            return
+        with self.start_lock:
+            self.threads = [thread for thread in self.threads if thread.is_alive()]
+            for number in range(len(self.threads), self.workers):
+                thread = threading.Thread(target=self._work, name=f'notifications-{number}', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def join(self):
+        """Дождаться отправки всех поставленных уведомлений"""
+        self.queue.join()
+
+    def _work(self):
+        while True:
+            self._requeue_due()
+            try:
+                first = self.queue.get(timeout=self._next_retry_delay())
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._deliver(batch)
+            except Exception as error:
+                # Обработчик не должен умирать: иначе очередь перестанет разбираться
+                print(f'Ошибка отправки уведомлений: {error!r}')
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _deliver(self, batch):
+        emails = [n for n in batch if n['kind'] == 'email']
+        if emails:
+            self._deliver_emails(emails)
+
+        for notification in batch:
+            if notification['kind'] != 'sms':
+                continue
+            try:
+                self.sms_sender(notification['to'], notification['body'])
+                self._count('sent')
+            except Exception:
+                self._schedule_retry(notification)
+
+    def _deliver_emails(self, emails):
+        """Отправить пакет писем через одно соединение"""
+        if not self.smtp_pool:
+            for notification in emails:
+                self.print_email(notification)
+                self._count('sent')
+            return
+
+        try:
+            connection = self.smtp_pool.acquire()
+        except (smtplib.SMTPException, OSError):
+            for notification in emails:
+                self._schedule_retry(notification)
+            return
+
+        broken = False
+        for notification in emails:
+            if broken:
+                self._schedule_retry(notification)
+                continue
+            try:
+                message = self._build_email(notification)
+            except ValueError:
+                # Письмо не собрать - повтор не поможет
+                self._count('failed')
+                continue
+            try:
+                connection.send_message(message)
+                self._count('sent')
+            except (smtplib.SMTPServerDisconnected, OSError):
+                # Соединение оборвалось - остаток пакета уйдет повтором
+                broken = True
+                self._schedule_retry(notification)
+            except Exception:
+                self._schedule_retry(notification)
+        self.smtp_pool.release(connection, broken=broken)
+
+    def _build_email(self, notification):
+        message = EmailMessage()
+        message['From'] = self.smtp_pool.sender
+        message['To'] = notification['to']
+        message['Subject'] = notification['subject']
+        message.set_content(notification['body'])
+        return message
+
+    def _count(self, name):
+        with self.stats_lock:
+            self.stats[name] += 1
+
+    def _schedule_retry(self, notification):
+        notification['attempts'] += 1
+        if notification['attempts'] >= self.max_attempts:
+            self._count('failed')
+            return
+        self._count('retried')
+        # Экспоненциальная задержка: 1, 2, 4, 8... секунд
+        due = time.time() + self.backoff * 2 ** (notification['attempts'] - 1)
+        with self.retry_lock:
+            heapq.heappush(self.retry_heap, (due, next(self.sequence), notification))
+
+    def _requeue_due(self):
+        now = time.time()
+        due = []
+        with self.retry_lock:
+            while self.retry_heap and self.retry_heap[0][0] <= now:
+                due.append(heapq.heappop(self.retry_heap))
+        # В очередь - вне блокировки и без ожидания: если она полна,
+        # остаток ждет в куче, пока обработчики ее разберут
+        for index, item in enumerate(due):
+            try:
+                self.queue.put_nowait(item[2])
+            except queue.Full:
+                with self.retry_lock:
+                    for rest in due[index:]:
+                        heapq.heappush(self.retry_heap, rest)
+                return
+
+    def _next_retry_delay(self):
+        with self.retry_lock:
+            if not self.retry_heap:
+                return 1.0
+            return min(1.0, max(0.0, self.retry_heap[0][0] - time.time()))
+
+    @staticmethod
+    def print_email(notification):
+        """Демо-отправка email - вывод в консоль"""
+        print(f"=== ДЕМО: Отправка email на {notification['to']} ===")
+        print(notification['subject'])
+        print(notification['body'])
+        print("=== КОНЕЦ ДЕМО ===")
+
+    @staticmethod
+    def print_sms(phone, text):
+        """Демо-отправка SMS - вывод в консоль"""
+        print(f"=== ДЕМО: Отправка SMS на {phone} ===")
+        print(text)
+        print("=== КОНЕЦ ДЕМО ===")
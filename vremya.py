@@ -0,0 +1,25 @@
+"""
+Вспомогательные функции для работы со временем занятий
+"""
+
+
+def parse_time(text):
+    """'09:00' -> минуты от начала суток"""
+    hours, minutes = text.strip().split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_time_range(text):
+    """'09:00-10:30' -> (540, 630)"""
+    start, end = text.split('-')
+    return parse_time(start), parse_time(end)
+
+
+def format_time(minutes):
+    """540 -> '09:00'"""
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+def format_time_range(start, end):
+    """(540, 630) -> '09:00-10:30'"""
+    return f'{format_time(start)}-{format_time(end)}'
@@ -2,18 +2,456 @@ import secrets
 import time
 from datetime import datetime
 import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from baza import (SORT_TYPES, UNIQUE_FIELDS, SQLiteCodeStore, SQLiteSessionStore,
+                  SQLiteStorage, SQLiteUserRegistry, UserExistsError)
+from dostupnost import AvailabilityChecker
+from kursor import decode_cursor, encode_cursor
+from uvedomleniya import NotificationQueue
+
+
+def _derive_key(password, salt, algorithm, params):
+    """Вычислить ключ пароля выбранной KDF"""
+    if algorithm == 'pbkdf2_sha256':
+        iterations, = params
+        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    if algorithm == 'scrypt':
+        n, r, p = params
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r, dklen=32)
+    raise ValueError(f'Неизвестный алгоритм хеширования: {algorithm}')
+
+
+def _parse_password_hash(hashed_password):
+    """Разобрать хеш вида 'алгоритм$параметры$соль$ключ'"""
+    parts = hashed_password.split('$')
+    if len(parts) < 4:
+        # Старый формат - несоленый SHA-256
+        return 'sha256', (), b'', hashed_password
+    algorithm, *params, salt, key = parts
+    return algorithm, tuple(int(p) for p in params), bytes.fromhex(salt), key
+
+
+def _hash_password_job(password, algorithm, params):
+    """Задача пула: посчитать хеш пароля с новой солью"""
+    salt = os.urandom(16)
+    key = _derive_key(password, salt, algorithm, params)
+    return '$'.join([algorithm, *map(str, params), salt.hex(), key.hex()])
+
+
+def _verify_password_job(password, hashed_password):
+    """Задача пула: проверить пароль по сохраненному хешу"""
+    algorithm, params, salt, key = _parse_password_hash(hashed_password)
+    if algorithm == 'sha256':
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+    else:
+        candidate = _derive_key(password, salt, algorithm, params).hex()
+    return hmac.compare_digest(candidate, key)
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Очередь хеширования паролей переполнена"""
+
+
+class PasswordHasher:
+    """Хеширование паролей медленной KDF в ограниченном пуле процессов"""
+
+    DEFAULT_PARAMS = {
+        'pbkdf2_sha256': (260000,),  # (итерации,)
+        'scrypt': (2 ** 14, 8, 1),  # (n, r, p)
+    }
+
+    def __init__(self, algorithm='pbkdf2_sha256', params=None, workers=None,
+                 max_queue=32, queue_timeout=5):
+        self.algorithm = algorithm
+        self.params = tuple(params or self.DEFAULT_PARAMS[algorithm])
+        # workers=0 - считать в потоке запроса (удобно для отладки)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.queue_timeout = queue_timeout
+        # Выполняемые задачи + ожидающие в очереди
+        self.slots = threading.BoundedSemaphore(self.workers + max_queue) if self.workers else None
+        self.pool = None
+        self.pool_lock = threading.Lock()
+
+    def hash(self, password):
+        """Посчитать хеш пароля с текущими параметрами"""
+        return self._run(_hash_password_job, password, self.algorithm, self.params)
+
+    def verify(self, password, hashed_password):
+        """Проверить пароль"""
+        return self._run(_verify_password_job, password, hashed_password)
+
+    def needs_rehash(self, hashed_password):
+        """Нужно ли пересчитать хеш с текущими параметрами"""
+        algorithm, params, _, _ = _parse_password_hash(hashed_password)
+        return algorithm != self.algorithm or params != self.params
+
+    def shutdown(self):
+        """Остановить пул процессов"""
+        with self.pool_lock:
+            if self.pool:
+                self.pool.shutdown()
+                self.pool = None
+
+    def _get_pool(self):
+        with self.pool_lock:
+            if self.pool is None:
+                # spawn, а не fork: fork из многопоточного процесса Flask может
+                # унаследовать захваченные другими потоками блокировки
+                self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+            return self.pool
+
+    def _drop_pool(self, pool):
+        # Пул с убитым процессом не восстанавливается - следующий вызов создаст новый
+        with self.pool_lock:
+            if self.pool is pool:
+                self.pool = None
+        pool.shutdown(wait=False)
+
+    def _run(self, job, *args):
+        if not self.workers:
+            return job(*args)
+
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy('Очередь хеширования паролей переполнена')
+        try:
+            for attempt in range(2):
+                pool = self._get_pool()
+                try:
+                    return pool.submit(job, *args).result()
+                except BrokenProcessPool:
+                    self._drop_pool(pool)
+                    if attempt:
+                        raise
+        finally:
+            self.slots.release()
+
+
+class UserRegistry:
+    """Реестр пользователей с индексами по id, логину, email и телефону"""
+
+    INDEXED_FIELDS = ('username', 'email', 'phone')
+    SORT_FIELDS = ('id', 'created_at', 'name')
+
+    def __init__(self):
+        self.by_id = {}  # {user_id: user}
+        self.by_type = {}  # {user_type: {user_id: user}}
+        # {field: {value: {user_type: user}}} - значения разбиты по типу пользователя
+        self.indexes = {field: {} for field in self.INDEXED_FIELDS}
+        # {(user_type, group): {sort: [(значение, id)]}} - отсортированные списки для
+        # постраничного вывода; None в ключе - без фильтра по этому полю
+        self.sorted_indexes = {}
+        self.last_id = 0
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def next_id(self):
+        """Получить следующий свободный ID"""
+        return self.last_id + 1
+
+    def add(self, user):
+        """Добавить пользователя и проиндексировать его. UserExistsError - логин или email заняты"""
+        for field in UNIQUE_FIELDS:
+            if user['user_type'] in self.indexes[field].get(user.get(field), {}):
+                raise UserExistsError(field)
+        if user.get('id') is None:
+            user['id'] = self.next_id()
+        self.by_id[user['id']] = user
+        self.by_type.setdefault(user['user_type'], {})[user['id']] = user
+        self.last_id = max(self.last_id, user['id'])
+        for field in self.INDEXED_FIELDS:
+            self._index(field, user)
+        self._index_sorted(user)
+        return user
+
+    def update(self, user, **fields):
+        """Обновить поля пользователя, поддерживая индексы"""
+        resort = any(field in self.SORT_FIELDS or field == 'group' for field in fields)
+        if resort:
+            self._unindex_sorted(user)
+        for field, value in fields.items():
+            if field in self.indexes:
+                self._unindex(field, user)
+                user[field] = value
+                self._index(field, user)
+            else:
+                user[field] = value
+        if resort:
+            self._index_sorted(user)
+        return user
+
+    def get(self, user_id):
+        """Получить пользователя по ID"""
+        return self.by_id.get(user_id)
+
+    def find(self, field, value, user_type=None):
+        """Найти пользователя по индексируемому полю"""
+        if not value:
+            return None
+        partition = self.indexes[field].get(value)
+        if not partition:
+            return None
+        if user_type:
+            return partition.get(user_type)
+        # Первый добавленный пользователь с таким значением
+        return next(iter(partition.values()))
+
+    def find_by_identifier(self, identifier, user_type=None, fields=INDEXED_FIELDS):
+        """Найти пользователя по логину, email или телефону"""
+        for field in fields:
+            user = self.find(field, identifier, user_type)
+            if user:
+                return user
+        return None
+
+    def get_by_type(self, user_type):
+        """Получить всех пользователей определенного типа"""
+        return list(self.by_type.get(user_type, {}).values())
+
+    def list_users(self, user_type=None, group=None, course=None, verified=None,
+                   created_from=None, created_to=None, sort='id', order='asc',
+                   cursor=None, limit=50):
+        """Страница пользователей с фильтрами и курсором (created_to не включается)"""
+        if sort not in self.SORT_FIELDS or order not in ('asc', 'desc'):
+            raise ValueError('Неизвестный порядок сортировки')
+        limit = max(1, limit)
+        after = tuple(decode_cursor(cursor, SORT_TYPES[sort])) if cursor else None
+
+        partition = self.sorted_indexes.get((user_type, group))
+        if not partition:
+            return {'users': [], 'next_cursor': None}
+        entries = partition[sort]
+
+        if order == 'asc':
+            start = bisect_right(entries, after) if after else 0
+            positions = range(start, len(entries))
+        else:
+            stop = bisect_left(entries, after) if after else len(entries)
+            positions = range(stop - 1, -1, -1)
+
+        users = []
+        for position in positions:
+            value, user_id = entries[position]
+            if sort == 'created_at':
+                # Дальше по индексу только записи вне диапазона
+                if order == 'asc' and created_to and value >= created_to:
+                    break
+                if order == 'desc' and created_from and value < created_from:
+                    break
+            user = self.by_id[user_id]
+            if course is not None and str(user.get('course')) != str(course):
+                continue
+            if verified is not None and user.get('verified') != verified:
+                continue
+            if created_from and user['created_at'] < created_from:
+                continue
+            if created_to and user['created_at'] >= created_to:
+                continue
+            users.append(user)
+            if len(users) > limit:
+                break
+
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor([users[-1][sort], users[-1]['id']])
+        return {'users': users, 'next_cursor': next_cursor}
+
+    def _sorted_partitions(self, user):
+        keys = [(None, None), (user['user_type'], None)]
+        if user.get('group'):
+            keys += [(None, user['group']), (user['user_type'], user['group'])]
+        return keys
+
+    def _index_sorted(self, user):
+        for key in self._sorted_partitions(user):
+            partition = self.sorted_indexes.setdefault(key, {sort: [] for sort in self.SORT_FIELDS})
+            for sort, entries in partition.items():
+                insort(entries, (user[sort], user['id']))
+
+    def _unindex_sorted(self, user):
+        for key in self._sorted_partitions(user):
+            for sort, entries in self.sorted_indexes[key].items():
+                entry = (user[sort], user['id'])
+                position = bisect_left(entries, entry)
+                if position < len(entries) and entries[position] == entry:
+                    del entries[position]
+
+    def _index(self, field, user):
+        value = user.get(field)
+        if value:
+            partition = self.indexes[field].setdefault(value, {})
+            partition.setdefault(user['user_type'], user)
+
+    def _unindex(self, field, user):
+        value = user.get(field)
+        partition = self.indexes[field].get(value)
+        if partition and partition.get(user['user_type']) is user:
+            del partition[user['user_type']]
+            if not partition:
+                del self.indexes[field][value]
+
+
+class SessionStore:
+    """Хранилище сессий с вытеснением по времени бездействия"""
+
+    def __init__(self, idle_timeout=1800, max_per_user=5, sweep_batch=64):
+        self.idle_timeout = idle_timeout  # 30 минут бездействия
+        self.max_per_user = max_per_user
+        self.sweep_batch = sweep_batch
+        self.sessions = {}  # {session_id: {'user_id', 'created_at', 'last_activity'}}
+        self.user_sessions = {}  # {user_id: OrderedDict(session_id)} - в порядке создания
+        # Мин-куча (срок истечения, session_id). Срок в куче может быть меньше
+        # реального: last_activity обновляется без перестройки кучи
+        self.expiry_heap = []
+        self.expired_count = 0
+        self.evicted_count = 0
+        self.lock = threading.Lock()
+        self.sweeper = None
+
+    def __contains__(self, session_id):
+        return session_id in self.sessions
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def create(self, user_id):
+        """Создать сессию, вытесняя самую старую сверх лимита на пользователя"""
+        session_id = secrets.token_hex(32)
+        now = time.time()
+        with self.lock:
+            self._sweep(now, self.sweep_batch)
+            self.sessions[session_id] = {
+                'user_id': user_id,
+                'created_at': now,
+                'last_activity': now
+            }
+            heapq.heappush(self.expiry_heap, (now + self.idle_timeout, session_id))
+
+            user_sessions = self.user_sessions.setdefault(user_id, OrderedDict())
+            user_sessions[session_id] = None
+            while len(user_sessions) > self.max_per_user:
+                oldest_id, _ = user_sessions.popitem(last=False)
+                del self.sessions[oldest_id]
+                self.evicted_count += 1
+        return session_id
+
+    def validate(self, session_id):
+        """Проверить сессию и продлить ее. Возвращает user_id или None"""
+        now = time.time()
+        with self.lock:
+            self._sweep(now, self.sweep_batch)
+            session = self.sessions.get(session_id)
+            if not session:
+                return None
+            if now - session['last_activity'] >= self.idle_timeout:
+                # Сессия истекла
+                self._remove(session_id)
+                self.expired_count += 1
+                return None
+            session['last_activity'] = now
+            return session['user_id']
+
+    def delete(self, session_id):
+        """Удалить сессию"""
+        with self.lock:
+            if session_id in self.sessions:
+                self._remove(session_id)
+
+    def sweep(self, limit=None):
+        """Удалить истекшие сессии (не более limit за вызов)"""
+        with self.lock:
+            return self._sweep(time.time(), limit)
+
+    def get_stats(self):
+        """Количество живых, истекших и вытесненных сессий"""
+        return {
+            'live': len(self.sessions),
+            'expired': self.expired_count,
+            'evicted': self.evicted_count
+        }
+
+    def start_sweeper(self, interval=60):
+        """Запустить фоновую очистку истекших сессий"""
+        if self.sweeper:
+            return self.sweeper
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.sweep()
+
+        self.sweeper = threading.Thread(target=run, name='session-sweeper', daemon=True)
+        self.sweeper.start()
+        return self.sweeper
+
+    def _sweep(self, now, limit):
+        removed = 0
+        heap = self.expiry_heap
+        while heap and heap[0][0] <= now and (limit is None or removed < limit):
+            _, session_id = heapq.heappop(heap)
+            session = self.sessions.get(session_id)
+            if not session:
+                # Сессия уже удалена или вытеснена
+                continue
+            expires_at = session['last_activity'] + self.idle_timeout
+            if expires_at > now:
+                # Сессия была активна - переносим срок
+                heapq.heappush(heap, (expires_at, session_id))
+                continue
+            self._remove(session_id)
+            self.expired_count += 1
+            removed += 1
+        return removed
+
+    def _remove(self, session_id):
+        session = self.sessions.pop(session_id)
+        user_sessions = self.user_sessions.get(session['user_id'])
+        if user_sessions is not None:
+            user_sessions.pop(session_id, None)
+            if not user_sessions:
+                del self.user_sessions[session['user_id']]
 
 
 class AuthModule:
-    def __init__(self):
-        self.users = []
-        self.verification_codes = {}  # {identifier: {'code': '123456', 'expires': timestamp, 'user_type': 'student'}}
-        self.sessions = {}  # {session_id: user_id}
+    def __init__(self, password_hasher=None, notifications=None, db_path=None):
+        self.password_hasher = password_hasher or PasswordHasher()
+        self.notifications = notifications or NotificationQueue()
+        if db_path:
+            # Постоянное хранение в SQLite
+            self.storage = SQLiteStorage(db_path)
+            self.users = SQLiteUserRegistry(self.storage)
+            self.verification_codes = SQLiteCodeStore(self.storage)
+            self.sessions = SQLiteSessionStore(self.storage)
+        else:
+            self.storage = None
+            self.users = UserRegistry()
+            self.verification_codes = {}  # {identifier: {'code': '123456', 'expires': timestamp, 'user_type': 'student'}}
+            self.sessions = SessionStore()
         self.load_users()
+        self.availability = AvailabilityChecker(self.users)
 
     def load_users(self):
         """Загрузить тестовых пользователей разных типов"""
-        self.users = [
+        if len(self.users):
+            # Пользователи уже сохранены в базе
+            return
+
+        users = [
             # Студенты
             {
                 'id': 1,
@@ -89,36 +527,37 @@ class AuthModule:
             }
         ]
 
+        for user in users:
+            self.users.add(user)
+
     def hash_password(self, password):
         """Хеширование пароля"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        return self.password_hasher.hash(password)
 
     def verify_password(self, password, hashed_password):
         """Проверка пароля"""
-        return self.hash_password(password) == hashed_password
+        return self.password_hasher.verify(password, hashed_password)
 
     def authenticate(self, identifier, password, user_type=None):
         """Аутентификация пользователя по логину, email или телефону"""
-        user = None
-
-        # Ищем пользователя по разным идентификаторам
-        for u in self.users:
-            if (u['username'] == identifier or
-                u['email'] == identifier or
-                u.get('phone') == identifier):
-                user = u
-                break
+        user = self.users.find_by_identifier(identifier, user_type)
 
         if not user:
+            # Проверяем тип пользователя, если указан
+            if user_type and self.users.find_by_identifier(identifier):
+                return {'success': False, 'message': f'Доступ только для {user_type}s'}
             return {'success': False, 'message': 'Пользователь не найден'}
 
-        # Проверяем тип пользователя, если указан
-        if user_type and user['user_type'] != user_type:
-            return {'success': False, 'message': f'Доступ только для {user_type}s'}
-
         # Проверяем пароль
-        if not self.verify_password(password, user['password']):
-            return {'success': False, 'message': 'Неверный пароль'}
+        try:
+            if not self.verify_password(password, user['password']):
+                return {'success': False, 'message': 'Неверный пароль'}
+
+            # Пересчитываем хеш, если изменились параметры KDF
+            if self.password_hasher.needs_rehash(user['password']):
+                self.users.update(user, password=self.hash_password(password))
+        except PasswordHasherBusy:
+            return {'success': False, 'message': 'Сервер перегружен, попробуйте позже'}
 
         # Проверяем верификацию
         if not user.get('verified', True):
@@ -128,67 +567,48 @@ class AuthModule:
 
     def get_user_by_id(self, user_id):
         """Получить пользователя по ID"""
-        for user in self.users:
-            if user['id'] == user_id:
-                return user
-        return None
+        return self.users.get(user_id)
 
-    def get_user_by_email(self, email):
-        """Получить пользователя по email"""
-        for user in self.users:
-            if user['email'] == email:
-                return user
-        return None
+    def get_user_by_email(self, email, user_type=None):
+        """Получить пользователя по email (email уникален только в пределах типа)"""
+        return self.users.find('email', email, user_type)
 
-    def get_user_by_phone(self, phone):
+    def get_user_by_phone(self, phone, user_type=None):
         """Получить пользователя по телефону"""
-        for user in self.users:
-            if user.get('phone') == phone:
-                return user
-        return None
+        return self.users.find('phone', phone, user_type)
 
+    # Проверки при регистрации идут в хранилище напрямую: фильтр Блума
+    # (self.availability) свой в каждом процессе и годится только для подсказок
     def check_username_exists(self, username, user_type=None):
         """Проверить существует ли пользователь с таким логином"""
-        if user_type:
-            return any(u['username'] == username and u['user_type'] == user_type for u in self.users)
-        return any(u['username'] == username for u in self.users)
+        return self.users.find('username', username, user_type) is not None
 
     def check_email_exists(self, email, user_type=None):
         """Проверить существует ли пользователь с таким email"""
-        if user_type:
-            return any(u['email'] == email and u['user_type'] == user_type for u in self.users)
-        return any(u['email'] == email for u in self.users)
+        return self.users.find('email', email, user_type) is not None
 
     def check_phone_exists(self, phone, user_type=None):
         """Проверить существует ли пользователь с таким телефоном"""
-        if user_type:
-            return any(u.get('phone') == phone and u['user_type'] == user_type for u in self.users)
-        return any(u.get('phone') == phone for u in self.users)
+        return self.users.find('phone', phone, user_type) is not None
 
     def generate_verification_code(self):
         """Сгенерировать код подтверждения (6 цифр)"""
         return ''.join([str(secrets.randbelow(10)) for _ in range(6)])
 
     def send_email_verification(self, email, code, user_type):
-        """Отправить код подтверждения на email"""
-        # Демо-версия - вывод в консоль
-        print(f"=== ДЕМО: Отправка email на {email} ===")
-        print(f"Тип пользователя: {user_type}")
-        print(f"Код подтверждения: {code}")
-        print("=== КОНЕЦ ДЕМО ===")
-        return True
+        """Поставить код подтверждения в очередь отправки на email"""
+        return self.notifications.send_email(
+            email,
+            'Код подтверждения',
+            f'Тип пользователя: {user_type}\nКод подтверждения: {code}'
+        )
 
     def send_sms_verification(self, phone, code, user_type):
-        """Отправить код подтверждения по SMS"""
-        # Демо-версия - вывод в консоль
-        print(f"=== ДЕМО: Отправка SMS на {phone} ===")
-        print(f"Тип пользователя: {user_type}")
-        print(f"Код подтверждения: {code}")
-        print("=== КОНЕЦ ДЕМО ===")
-        return True
+        """Поставить код подтверждения в очередь отправки по SMS"""
+        return self.notifications.send_sms(phone, f'Код подтверждения: {code}')
 
     def create_verification_code(self, identifier, method='email', user_type='student'):
-        """Создать и отправить код подтверждения"""
+        """Создать код подтверждения и поставить его в очередь отправки"""
         code = self.generate_verification_code()
         expires_at = time.time() + 600  # 10 минут
 
@@ -206,34 +626,37 @@ class AuthModule:
             success = self.send_sms_verification(identifier, code, user_type)
 
         return success, code
-def verify_code(self, identifier, code):
 
-    if identifier not in self.verification_codes:
-        return {'success': False, 'message': 'Код не найден или устарел'}
+    def verify_code(self, identifier, code):
+        """Проверить код подтверждения"""
+        if identifier not in self.verification_codes:
+            return {'success': False, 'message': 'Код не найден или устарел'}
         verification = self.verification_codes[identifier]
 
-    if time.time() > verification['expires']:
+        if time.time() > verification['expires']:
             del self.verification_codes[identifier]
             return {'success': False, 'message': 'Код устарел'}
 
         # Проверка попыток
-    if verification['attempts'] >= 3:
+        if verification['attempts'] >= 3:
             del self.verification_codes[identifier]
             return {'success': False, 'message': 'Превышено количество попыток'}
 
-         verification['attempts'] += 1
+        verification['attempts'] += 1
+        self.verification_codes[identifier] = verification
 
-    if verification['code'] == code:
+        if verification['code'] == code:
             # Код верный
             user_type = verification['user_type']
             del self.verification_codes[identifier]
             return {'success': True, 'message': 'Код подтвержден', 'user_type': user_type}
-    else:
+        else:
             return {'success': False, 'message': 'Неверный код'}
 
     def create_user(self, username, password, name, user_type, email, phone=None, **kwargs):
+        """Создать неподтвержденного пользователя. UserExistsError - логин или email заняты"""
         new_user = {
-            'id': len(self.users) + 1,
+            'id': None,  # назначается при сохранении
             'username': username,
             'password': self.hash_password(password),
             'name': name,
@@ -254,70 +677,53 @@ def verify_code(self, identifier, code):
         elif user_type == 'admin':
             new_user['position'] = kwargs.get('position', 'Администратор')
 
-        self.users.append(new_user)
+        # Сохраняем одной транзакцией; уникальность проверяет само хранилище
+        self.users.add(new_user)
+        self.availability.add_user(new_user)
         return new_user
 
-    def verify_user(self, identifier):
-        """Подтвердить пользователя по email или телефону"""
-        user = None
+    def verify_user(self, identifier, user_type):
+        """Подтвердить пользователя по email или телефону.
 
-        # Ищем пользователя по email или телефону
-        for u in self.users:
-            if u['email'] == identifier or u.get('phone') == identifier:
-                user = u
-                break
+        user_type - из проверенного кода: студент и преподаватель могут иметь один email
+        """
+        user = self.users.find_by_identifier(identifier, user_type, fields=('email', 'phone'))
 
         if user:
-            user['verified'] = True
+            self.users.update(user, verified=True)
             return {'success': True, 'user': user}
 
         return {'success': False, 'message': 'Пользователь не найден'}
 
-    def update_password(self, identifier, new_password):
-        """Обновить пароль пользователя"""
-        user = None
+    def update_password(self, identifier, new_password, user_type, password_hash=None):
+        """Обновить пароль пользователя указанного типа.
 
-        # Ищем пользователя по email или телефону
-        for u in self.users:
-            if u['email'] == identifier or u.get('phone') == identifier:
-                user = u
-                break
+        password_hash - уже посчитанный хеш new_password (если хешировали заранее)
+        """
+        user = self.users.find_by_identifier(identifier, user_type, fields=('email', 'phone'))
 
         if user:
-            user['password'] = self.hash_password(new_password)
+            self.users.update(user, password=password_hash or self.hash_password(new_password))
             return {'success': True, 'user': user}
 
         return {'success': False, 'message': 'Пользователь не найден'}
 
     def create_session(self, user_id):
         """Создать сессию для пользователя"""
-        session_id = secrets.token_hex(32)
-        self.sessions[session_id] = {
-            'user_id': user_id,
-            'created_at': time.time(),
-            'last_activity': time.time()
-        }
-        return session_id
+        return self.sessions.create(user_id)
 
     def validate_session(self, session_id):
         """Проверить валидность сессии"""
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
-            # Проверяем время бездействия (30 минут)
-            if time.time() - session['last_activity'] < 1800:
-                session['last_activity'] = time.time()
+        return self.sessions.validate(session_id)
 
-                return session['user_id']
-            else:
-                # Сессия истекла
-                del self.sessions[session_id]
-        return None
+    def delete_session(self, session_id):
+        """Удалить сессию"""
+        self.sessions.delete(session_id)
 
-        def delete_session(self, session_id):
-            """Удалить сессию"""
-            if session_id in self.sessions:
-                del self.sessions[session_id]
+    def get_users_by_type(self, user_type):
+        """Получить всех пользователей определенного типа"""
+        return self.users.get_by_type(user_type)
 
-        def get_users_by_type(self, user_type):
-            """Получить всех пользователей определенного типа"""
-            return [u for u in self.users if u['user_type'] == user_type]
\ No newline at end of file
+    def list_users(self, user_type=None, **filters):
+        """Постраничный список пользователей (см. UserRegistry.list_users)"""
+        return self.users.list_users(user_type, **filters)
@@ -0,0 +1,168 @@
+"""
+Модуль импорта расписания из CSV/XLSX файлов
+"""
+import csv
+import io
+import zipfile
+
+from rasp import DAYS, validate_lesson
+
+# Заголовок файла -> поле занятия
+COLUMNS = {
+    'курс': 'course', 'course': 'course',
+    'день': 'day', 'day': 'day',
+    'время': 'time', 'time': 'time',
+    'предмет': 'subject', 'subject': 'subject',
+    'преподаватель': 'teacher', 'teacher': 'teacher',
+    'аудитория': 'room', 'room': 'room',
+}
+REQUIRED_FIELDS = ('course', 'day', 'time', 'subject', 'teacher', 'room')
+DAY_ORDER = {day: number for number, day in enumerate(DAYS)}
+
+
+def iter_csv_rows(stream):
+    """Построчно читать CSV (номер строки, значения)"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    sample = text.readline()
+    # Разделитель определяем по заголовку: Excel часто сохраняет CSV через ';'
+    delimiter = ';' if sample.count(';') > sample.count(',') else ','
+    yield 1, next(csv.reader([sample], delimiter=delimiter), [])
+    for line_number, row in enumerate(csv.reader(text, delimiter=delimiter), 2):
+        yield line_number, row
+
+
+def iter_xlsx_rows(stream):
+    """Построчно читать первый лист XLSX (номер строки, значения)"""
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise ValueError('Для загрузки XLSX установите пакет openpyxl')
+
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError):
+        # Поврежденный архив или файл другого формата с расширением .xlsx
+        raise ValueError('файл не является книгой XLSX')
+    try:
+        for line_number, row in enumerate(workbook.active.iter_rows(values_only=True), 1):
+            yield line_number, ['' if value is None else str(value) for value in row]
+    finally:
+        workbook.close()
+
+
+class ScheduleImporter:
+    """Потоковый импорт расписания с проверкой строк и атомарной заменой"""
+
+    def __init__(self, schedule_module, batch_size=1000, max_errors=100):
+        self.schedule_module = schedule_module
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    def import_file(self, stream, filename):
+        """Импортировать файл. Расписание заменяется, только если ошибок нет"""
+        if filename.lower().endswith('.xlsx'):
+            rows = iter_xlsx_rows(stream)
+        elif filename.lower().endswith('.csv'):
+            rows = iter_csv_rows(stream)
+        else:
+            return {'success': False, 'message': 'Поддерживаются только файлы CSV и XLSX', 'errors': []}
+
+        try:
+            return self._import_rows(rows)
+        except (ValueError, csv.Error, UnicodeDecodeError) as error:
+            return {'success': False, 'message': f'Не удалось прочитать файл: {error}', 'errors': []}
+
+    def _import_rows(self, rows):
+        line_number, header = next(rows, (1, []))
+        columns = self._parse_header(header)
+        missing = [field for field in REQUIRED_FIELDS if field not in columns.values()]
+        if missing:
+            return {'success': False,
+                    'message': 'В заголовке нет столбцов: ' + ', '.join(missing),
+                    'errors': [{'line': line_number, 'message': 'Некорректный заголовок'}]}
+
+        staging = {}  # новое расписание собирается отдельно от текущего
+        batch = []
+        errors = []
+        seen = {}  # {(курс, день, начало, конец): строка} - как проверка в _save_lesson
+        total = 0
+        for line_number, row in rows:
+            if not any(str(value).strip() for value in row):
+                continue
+            lesson, error = self._parse_row(row, columns)
+            if lesson:
+                key = (lesson['course'], lesson['day'], lesson['lesson'].start, lesson['lesson'].end)
+                if key in seen:
+                    error = f'Это время у курса уже занято (строка {seen[key]})'
+                else:
+                    seen[key] = line_number
+            if error:
+                errors.append({'line': line_number, 'message': error})
+                if len(errors) >= self.max_errors:
+                    break
+                continue
+            batch.append(lesson)
+            total += 1
+            if len(batch) >= self.batch_size:
+                self._write_batch(staging, batch)
+                batch = []
+        self._write_batch(staging, batch)
+
+        if errors:
+            return {'success': False, 'message': 'Файл содержит ошибки, расписание не изменено',
+                    'errors': errors}
+
+        # Упорядочиваем дни недели и занятия по времени
+        for course, days in staging.items():
+            for lessons in days.values():
+                lessons.sort(key=lambda lesson: lesson.start)
+            staging[course] = dict(sorted(days.items(), key=lambda item: DAY_ORDER[item[0]]))
+
+        version = self.schedule_module.replace_schedule(dict(sorted(staging.items())))
+        return {'success': True, 'message': f'Загружено занятий: {total}', 'rows': total,
+                'version': version, 'errors': [],
+                'conflicts': self.schedule_module.get_conflicts()}
+
+    @staticmethod
+    def _parse_header(header):
+        columns = {}
+        for index, name in enumerate(header):
+            field = COLUMNS.get(str(name).strip().lower())
+            if field and field not in columns.values():
+                columns[index] = field
+        return columns
+
+    @staticmethod
+    def _parse_row(row, columns):
+        values = {field: str(row[index]).strip() if index < len(row) else ''
+                  for index, field in columns.items()}
+
+        empty = [field for field in REQUIRED_FIELDS if not values[field]]
+        if empty:
+            return None, 'Не заполнено: ' + ', '.join(empty)
+
+        # XLSX отдает числа как '2.0'; inf, nan и дробные отбрасываем
+        try:
+            course = float(values['course'])
+        except ValueError:
+            return None, f'Некорректный курс: {values["course"]}'
+        if not course.is_integer() or course < 1:
+            return None, f'Некорректный курс: {values["course"]}'
+        course = int(course)
+
+        day = values['day'].capitalize()
+        if day not in DAY_ORDER:
+            return None, f'Неизвестный день недели: {values["day"]}'
+
+        # Время и текстовые поля - те же правила, что при правке занятия в админке
+        lesson, error = validate_lesson(values)
+        if error:
+            return None, error
+        return {'course': course, 'day': day, 'lesson': lesson}, None
+
+    @staticmethod
+    def _write_batch(staging, batch):
+        for lesson in batch:
+            days = staging.setdefault(lesson['course'], {})
+            days.setdefault(lesson['day'], []).append(lesson['lesson'])
@@ -0,0 +1,152 @@
+"""
+Модуль занятости аудиторий, курсов и преподавателей по парам (битовые маски)
+"""
+from konflikty import SHARED_TEACHERS
+from rasp import DAYS
+from vremya import format_time_range
+
+# Звонки: номер пары -> (начало, конец) в минутах
+PAIRS = [(540, 630), (645, 735), (780, 870), (885, 975), (990, 1080), (1095, 1185)]
+SLOTS = len(DAYS) * len(PAIRS)
+ALL_SLOTS = (1 << SLOTS) - 1
+
+# Вместимость аудиторий (демо-данные). Аудитории из расписания, которых здесь нет,
+# тоже ищутся - с неизвестной вместимостью
+ROOM_CAPACITY = {
+    '105': 30, '106': 25, '107': 25, '108': 40,
+    '205': 20, '206': 20, '207': 25, '208': 30,
+    '301': 40, '302': 35, '303': 20, '304': 25, '305': 20, '306': 25, '307': 30,
+    '410': 60, '411': 30, '412': 30, '413': 50,
+    'Спортзал': 100, 'Актовый зал': 200,
+}
+
+
+def slot_bit(day, pair):
+    """Бит ячейки (день, номер пары с 1)"""
+    return 1 << (DAYS.index(day) * len(PAIRS) + pair - 1)
+
+
+def lesson_mask(day, lesson):
+    """Маска пар, которые пересекает занятие"""
+    base = DAYS.index(day) * len(PAIRS)
+    mask = 0
+    for number, (start, end) in enumerate(PAIRS):
+        if lesson.start < end and start < lesson.end:
+            mask |= 1 << (base + number)
+    return mask
+
+
+def describe_slot(bit_number):
+    """Номер бита -> {'day', 'pair', 'time'}"""
+    day, pair = divmod(bit_number, len(PAIRS))
+    return {'day': DAYS[day], 'pair': pair + 1, 'time': format_time_range(*PAIRS[pair])}
+
+
+class OccupancyIndex:
+    """По одной битовой маске на аудиторию, курс и преподавателя: бит - (день, пара)"""
+
+    KINDS = ('room', 'course', 'teacher')
+
+    def __init__(self, room_capacity=None):
+        self.room_capacity = ROOM_CAPACITY if room_capacity is None else room_capacity
+        self.masks = {kind: {} for kind in self.KINDS}  # {вид: {значение: маска}}
+        # {(вид, значение): {номер бита: число занятий}} - чтобы при накладке
+        # удаление одного из занятий не освобождало ячейку
+        self.counts = {}
+
+    def rebuild(self, schedule_data):
+        """Перестроить маски по всему расписанию"""
+        self.masks = {kind: {} for kind in self.KINDS}
+        self.counts = {}
+        for course, days in schedule_data.items():
+            for day, lessons in days.items():
+                for lesson in lessons:
+                    self.add(course, day, lesson)
+
+    def add(self, course, day, lesson):
+        """Отметить пары занятия занятыми"""
+        mask = lesson_mask(day, lesson)
+        for kind, value in self._keys(course, lesson):
+            counts = self.counts.setdefault((kind, value), {})
+            for bit_number in self._bits(mask):
+                counts[bit_number] = counts.get(bit_number, 0) + 1
+            self.masks[kind][value] = self.masks[kind].get(value, 0) | mask
+
+    def remove(self, course, day, lesson):
+        """Освободить пары занятия"""
+        mask = lesson_mask(day, lesson)
+        for kind, value in self._keys(course, lesson):
+            counts = self.counts.get((kind, value), {})
+            freed = 0
+            for bit_number in self._bits(mask):
+                left = counts.get(bit_number, 0) - 1
+                if left > 0:
+                    counts[bit_number] = left
+                else:
+                    counts.pop(bit_number, None)
+                    freed |= 1 << bit_number
+            self.masks[kind][value] = self.masks[kind].get(value, 0) & ~freed
+            if not counts:
+                self.counts.pop((kind, value), None)
+
+    def free_rooms(self, day, pair, min_capacity=0):
+        """Свободные аудитории на паре с вместимостью не меньше min_capacity.
+
+        Аудитории берутся из расписания и таблицы вместимости. Аудитория без
+        известной вместимости (capacity=None) попадает в ответ, только если
+        фильтра по вместимости нет; такие идут в конце списка
+        """
+        bit = slot_bit(day, pair)
+        rooms_mask = self.masks['room']
+        rooms = []
+        for room in self.room_capacity.keys() | rooms_mask.keys():
+            if rooms_mask.get(room, 0) & bit:
+                continue
+            capacity = self.room_capacity.get(room)
+            if capacity is None:
+                if min_capacity > 0:
+                    continue
+            elif capacity < min_capacity:
+                continue
+            rooms.append({'room': room, 'capacity': capacity})
+        rooms.sort(key=lambda item: (item['capacity'] is None, item['capacity'] or 0, item['room']))
+        return rooms
+
+    def busy_mask(self, course=None, teacher=None, room=None):
+        """Объединение масок занятости указанных курса, преподавателя и аудитории"""
+        mask = 0
+        for kind, value in (('course', course), ('teacher', teacher), ('room', room)):
+            if value is not None:
+                mask |= self.masks[kind].get(value, 0)
+        return mask
+
+    def first_common_free_slot(self, course=None, teacher=None, room=None, days=None):
+        """Первая пара недели, свободная у всех указанных; days - ограничить днями"""
+        free = ALL_SLOTS & ~self.busy_mask(course, teacher, room)
+        if days is not None:
+            free &= self._days_mask(days)
+        if not free:
+            return None
+        # Младший установленный бит - самая ранняя пара
+        return describe_slot((free & -free).bit_length() - 1)
+
+    def _days_mask(self, days):
+        day_mask = (1 << len(PAIRS)) - 1
+        mask = 0
+        for day in days:
+            mask |= day_mask << (DAYS.index(day) * len(PAIRS))
+        return mask
+
+    @staticmethod
+    def _bits(mask):
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    @staticmethod
+    def _keys(course, lesson):
+        keys = [('room', lesson['room']), ('course', course)]
+        if lesson['teacher'] not in SHARED_TEACHERS:
+            keys.append(('teacher', lesson['teacher']))
+        return keys